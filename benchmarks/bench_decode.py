@@ -0,0 +1,57 @@
+"""Decoding of /alerts and /silences responses: pydantic validation vs. trusted records.
+
+Usage: python benchmarks/bench_decode.py [number of alerts]
+"""
+
+import json
+import random
+import sys
+import time
+
+from amlib import tools
+
+
+def synthetic_alerts(count: int) -> list[dict]:
+    rnd = random.Random(0)
+    alerts = []
+    for i in range(count):
+        alerts.append({
+            "labels": {"alertname": f"Alert{rnd.randint(0, 200)}", "namespace": f"ns-{rnd.randint(0, 50)}",
+                       "cluster": rnd.choice(["eu-west", "us-east", "ap-south"]), "job": "node-exporter",
+                       "instance": f"10.0.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}:9100", "severity": "warning"},
+            "annotations": {"summary": f"Something is wrong on instance {i}", "runbook_url": "https://runbooks.example/x"},
+            "receivers": [{"name": "default"}],
+            "fingerprint": f"{i:016x}",
+            "startsAt": "2022-09-21T14:37:18.123456789Z",
+            "updatedAt": "2022-09-21T14:38:18.123456789Z",
+            "endsAt": "2022-09-21T15:37:18.123456789Z",
+            "generatorURL": "http://prometheus.example:9090/graph?g0.expr=up+%3D%3D+0",
+            "status": {"state": "active", "silencedBy": [], "inhibitedBy": []},
+        })
+    return alerts
+
+
+def timed(label: str, func, body: str) -> list:  # type: ignore[no-untyped-def]
+    start = time.perf_counter()
+    result = func(json.loads(body))
+    print(f"{label:40} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    body = json.dumps(synthetic_alerts(count))
+    print(f"{count} alerts, {len(body) / 1e6:.1f} MB")
+    timed("json.loads only", lambda data: data, body)
+    timed("pydantic (GettableAlerts.parse_obj)", lambda data: tools.decode_alerts(data, trusted=False), body)
+    alerts = timed("trusted records", lambda data: tools.decode_alerts(data, trusted=True), body)
+    timed("trusted records + all timestamps", lambda data: [
+        (a.startsAt, a.updatedAt, a.endsAt) for a in tools.decode_alerts(data, trusted=True)], body)
+    start = time.perf_counter()
+    for alert in alerts[:1000]:
+        alert.to_model()
+    print(f"{'to_model() of 1000 records':40} {(time.perf_counter() - start) * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Matching silences against alerts: linear scan vs. AlertIndex vs. columnar AlertTable (numpy).
+
+Usage: python benchmarks/bench_matching.py [number of alerts] [number of silences]
+"""
+
+import random
+import sys
+import time
+
+from amlib import model, tools
+
+
+def synthetic(alert_count: int, silence_count: int) -> tuple[list[dict[str, str]], list[model.Matchers]]:
+    rnd = random.Random(0)
+    labels = [{"alertname": f"Alert{rnd.randint(0, 300)}", "namespace": f"ns-{rnd.randint(0, 80)}",
+               "cluster": rnd.choice(["eu-west", "us-east", "ap-south"]), "instance": f"host{rnd.randint(0, 2000)}"}
+              for _ in range(alert_count)]
+    matchers = []
+    for _ in range(silence_count):
+        exprs = [f"alertname=Alert{rnd.randint(0, 300)}"] if rnd.random() < 0.7 else []
+        exprs.append(rnd.choice([f"namespace=~ns-{rnd.randint(0, 8)}.*", f"cluster!=eu-west", f"instance=~host1.*"]))
+        matchers.append(model.Matchers.parse_obj([tools.parse_matcher(expr) for expr in exprs]))
+    return labels, matchers
+
+
+def main() -> None:
+    alert_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    silence_count = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+    labels, matchers = synthetic(alert_count, silence_count)
+    alerts = [model.GettableAlert.construct(labels=lbl, fingerprint=str(i)) for (i, lbl) in enumerate(labels)]
+    print(f"{alert_count} alerts x {silence_count} silences")
+
+    start = time.perf_counter()
+    compiled = [tools.compile_matchers(m) for m in matchers]
+    scan = [[pos for (pos, lbl) in enumerate(labels) if cm.matches(lbl)] for cm in compiled]
+    print(f"{'linear scan (compiled matchers)':34} {(time.perf_counter() - start) * 1000:9.1f} ms")
+
+    start = time.perf_counter()
+    index = tools.AlertIndex(alerts)
+    indexed = [index.positions(m) for m in matchers]
+    print(f"{'AlertIndex (incl. build)':34} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    assert indexed == scan
+
+    try:
+        from amlib.columnar import AlertTable
+    except ImportError:
+        print("numpy not installed, skipping AlertTable")
+        return
+    import numpy
+    start = time.perf_counter()
+    table = AlertTable(alerts)
+    masks = [table.mask(m) for m in matchers]
+    print(f"{'AlertTable (incl. build)':34} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    assert [list(numpy.flatnonzero(mask)) for mask in masks] == scan
+
+
+if __name__ == "__main__":
+    main()
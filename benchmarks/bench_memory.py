@@ -0,0 +1,40 @@
+"""Memory held by decoded alert lists: pydantic models vs. records with and without interning.
+
+Usage: python benchmarks/bench_memory.py [number of alerts]
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+
+from amlib import records, tools
+
+from bench_decode import synthetic_alerts
+
+
+def retained(label: str, decode, body: str) -> None:  # type: ignore[no-untyped-def]
+    gc.collect()
+    tracemalloc.start()
+    result = decode(json.loads(body))
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:36} {current / 1e6:9.1f} MB {peak / 1e6:9.1f} MB")
+    del result
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    body = json.dumps(synthetic_alerts(count))
+    print(f"{count} alerts, {len(body) / 1e6:.1f} MB JSON")
+    print(f"{'':36} {'retained':>12} {'peak':>12}")
+    retained("raw dicts (json.loads)", lambda data: data, body)
+    retained("pydantic models", lambda data: tools.decode_alerts(data, trusted=False, compact=False), body)
+    retained("pydantic models -> compact records", lambda data: tools.decode_alerts(data, trusted=False, compact=True), body)
+    retained("records, not interned", lambda data: records.alerts_from_json(data, intern=False), body)
+    retained("records, interned", lambda data: records.alerts_from_json(data, intern=True), body)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Startup time of amcli: measures cold process runs of typical invocations.
+
+Usage: python benchmarks/bench_startup.py [runs]
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+INVOCATIONS = [
+    ["python", "-c", "pass"],
+    ["python", "-c", "import amlib.am_cli"],
+    ["amcli", "--help"],
+    ["amcli", "status", "--help"],
+    ["amcli", "silence", "--help"],
+    ["amcli", "alert", "filter", "--help"],
+]
+
+
+def run(cmd: list[str], runs: int) -> list[float]:
+    if cmd[0] == "python":
+        argv = [sys.executable] + cmd[1:]
+    else:
+        argv = [sys.executable, "-m", "amlib.am_cli"] + cmd[1:]
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(f"{'invocation':32} {'min ms':>8} {'median ms':>10}")
+    for cmd in INVOCATIONS:
+        timings = run(cmd, runs)
+        print(f"{' '.join(cmd):32} {min(timings) * 1000:8.1f} {statistics.median(timings) * 1000:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,9 @@ setup(
         "pyyaml",
         "pytimeparse",
     ],
+    extras_require={
+        "columnar": ["numpy"],
+    },
     include_package_data=True,
     packages=find_namespace_packages(where="src"),
     package_dir={
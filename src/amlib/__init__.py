@@ -3,6 +3,7 @@ from enum import Enum
 class Paths(Enum):
     STATUS = 'status'
     ALERTS = 'alerts'
+    ALERT_GROUPS = 'alerts/groups'
     SILENCES = 'silences'
     SILENCE = 'silence'
 
@@ -0,0 +1,115 @@
+"""asyncio client for alertmanager, mirroring the public request functions of amlib.tools.
+Instances are selected as for tools (config.select_instances), single instance calls take an instance name."""
+
+import asyncio
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, TypeVar
+
+from amlib import model, tools
+
+T = TypeVar("T")
+
+
+class AsyncClient:
+    """Awaitable versions of the tools functions, returning the same model objects.
+
+    Requests run on a bounded pool of worker threads sharing the pooled HTTP session
+    of amlib.session, so they don't block the event loop and can be issued concurrently:
+
+        async with AsyncClient() as client:
+            status, alerts, silences = await asyncio.gather(
+                client.get_status(), client.get_alerts(), client.get_silences())
+    """
+
+    def __init__(self, concurrency: int = tools.DEFAULT_PARALLEL) -> None:
+        self.concurrency = concurrency
+        self._executor: ThreadPoolExecutor | None = None
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Shuts down the worker threads, the shared session stays open."""
+        if self._executor:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="amlib-aio")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def _iterate(self, iterator: Iterator[T], batch_size: int = 256) -> AsyncIterator[T]:
+        """Advances a blocking iterator on the worker threads, batch_size elements per step."""
+        while True:
+            batch = await self._run(lambda: list(islice(iterator, batch_size)))
+            if not batch:
+                return
+            for item in batch:
+                yield item
+
+    async def get_status(self, instance: str | None = None) -> model.AlertmanagerStatus:
+        """Returns status of Alertmanager"""
+        return await self._run(tools.get_status, instance)
+
+    async def get_statuses(self, instances: Iterable[str] | None = None) -> tools.FanOutResult:
+        """Returns the status of all (selected) instances, see tools.get_statuses."""
+        return await self._run(tools.get_statuses, instances)
+
+    async def probe_instances(self, instances: Iterable[str] | None = None) -> list[tools.ProbeResult]:
+        """Probes the status of all (selected) instances, see tools.probe_instances."""
+        return await self._run(tools.probe_instances, instances)
+
+    async def get_silences(self, statelist: Iterable[model.State] | None = None, sfilter: Iterable[str] | None = None, ends_before: datetime.datetime | None = None, ends_after: datetime.datetime | None = None) -> list[model.GettableSilence]:
+        """Returns a list of silences. Filtering can be done by a given state, matchers and end time"""
+        return await self._run(tools.get_silences, statelist, sfilter, ends_before, ends_after)
+
+    async def iter_silences(self, statelist: Iterable[model.State] | None = None, sfilter: Iterable[str] | None = None, ends_before: datetime.datetime | None = None, ends_after: datetime.datetime | None = None) -> AsyncIterator[model.GettableSilence]:
+        """Yields silences while the responses are received, see tools.iter_silences."""
+        async for silence in self._iterate(tools.iter_silences(statelist, sfilter, ends_before, ends_after)):
+            yield silence
+
+    async def get_silence(self, silence_id: str, instance: str | None = None) -> model.GettableSilence | None:
+        """Returns a silence by its id."""
+        return await self._run(tools.get_silence, silence_id, instance)
+
+    async def get_silences_by_id(self, silence_ids: Iterable[str]) -> list[tuple[str, model.GettableSilence | None | BaseException]]:
+        """Returns (id, silence) for all given ids, fetched concurrently. Failed requests yield their exception."""
+        id_list = list(silence_ids)
+        return list(zip(id_list, await asyncio.gather(*(self.get_silence(sid) for sid in id_list), return_exceptions=True)))
+
+    async def set_silence(self, silence: model.Silence, instance: str | None = None) -> tuple[bool, str | dict[str, str]]:
+        """Set or modify silence. Returns if request was successful and description"""
+        return await self._run(tools.set_silence, silence, instance)
+
+    async def apply_silences(self, silences: Iterable[model.Silence], existing: Iterable[model.Silence] | None = None) -> list[tools.ApplyResult]:
+        """Creates silences, skipping existing ones, see tools.apply_silences."""
+        return await self._run(tools.apply_silences, list(silences), self.concurrency, existing)
+
+    async def expire_silence(self, silence_id: str, instance: str | None = None) -> bool:
+        """Expire a silence by its id."""
+        return await self._run(tools.expire_silence, silence_id, instance)
+
+    async def expire_silences(self, silence_ids: Iterable[str]) -> list[tuple[str, bool | BaseException]]:
+        """Expires all given silences concurrently. Failed requests yield their exception."""
+        id_list = list(silence_ids)
+        return list(zip(id_list, await asyncio.gather(*(self.expire_silence(sid) for sid in id_list), return_exceptions=True)))
+
+    async def get_alerts(self, active: bool = True, silenced: bool = True, inhibited: bool = True, unprocessed: bool = True, afilter: Iterable[str] | None = None, receiver: str | None = None, fingerprint: str | None = None) -> list[model.GettableAlert]:
+        """Returns a list of matching alerts."""
+        return await self._run(tools.get_alerts, active, silenced, inhibited, unprocessed, afilter, receiver, fingerprint)
+
+    async def iter_alerts(self, active: bool = True, silenced: bool = True, inhibited: bool = True, unprocessed: bool = True, afilter: Iterable[str] | None = None, receiver: str | None = None, fingerprint: str | None = None) -> AsyncIterator[model.GettableAlert]:
+        """Yields matching alerts while the responses are received, see tools.iter_alerts."""
+        async for alert in self._iterate(tools.iter_alerts(active, silenced, inhibited, unprocessed, afilter, receiver, fingerprint)):
+            yield alert
+
+    async def get_alert_groups(self, active: bool = True, silenced: bool = True, inhibited: bool = True, afilter: Iterable[str] | None = None, receiver: str | None = None) -> list[model.AlertGroup]:
+        """Returns the alert groups of all (selected) instances, see tools.get_alert_groups."""
+        return await self._run(tools.get_alert_groups, active, silenced, inhibited, afilter, receiver)
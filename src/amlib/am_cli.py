@@ -1,22 +1,69 @@
 """ Command line interface for alertmanager"""
+import importlib
 import click
-from amlib.config import read_from_file, set_config
+from amlib.config import CACHE_OPTIONS
 
-from amlib.cligrp.status import status_grp
-from amlib.cligrp.alert import alert_grp
-from amlib.cligrp.silence import silence_grp
 
+class LazyGroup(click.Group):
+    """Group importing its subcommands only when they are invoked.
+    lazy_subcommands maps command names to ("module:attribute", short help)."""
 
-@click.group
-def main_cli() -> None:
-    pass
+    def __init__(self, *args, lazy_subcommands: dict[str, tuple[str, str]] | None = None, **kwargs) -> None:  # type: ignore[no-untyped-def]
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
 
-main_cli.add_command(status_grp)
-main_cli.add_command(silence_grp)
-main_cli.add_command(alert_grp)
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
 
-conf = read_from_file()
-set_config(conf)
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name not in self.commands and cmd_name in self.lazy_subcommands:
+            module_name, attr = self.lazy_subcommands[cmd_name][0].split(':')
+            self.add_command(getattr(importlib.import_module(module_name), attr), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        # help texts of not yet imported commands are taken from lazy_subcommands
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.commands:
+                cmd = self.commands[name]
+                if cmd.hidden:
+                    continue
+                rows.append((name, cmd.get_short_help_str(formatter.width)))
+            else:
+                rows.append((name, self.lazy_subcommands[name][1]))
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
+
+
+@click.group(cls=LazyGroup, lazy_subcommands={
+    'status': ('amlib.cligrp.status:status_grp', 'Cluster status commands'),
+    'silence': ('amlib.cligrp.silence:silence_grp', 'Commands for handling silences'),
+    'alert': ('amlib.cligrp.alert:alert_grp', 'show and filter alerts'),
+    'receive': ('amlib.cligrp.receive:receive_cmd', 'Receive webhooks and serve the alerts locally'),
+})
+@click.option('--max-age', 'max_age', type=str, default=None, help='Reuse API responses cached on disk up to this age (i.e. "30s", "0" disables)')
+@click.option('--instance', '-i', 'instances', type=str, multiple=True, help='Only query this alertmanager instance (can be repeated, default: all configured)')
+@click.option('--verbose', '-v', count=True, help='Log requests to stderr (-vv for debug output)')
+def main_cli(max_age: str | None, instances: tuple[str, ...], verbose: int) -> None:
+    if verbose:
+        import logging
+        logging.basicConfig(level=logging.DEBUG if verbose > 1 else logging.INFO, format='%(name)s: %(message)s')
+        # urllib3 debug output would drown the own messages
+        logging.getLogger('urllib3').setLevel(logging.WARNING)
+    if instances:
+        from amlib import config
+        try:
+            config.select_instances(list(instances))
+        except KeyError as err:
+            raise click.BadOptionUsage('--instance', str(err.args[0]))
+    if max_age is not None:
+        from pytimeparse.timeparse import timeparse
+        max_age_secs = int(max_age) if max_age.isdigit() else timeparse(max_age)
+        if max_age_secs is None:
+            raise click.BadOptionUsage('--max-age', 'invalid time range format')
+        CACHE_OPTIONS["MAX_AGE"] = max_age_secs
 
 if __name__ == '__main__':
 
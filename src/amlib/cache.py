@@ -0,0 +1,190 @@
+"""Caching of alertmanager responses"""
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from functools import wraps
+from typing import Any, Callable, Hashable, NamedTuple, TypeVar
+
+from amlib.config import CACHE_OPTIONS, INSTANCES, SELECTED_INSTANCES
+
+T = TypeVar("T")
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Returns (True, value) for a fresh entry, (False, None) otherwise."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Stores a value, evicting expired and least recently used entries."""
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                for k in [k for (k, (expires, _)) in self._data.items() if expires <= now]:
+                    del self._data[k]
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drops all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+
+def normalize_arg(value: Any) -> Hashable:
+    """Turns arguments into hashable, order-preserving values (lists -> tuples, sets -> sorted tuples)."""
+    if value is None or isinstance(value, (str, bytes, int, float, bool, Enum)):
+        return value
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((normalize_arg(v) for v in value), key=repr))
+    if isinstance(value, dict):
+        return tuple(sorted((k, normalize_arg(v)) for (k, v) in value.items()))
+    if isinstance(value, (list, tuple)) or hasattr(value, "__iter__"):
+        return tuple(normalize_arg(v) for v in value)
+    return value
+
+
+def ttl_cache(func: Callable[..., T]) -> Callable[..., T]:
+    """Caches results of func for CACHE_OPTIONS["TTL"] seconds, keeping at most CACHE_OPTIONS["MAXSIZE"] entries.
+
+    Arguments are bound to the signature (defaults applied) and normalized, so equivalent
+    calls share an entry and lists can be passed. Entries are kept per selection of instances. The wrapper provides cache_clear() and cache_info().
+    """
+    signature = inspect.signature(func)
+    cache = TTLCache(CACHE_OPTIONS["TTL"], CACHE_OPTIONS["MAXSIZE"])
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = {k: normalize_arg(v) for (k, v) in bound.arguments.items()}
+        # results depend on the (selected) instances, config.select_instances must not return stale entries
+        key = tuple(arguments.items()) + (tuple(SELECTED_INSTANCES) or tuple(INSTANCES),)
+        cache.ttl, cache.maxsize = CACHE_OPTIONS["TTL"], CACHE_OPTIONS["MAXSIZE"]
+        found, value = cache.get(key)
+        if found:
+            return value
+        value = func(**arguments)
+        cache.set(key, value)
+        return value
+
+    wrapper.cache = cache  # type: ignore[attr-defined]
+    wrapper.cache_clear = cache.invalidate  # type: ignore[attr-defined]
+    wrapper.cache_info = cache.info  # type: ignore[attr-defined]
+    return wrapper
+
+
+def default_cache_dir() -> str:
+    """Returns the per-user cache directory ($XDG_CACHE_HOME/pylerttool or ~/.cache/pylerttool)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pylerttool")
+
+
+class DiskCache:
+    """Response bodies stored as files, shared between processes.
+
+    Files are written to a temporary file and renamed, so concurrent readers
+    see either the old or the new body, never a partial one."""
+
+    def __init__(self, directory: str, max_age: float) -> None:
+        self.directory = directory
+        self.max_age = max_age
+
+    @staticmethod
+    def key(url: str, params: dict[str, Any] | None = None) -> str:
+        """Returns the cache key of a request (endpoint and normalized parameters)."""
+        raw = json.dumps([url, normalize_arg(params or {})], default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, url: str, params: dict[str, Any] | None = None) -> str | None:
+        """Returns the cached body if it is younger than max_age."""
+        path = self._path(self.key(url, params))
+        try:
+            if time.time() - os.stat(path).st_mtime > self.max_age:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, url: str, params: dict[str, Any] | None, body: str) -> None:
+        """Stores a body atomically. Errors are ignored, caching is best effort."""
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(body)
+                os.replace(tmp_path, self._path(self.key(url, params)))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """Removes all cached bodies."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(".json"):
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+def disk_cache() -> DiskCache | None:
+    """Returns the on-disk cache, if enabled by CACHE_OPTIONS["MAX_AGE"]."""
+    max_age = CACHE_OPTIONS["MAX_AGE"]
+    if not max_age or max_age <= 0:
+        return None
+    return DiskCache(CACHE_OPTIONS["DIRECTORY"] or default_cache_dir(), max_age)
@@ -1,9 +1,12 @@
+from __future__ import annotations
 from datetime import datetime,timezone,tzinfo
 from enum import Enum
-import click,tabulate
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+import click
 from urllib.parse import unquote
-import amlib.model as model
-from amlib.tools import matcher_op_to_str,silence_url
+# model, tools and tabulate are imported when used, to keep amcli startup fast
+if TYPE_CHECKING:
+    import amlib.model as model
 
 LOCAL_TZ = datetime.now().astimezone().tzinfo
 
@@ -17,49 +20,57 @@ DT_FORMATS = [
     '%H:%M'
 ]
 
+# colors by model.State / model.State1 values
 silence_state_colors = {
-    model.State.active: 'green',
-    model.State.pending: 'yellow',
-    model.State.expired: 'red'
+    'active': 'green',
+    'pending': 'yellow',
+    'expired': 'red'
 }
 
 
 alert_state_colors = {
-    model.State1.active: 'green',
-    model.State1.suppressed: 'blue',
-    model.State1.unprocessed: 'red'
+    'active': 'green',
+    'suppressed': 'blue',
+    'unprocessed': 'red'
 }
 
 
 def echo_silence(silence: model.Silence | model.GettableSilence, tzi: tzinfo | None = timezone.utc) -> None:
     """ Print representation of silence """
+    import tabulate
+    import amlib.model as model
+    from amlib.records import SilenceRecord
+    from amlib.tools import matcher_op_to_str,silence_url
     silence_tbl: list[list[str]] = []
-    if type(silence) == model.GettableSilence:
+    gettable = type(silence) in (model.GettableSilence, SilenceRecord)
+    if gettable:
         silence_tbl.append(['ID', click.style(silence.id, fg='yellow')])
     silence_tbl.append(['Starts at', str(silence.startsAt.astimezone(tzi))])
     silence_tbl.append(['Ends at', str(silence.endsAt.astimezone(tzi))])
-    if type(silence) == model.GettableSilence:
+    if gettable:
         silence_tbl.append(['Updated at', str(silence.updatedAt.astimezone(tzi))])
     silence_tbl.append(['Created by', str(silence.createdBy)])
     silence_tbl.append(['Comment', silence.comment])
-    if type(silence) == model.GettableSilence:
+    if gettable:
         silence_tbl.append(['State', click.style(silence.status.state.value,
-               fg=silence_state_colors[silence.status.state])])
+               fg=silence_state_colors[silence.status.state.value])])
     matchers = [(m.name, matcher_op_to_str(m), m.value)
                 for m in silence.matchers.__root__]
     silence_tbl.append(['Matchers', tabulate.tabulate(matchers, tablefmt='plain')])
-    if type(silence) == model.GettableSilence:
+    if gettable:
         silence_tbl.append(['SilenceURL', silence_url(silence)])
     click.echo(tabulate.tabulate(silence_tbl))
 
     
 def echo_alert(alert: model.GettableAlert, tzi: tzinfo | None = timezone.utc) -> None:
     """ Print representation of alert """
+    import tabulate
+    from amlib.tools import label_dict
     alert_tbl = []
     alert_tbl.append(['fingerprint', click.style(alert.fingerprint, fg='yellow')])
     alert_tbl.append(['startsAt', str(alert.startsAt.astimezone(tzi))])
     alert_tbl.append(['endsAt', str(alert.endsAt.astimezone(tzi))])
-    alert_tbl.append(['state', click.style(alert.status.state.value, fg=alert_state_colors[alert.status.state])])
+    alert_tbl.append(['state', click.style(alert.status.state.value, fg=alert_state_colors[alert.status.state.value])])
     receivers = [['', rec.name] for rec in alert.receivers]
     if len(receivers) > 0:
         receivers[0][0] = 'receivers'
@@ -72,12 +83,85 @@ def echo_alert(alert: model.GettableAlert, tzi: tzinfo | None = timezone.utc) ->
     if len(inhibitors) > 0:
         inhibitors[0][0] = "inhibitedBy"
         alert_tbl.extend(inhibitors)
-    annotations = [[ann[0], '=', unquote(ann[1])] for ann in alert.annotations]
+    annotations = [[key, '=', unquote(val)] for (key, val) in label_dict(alert.annotations).items()]
     if len(annotations) > 0:
         alert_tbl.append(['annotations', tabulate.tabulate(
             annotations, tablefmt='plain')])
-    labels = [[label[0], '=', label[1]] for label in alert.labels]
+    labels = [[key, '=', val] for (key, val) in label_dict(alert.labels).items()]
     if len(labels) > 0:
         alert_tbl.append(['labels', tabulate.tabulate(labels, tablefmt='plain')])
     alert_tbl.append(['generatorURL', str(alert.generatorURL)])
-    click.echo(tabulate.tabulate(alert_tbl))
\ No newline at end of file
+    click.echo(tabulate.tabulate(alert_tbl))
+
+def parse_duration(value: str, option: str) -> float:
+    """ Parses "2", "2s", "1m30s" into seconds """
+    from pytimeparse.timeparse import timeparse
+    seconds = float(value) if value.replace('.', '', 1).isdigit() else timeparse(value)
+    if seconds is None or seconds <= 0:
+        raise click.BadOptionUsage(option, f'invalid time range format: {value}')
+    return seconds
+
+
+def _labels_str(labels: dict[str, str]) -> str:
+    return '{' + ', '.join(f'{key}="{val}"' for (key, val) in labels.items()) + '}'
+
+
+def echo_alert_change(sign: str, old: model.GettableAlert | None, new: model.GettableAlert | None, tzi: tzinfo | None = timezone.utc) -> None:
+    """ Print one line for an added (+), resolved (-) or changed (~) alert """
+    from amlib.tools import label_dict
+    alert = new if new is not None else old
+    assert alert is not None
+    now = datetime.now(tzi).strftime('%H:%M:%S')
+    fingerprint = click.style(alert.fingerprint, fg='yellow')
+    if new is None:
+        state = click.style('resolved', fg='red')
+    elif old is None:
+        state = click.style(new.status.state.value, fg=alert_state_colors[new.status.state.value])
+    else:
+        state = (click.style(old.status.state.value, fg=alert_state_colors[old.status.state.value]) + ' -> '
+                 + click.style(new.status.state.value, fg=alert_state_colors[new.status.state.value]))
+    extra = ''
+    if new is not None and new.status.silencedBy:
+        extra = f" silencedBy {','.join(new.status.silencedBy)}"
+    if new is not None and new.status.inhibitedBy:
+        extra += f" inhibitedBy {','.join(new.status.inhibitedBy)}"
+    click.echo(f"{now} {sign} {fingerprint} {state} {_labels_str(label_dict(alert.labels))}{extra}")
+
+
+def echo_silence_change(sign: str, old: model.GettableSilence | None, new: model.GettableSilence | None, tzi: tzinfo | None = timezone.utc) -> None:
+    """ Print one line for an added (+), removed (-) or changed (~) silence """
+    from amlib.tools import matcher_op_to_str
+    silence = new if new is not None else old
+    assert silence is not None
+    now = datetime.now(tzi).strftime('%H:%M:%S')
+    matchers = '{' + ', '.join(f'{m.name}{matcher_op_to_str(m)}"{m.value}"' for m in silence.matchers.__root__) + '}'
+    if new is None:
+        state = click.style('removed', fg='red')
+    elif old is None or old.status.state == new.status.state:
+        state = click.style(new.status.state.value, fg=silence_state_colors[new.status.state.value])
+        if old is not None:
+            state += ' updated'
+    else:
+        state = (click.style(old.status.state.value, fg=silence_state_colors[old.status.state.value]) + ' -> '
+                 + click.style(new.status.state.value, fg=silence_state_colors[new.status.state.value]))
+    click.echo(f"{now} {sign} {click.style(silence.id, fg='yellow')} {state} {matchers}"
+               f" until {silence.endsAt.astimezone(tzi).strftime('%Y-%m-%d %H:%M')} by {silence.createdBy}")
+
+
+def echo_watch(diffs: Iterator[Any], echo_change: Callable[..., None], name: str, initial: bool, tzi: tzinfo | None = timezone.utc) -> None:
+    """ Print the changes yielded by amlib.watch.poll until interrupted """
+    try:
+        first = True
+        for diff in diffs:
+            if first and not initial:
+                click.echo(f"{len(diff.added)} {name} found, watching for changes")
+            else:
+                for change in diff.added:
+                    echo_change('+', None, change.new, tzi)
+                for change in diff.changed:
+                    echo_change('~', change.old, change.new, tzi)
+                for change in diff.removed:
+                    echo_change('-', change.old, None, tzi)
+            first = False
+    except KeyboardInterrupt:
+        pass
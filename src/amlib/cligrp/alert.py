@@ -1,8 +1,9 @@
 import click
-import amlib.tools as tools
 from datetime import timezone
 from . import LOCAL_TZ
 from . import echo_alert,echo_silence
+from . import echo_alert_change, echo_watch, parse_duration
+from .output import output_option, alert_renderer, echo_summary, SUMMARY_FORMATS
 
 
 @click.group(name='alert')
@@ -20,35 +21,152 @@ def alert_grp() -> None:
 @click.option('--receiver', type=str, help='alerts sent to a specific receiver')
 @click.option('--local/--utc', 'localtime', default=True, show_default='--local', help='UTC / local timezone')
 @click.option('--find-silences', 'find_silences', is_flag=True, default=False)
+@click.option('--expired-silences/--noexpired-silences', 'expired_silences', default=False, show_default='--noexpired-silences', help='include expired silences in --find-silences')
+@output_option
 @click.argument('label_filter', nargs=-1)
-def alert_filter(fingerprint: str, active: bool, silenced: bool, inhibited: bool, unprocessed: bool, localtime: bool, label_filter: list[str] | None = None, receiver: str | None = None,find_silences: bool = False) -> None:
+def alert_filter(fingerprint: str, active: bool, silenced: bool, inhibited: bool, unprocessed: bool, localtime: bool, label_filter: list[str] | None = None, receiver: str | None = None,find_silences: bool = False, expired_silences: bool = False, output: str = 'detail') -> None:
     """ Find alerts by status, labelsm or receivers, --find-silences allows to filter for matching silences (evaluates regexes also) """
+    import amlib.tools as tools
     tz_info = LOCAL_TZ if localtime else timezone.utc
     if not label_filter:
         label_filter = []
-    # get filtered alerts
-    alerts = tools.get_alerts(
-        active, silenced, inhibited, unprocessed, tuple(label_filter), receiver)
-    # find alerts with matching fingerprint (if selected)
-    if fingerprint:
-        alerts = [alert for alert in alerts if alert.fingerprint == fingerprint]
+    # get filtered alerts, without --find-silences they are printed while the response is received
+    if find_silences:
+        alerts = tools.get_alerts(
+            active, silenced, inhibited, unprocessed, tuple(label_filter), receiver, fingerprint)
+    else:
+        alerts = tools.iter_alerts(
+            active, silenced, inhibited, unprocessed, tuple(label_filter), receiver, fingerprint)
+    if find_silences:
+        from amlib import model
+        states = tuple(model.State) if expired_silences else (model.State.active, model.State.pending)
+        join = tools.join_silences_alerts(alerts, tools.get_silences(states))
+    if output != 'detail':
+        renderer = alert_renderer(output, tz_info, ['silences'] if find_silences else None)
+        for alert in alerts:
+            if find_silences:
+                renderer.add(alert, silences=[silence.id for silence in join.silences_for(alert)])  # type: ignore[attr-defined]
+            else:
+                renderer.add(alert)
+        renderer.close()
+        if not renderer.machine:
+            click.echo(f'{renderer.count} alerts found.' if renderer.count else 'No alerts found.')
+        return
     # print all alerts
+    alert_counter = 0
     for alert in alerts:
+        alert_counter += 1
         echo_alert(alert,tz_info)
         if find_silences:
-            silences = tools.get_silences()
             silence_counter = 0
-            for silence in silences:
-                if tools.is_matching_all(alert.labels, silence.matchers):
-                    echo_silence(silence,tz_info)
-                    silence_counter += 1
+            for silence in join.silences_for(alert):
+                echo_silence(silence,tz_info)
+                silence_counter += 1
             if not silence_counter:
                 click.echo('No silences found')
             else:
                 click.echo(f'{silence_counter} silence(s) found')
-    if not alerts:
+    if not alert_counter:
         click.echo('No alerts found.')
     else :
-        click.echo(f'{len(alerts)} alerts found.')
+        click.echo(f'{alert_counter} alerts found.')
+
+@click.command(name='watch')
+@click.option('--active/--noactive', 'active', default=True,show_default="--active" ,help='allow/deny active alerts')
+@click.option('--silenced/--nosilenced', 'silenced', default=True,show_default="--silenced" ,help='allow/deny silenced alerts')
+@click.option('--inhibited/--noinhibited', 'inhibited', default=False,show_default="--noinhibited" ,help='allow/deny inhibited alerts')
+@click.option('--unprocessed/--nounprocessed', 'unprocessed', default=False,show_default="--nounprocessed", help='allow/deny unprocessed alerts')
+@click.option('--receiver', type=str, help='alerts sent to a specific receiver')
+@click.option('--interval', type=str, default='2s', show_default=True, help='polling interval')
+@click.option('--max-interval', 'max_interval', type=str, default='30s', show_default=True, help='maximum polling interval while nothing changes')
+@click.option('--count', type=click.IntRange(min=1), default=None, help='stop after this number of polls')
+@click.option('--initial', is_flag=True, default=False, help='print the alerts of the first poll, not only their number')
+@click.option('--local/--utc', 'localtime', default=True, show_default='--local', help='UTC / local timezone')
+@click.argument('label_filter', nargs=-1)
+def alert_watch(active: bool, silenced: bool, inhibited: bool, unprocessed: bool, receiver: str | None, interval: str, max_interval: str, count: int | None, initial: bool, localtime: bool, label_filter: tuple[str, ...]) -> None:
+    """ Poll alerts and print new (+), resolved (-) and changed (~) alerts """
+    import amlib.tools as tools
+    from amlib import watch
+    tz_info = LOCAL_TZ if localtime else timezone.utc
+    params = tools.alert_params(active, silenced, inhibited, unprocessed, list(label_filter) or None, receiver)
+    diffs = watch.poll(watch.fetch_alerts(params), watch.alert_snapshot(), parse_duration(interval, '--interval'),
+                       parse_duration(max_interval, '--max-interval'), count=count)
+    echo_watch(diffs, echo_alert_change, 'alerts', initial, tz_info)
+
+@click.command(name='summary')
+@click.option('--by', type=str, default='alertname', show_default=True, help='comma separated label names to group by (@state, @receiver: alert state, receivers)')
+@click.option('--top', type=click.IntRange(min=1), default=None, help='show the N largest groups only')
+@click.option('--active/--noactive', 'active', default=True,show_default="--active" ,help='allow/deny active alerts')
+@click.option('--silenced/--nosilenced', 'silenced', default=True,show_default="--silenced" ,help='allow/deny silenced alerts')
+@click.option('--inhibited/--noinhibited', 'inhibited', default=True,show_default="--inhibited" ,help='allow/deny inhibited alerts')
+@click.option('--unprocessed/--nounprocessed', 'unprocessed', default=False,show_default="--nounprocessed", help='allow/deny unprocessed alerts')
+@click.option('--receiver', type=str, help='alerts sent to a specific receiver')
+@click.option('--local/--utc', 'localtime', default=True, show_default='--local', help='UTC / local timezone')
+@click.option('--output', '-o', 'output', type=click.Choice(SUMMARY_FORMATS), default='table', show_default=True)
+@click.argument('label_filter', nargs=-1)
+def alert_summary(by: str, top: int | None, active: bool, silenced: bool, inhibited: bool, unprocessed: bool, receiver: str | None, localtime: bool, output: str, label_filter: tuple[str, ...]) -> None:
+    """ Count alerts by labels, with silenced / inhibited ratios and oldest startsAt """
+    import amlib.tools as tools
+    from amlib import summary
+    tz_info = LOCAL_TZ if localtime else timezone.utc
+    fields = [name.strip() for name in by.split(',') if name.strip()]
+    alerts = tools.iter_alerts(active, silenced, inhibited, unprocessed, label_filter, receiver)
+    groups = summary.top(summary.summarize_alerts(alerts, fields), top)
+    echo_summary(fields, groups, True, output, tz_info)
+    if not groups and output == 'table':
+        click.echo('No alerts found.')
+
+@click.command(name='groups')
+@click.option('--active/--noactive', 'active', default=True,show_default="--active" ,help='allow/deny active alerts')
+@click.option('--silenced/--nosilenced', 'silenced', default=True,show_default="--silenced" ,help='allow/deny silenced alerts')
+@click.option('--inhibited/--noinhibited', 'inhibited', default=True,show_default="--inhibited" ,help='allow/deny inhibited alerts')
+@click.option('--receiver', type=str, help='groups of a specific receiver')
+@click.option('--expand', '-e', is_flag=True, default=False, help='list the alerts of each group')
+@click.option('--local/--utc', 'localtime', default=True, show_default='--local', help='UTC / local timezone')
+@click.option('--output', '-o', 'output', type=click.Choice(['table', 'jsonl']), default='table', show_default=True)
+@click.argument('label_filter', nargs=-1)
+def alert_groups(active: bool, silenced: bool, inhibited: bool, receiver: str | None, expand: bool, localtime: bool, output: str, label_filter: tuple[str, ...]) -> None:
+    """ Show the alert groups of alertmanager (notification level view) """
+    import json
+    import tabulate
+    import amlib.tools as tools
+    from .output import as_dict, labels_str, json_default
+    tz_info = LOCAL_TZ if localtime else timezone.utc
+    groups = tools.get_alert_groups(active, silenced, inhibited, label_filter, receiver)
+    rows = []
+    for group in groups:
+        states: dict[str, int] = {}
+        for alert in group.alerts:
+            states[alert.status.state.value] = states.get(alert.status.state.value, 0) + 1
+        labels = labels_str(tools.label_dict(group.labels))
+        if output == 'jsonl':
+            data = {'receiver': group.receiver.name, 'labels': dict(tools.label_dict(group.labels)), 'count': len(group.alerts), 'states': states}
+            if expand:
+                data['alerts'] = [as_dict(alert) for alert in group.alerts]
+            click.echo(json.dumps(data, default=json_default))
+            continue
+        oldest = min((alert.startsAt for alert in group.alerts), default=None)
+        row = [group.receiver.name, labels, len(group.alerts), states.get('active', 0), states.get('suppressed', 0),
+               oldest.astimezone(tz_info).strftime('%Y-%m-%d %H:%M:%S') if oldest else '']
+        if not expand:
+            rows.append(row)
+            continue
+        click.echo(click.style(f"{group.receiver.name} {{{labels}}}", bold=True) + f": {len(group.alerts)} alerts")
+        renderer = alert_renderer('table', tz_info)
+        for alert in group.alerts:
+            renderer.add(alert)
+        renderer.close()
+        click.echo()
+    if output == 'jsonl':
+        return
+    if rows:
+        click.echo(tabulate.tabulate(rows, headers=['receiver', 'group labels', 'alerts', 'active', 'suppressed', 'oldest startsAt'], disable_numparse=True))
+    if groups:
+        click.echo(f'{len(groups)} groups, {sum(len(group.alerts) for group in groups)} alerts found.')
+    else:
+        click.echo('No alert groups found.')
 
 alert_grp.add_command(alert_filter)
+alert_grp.add_command(alert_summary)
+alert_grp.add_command(alert_groups)
+alert_grp.add_command(alert_watch)
@@ -0,0 +1,178 @@
+from __future__ import annotations
+import csv
+import json
+import sys
+from datetime import datetime, timezone, tzinfo
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Callable
+import click
+from . import alert_state_colors, silence_state_colors
+if TYPE_CHECKING:
+    import amlib.model as model
+
+# detail: the existing per-object view (echo_alert / echo_silence)
+OUTPUT_FORMATS = ['detail', 'table', 'wide', 'jsonl', 'csv']
+
+Column = tuple[str, Callable[[Any], Any]]
+
+
+def output_option(func: Callable[..., Any]) -> Callable[..., Any]:
+    """ --output/-o option of the listing commands """
+    return click.option('--output', '-o', 'output', type=click.Choice(OUTPUT_FORMATS), default='detail', show_default=True,
+                        help='detail view, one table (wide: more columns), JSON lines or CSV')(func)
+
+
+def labels_str(labels: dict[str, str]) -> str:
+    return ','.join(f'{key}={val}' for (key, val) in sorted(labels.items()))
+
+
+def matchers_str(matchers: model.Matchers) -> str:
+    from amlib.tools import matcher_op_to_str
+    return ','.join(f'{m.name}{matcher_op_to_str(m)}"{m.value}"' for m in matchers.__root__)
+
+
+def _time(tzi: tzinfo | None) -> Callable[[datetime], str]:
+    return lambda dt: dt.astimezone(tzi).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def alert_columns(wide: bool, tzi: tzinfo | None = timezone.utc) -> list[Column]:
+    from amlib.tools import label_dict
+    fmt = _time(tzi)
+    columns: list[Column] = [
+        ('fingerprint', lambda a: a.fingerprint),
+        ('state', lambda a: a.status.state.value),
+        ('startsAt', lambda a: fmt(a.startsAt)),
+    ]
+    if wide:
+        columns += [
+            ('endsAt', lambda a: fmt(a.endsAt)),
+            ('receivers', lambda a: ','.join(rec.name for rec in a.receivers)),
+            ('silencedBy', lambda a: ','.join(a.status.silencedBy)),
+            ('inhibitedBy', lambda a: ','.join(a.status.inhibitedBy)),
+        ]
+    columns.append(('labels', lambda a: labels_str(label_dict(a.labels))))
+    if wide:
+        columns += [
+            ('annotations', lambda a: labels_str(label_dict(a.annotations))),
+            ('generatorURL', lambda a: a.generatorURL or ''),
+        ]
+    return columns
+
+
+def silence_columns(wide: bool, tzi: tzinfo | None = timezone.utc) -> list[Column]:
+    fmt = _time(tzi)
+    columns: list[Column] = [
+        ('id', lambda s: s.id),
+        ('state', lambda s: s.status.state.value),
+    ]
+    if wide:
+        columns += [
+            ('startsAt', lambda s: fmt(s.startsAt)),
+            ('updatedAt', lambda s: fmt(s.updatedAt)),
+        ]
+    columns += [
+        ('endsAt', lambda s: fmt(s.endsAt)),
+        ('createdBy', lambda s: s.createdBy),
+        ('matchers', lambda s: matchers_str(s.matchers)),
+    ]
+    if wide:
+        columns.append(('comment', lambda s: s.comment))
+    return columns
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, '__root__'):
+        return value.__root__
+    return str(value)
+
+
+def as_dict(obj: Any) -> dict[str, Any]:
+    """ Returns an alert or silence (model or record) in the shape of the API """
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    return obj.dict()
+
+
+class Renderer:
+    """ Prints alerts or silences as one table (laid out once for all rows at close),
+    or streams them as JSON lines / CSV rows while they are added """
+
+    def __init__(self, fmt: str, columns: list[Column], extra: list[str] | None = None, colors: dict[str, str] | None = None) -> None:
+        self.fmt = fmt
+        self.columns = columns
+        self.extra = extra or []
+        self.colors = colors or {}
+        self.rows: list[list[Any]] = []
+        self.count = 0
+        self._csv: Any = None
+
+    def add(self, obj: Any, **extra: Any) -> None:
+        self.count += 1
+        if self.fmt == 'jsonl':
+            data = as_dict(obj)
+            data.update(extra)
+            click.echo(json.dumps(data, default=json_default))
+            return
+        row = [getter(obj) for (_, getter) in self.columns] + [extra.get(name, '') for name in self.extra]
+        if self.fmt == 'csv':
+            if self._csv is None:
+                self._csv = csv.writer(sys.stdout, lineterminator='\n')
+                self._csv.writerow([name for (name, _) in self.columns] + self.extra)
+            self._csv.writerow([','.join(val) if isinstance(val, list) else val for val in row])
+            return
+        if self.colors and row[1] in self.colors:
+            row[1] = click.style(row[1], fg=self.colors[row[1]])
+        self.rows.append([','.join(val) if isinstance(val, list) else val for val in row])
+
+    def close(self) -> None:
+        if self.fmt in ('table', 'wide') and self.rows:
+            import tabulate
+            click.echo(tabulate.tabulate(self.rows, headers=[name for (name, _) in self.columns] + self.extra, disable_numparse=True))
+
+    @property
+    def machine(self) -> bool:
+        """ jsonl and csv print records only, no summary lines """
+        return self.fmt in ('jsonl', 'csv')
+
+
+def alert_renderer(fmt: str, tzi: tzinfo | None = timezone.utc, extra: list[str] | None = None) -> Renderer:
+    return Renderer(fmt, alert_columns(fmt != 'table', tzi), extra, alert_state_colors)
+
+
+def silence_renderer(fmt: str, tzi: tzinfo | None = timezone.utc, extra: list[str] | None = None) -> Renderer:
+    return Renderer(fmt, silence_columns(fmt != 'table', tzi), extra, silence_state_colors)
+
+
+SUMMARY_FORMATS = ['table', 'jsonl', 'csv']
+
+
+def echo_summary(by: list[str], groups: list[tuple[tuple[str, ...], Any]], alerts: bool, fmt: str = 'table', tzi: tzinfo | None = timezone.utc) -> None:
+    """ Print group-by summaries (amlib.summary) as table, JSON lines or CSV """
+    fmt_time = _time(tzi)
+    headers = by + ['count'] + (['silenced', 'inhibited'] if alerts else []) + ['oldest startsAt', 'first endsAt']
+    rows = []
+    for key, stats in groups:
+        row: list[Any] = list(key) + [stats.count]
+        if alerts:
+            row += [f'{stats.silenced_ratio:.0%}', f'{stats.inhibited_ratio:.0%}']
+        row += [fmt_time(stats.oldest), fmt_time(stats.first_end)]
+        rows.append(row)
+    if fmt == 'jsonl':
+        for key, stats in groups:
+            data: dict[str, Any] = dict(zip(by, key))
+            data['count'] = stats.count
+            if alerts:
+                data.update(silenced=stats.silenced, inhibited=stats.inhibited)
+            data.update(oldestStartsAt=stats.oldest.isoformat(), firstEndsAt=stats.first_end.isoformat())
+            click.echo(json.dumps(data))
+    elif fmt == 'csv':
+        writer = csv.writer(sys.stdout, lineterminator='\n')
+        writer.writerow(headers)
+        writer.writerows(rows)
+    elif rows:
+        import tabulate
+        click.echo(tabulate.tabulate(rows, headers=headers, disable_numparse=True))
@@ -0,0 +1,27 @@
+import click
+
+
+@click.command(name='receive')
+@click.option('--listen', type=str, default='127.0.0.1:9097', show_default=True, help='address to listen on (host:port)')
+@click.option('--queue-size', 'queue_size', type=click.IntRange(min=1), default=1024, show_default=True, help='maximum number of queued webhook payloads')
+@click.option('--batch-size', 'batch_size', type=click.IntRange(min=1), default=64, show_default=True, help='maximum number of payloads applied at once')
+def receive_cmd(listen: str, queue_size: int, batch_size: int) -> None:
+    """ Receive alertmanager webhooks and serve the current alerts locally.
+
+    Point a webhook receiver (send_resolved: true) to http://LISTEN/webhook,
+    the alerts can be read from http://LISTEN/api/v2/alerts like from alertmanager. """
+    from amlib.receiver import WebhookStore, make_server
+    host, _, port = listen.rpartition(':')
+    if not port.isdigit():
+        raise click.BadOptionUsage('--listen', f'invalid address: {listen}')
+    store = WebhookStore(queue_size, batch_size)
+    store.start()
+    server = make_server(store, host or '127.0.0.1', int(port))
+    click.echo(f"Receiving webhooks on http://{listen}/webhook, alerts on http://{listen}/api/v2/alerts", err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        store.stop()
@@ -1,11 +1,13 @@
 from email.policy import default
-import click, getpass
+import click, getpass, sys
 from datetime import datetime,timezone,date,time,timedelta
-from pytimeparse.timeparse import timeparse
 
-from amlib import tools, model
+# amlib.tools/model and pytimeparse are imported within the commands, to keep amcli startup fast
+from amlib.config import DEFAULT_PARALLEL
 from . import LOCAL_TZ, DT_FORMATS
 from . import echo_silence, echo_alert
+from . import echo_silence_change, echo_watch, parse_duration
+from .output import output_option, silence_renderer, echo_summary, SUMMARY_FORMATS
 
 
 
@@ -13,6 +15,34 @@ from . import echo_silence, echo_alert
 def silence_grp() -> None:
     """Commands for handling silences"""
 
+
+def render_silences(silences: list, join: object | None, output: str, has_alerts: bool, tz_info: object) -> int:
+    """Prints silences in a --output format other than detail (with the number of matching alerts if joined), returns their number"""
+    renderer = silence_renderer(output, tz_info, ['alerts'] if join is not None else None)  # type: ignore[arg-type]
+    for silence in silences:
+        if join is None:
+            renderer.add(silence)
+            continue
+        alerts = join.alerts_for(silence)  # type: ignore[attr-defined]
+        if has_alerts and not alerts:
+            continue
+        renderer.add(silence, alerts=len(alerts))
+    renderer.close()
+    if not renderer.machine:
+        click.echo(f"Found {renderer.count} silences" if renderer.count else "No silences found")
+    return renderer.count
+
+
+def silence_ids_from_args(silence_id: tuple[str, ...]) -> list[str]:
+    """Returns the given silence ids, "-" reads whitespace separated ids from stdin"""
+    ids = [sid for sid in silence_id if sid != '-']
+    if '-' in silence_id:
+        ids.extend(sys.stdin.read().split())
+    if not ids:
+        raise click.UsageError('no silence id given (use "-" to read ids from stdin)')
+    return ids
+
+
 @click.command(name='filter')
 @click.option('--active/--noactive', default=True, show_default='--active')
 @click.option('--pending/--nopending', default=True, show_default='--pending')
@@ -20,9 +50,12 @@ def silence_grp() -> None:
 @click.option('--local/--utc', 'localtime', default=True, show_default='--local', help='UTC / local timezone')
 @click.option('--has-alerts', 'has_alerts', is_flag=True, default=False, help='Show only silences with matching alerts')
 @click.option('--show-alerts', 'show_alerts', is_flag=True, default=False, help='Show alerts that match the silence')
+@click.option('--quiet', '-q', 'quiet', is_flag=True, default=False, help='Print silence ids only (i.e. for piping into "silence delete -")')
+@output_option
 @click.argument('match_filter', nargs=-1)
-def silence_filter(active: bool, pending: bool, expired: bool, localtime: bool, has_alerts:bool, show_alerts: bool, match_filter: list[str] | None = None) -> None:
+def silence_filter(active: bool, pending: bool, expired: bool, localtime: bool, has_alerts:bool, show_alerts: bool, quiet: bool, match_filter: list[str] | None = None, output: str = 'detail') -> None:
     """ Filter silences by state or matchers """
+    from amlib import tools, model
     tz_info = LOCAL_TZ if localtime else timezone.utc
     statelist = []
     if active:
@@ -33,11 +66,18 @@ def silence_filter(active: bool, pending: bool, expired: bool, localtime: bool,
         statelist.append(model.State.expired)
     silences = tools.get_silences(tuple(statelist), tuple(match_filter)) if match_filter else tools.get_silences(tuple(statelist))
     silence_counter = 0
+    join = tools.join_silences_alerts(None, silences)
+    if output != 'detail' and not quiet:
+        render_silences(silences, join, output, has_alerts, tz_info)
+        return
     for silence in silences:
-        alerts = tools.find_alerts(silence)
+        alerts = join.alerts_for(silence)
         if has_alerts and not alerts:
             continue
         silence_counter += 1
+        if quiet:
+            click.echo(silence.id)
+            continue
         echo_silence(silence, tz_info)
         if show_alerts:
             for alert in alerts:
@@ -46,6 +86,8 @@ def silence_filter(active: bool, pending: bool, expired: bool, localtime: bool,
             click.echo(f"Found {len(alerts)} alerts matching this silence")
         else:
             click.echo("No alerts match this silence")
+    if quiet:
+        return
     if silence_counter == 0:
         click.echo("No silences found")
     else:
@@ -53,16 +95,19 @@ def silence_filter(active: bool, pending: bool, expired: bool, localtime: bool,
 
 
 @click.command(name='delete')
+@click.option('--parallel', '-p', type=click.IntRange(min=1), default=DEFAULT_PARALLEL, show_default=True, help='number of concurrent requests')
 @click.argument('silence_id', nargs=-1)
-def silence_delete(silence_id: str) -> None:
-    """delete silences by id"""
-    for sid in silence_id:
-        okay = tools.expire_silence(sid)
-        if okay:
+def silence_delete(silence_id: tuple[str, ...], parallel: int) -> None:
+    """delete silences by id ("-" reads ids from stdin)"""
+    from amlib import tools
+    for sid, okay in tools.expire_silences(silence_ids_from_args(silence_id), parallel):
+        if isinstance(okay, Exception):
+            click.echo(f'SilenceID: {sid} ' + click.style('*ERROR*', fg='red') + f' {okay}')
+        elif okay:
             click.echo(f'SilenceID: {sid} ' +
                        click.style('*DELETED*', fg='green'))
         else:
-            click.echo(f'SilenceID: {sid} ' + click.style('*ERROR*', fg='red'))
+            click.echo(f'SilenceID: {sid} ' + click.style('*NOT FOUND*', fg='red'))
 
 
 @click.command(name="expires")
@@ -74,8 +119,11 @@ def silence_delete(silence_id: str) -> None:
 @click.option('--pending/--nopending', 'pending', default=True, show_default='--pending', help='include or exclude pending silences')
 @click.option('--has-alerts', 'has_alerts', is_flag=True, default=False, help='Show only silences with matching alerts')
 @click.option('--show-alerts', 'show_alerts', is_flag=True, default=False, help='Show alerts that match the silence')
-def silence_expires(localtime: bool, before: datetime | None, after: datetime | None, within: str | None, notwithin: str | None, pending: bool, has_alerts: bool, show_alerts: bool) -> None:
+@output_option
+def silence_expires(localtime: bool, before: datetime | None, after: datetime | None, within: str | None, notwithin: str | None, pending: bool, has_alerts: bool, show_alerts: bool, output: str = 'detail') -> None:
     """Search for silences that will expire"""
+    from pytimeparse.timeparse import timeparse
+    from amlib import tools, model
     tz_info = LOCAL_TZ if localtime else timezone.utc
 
     if len([opt for opt in (before, after, within, notwithin) if opt is not None]) != 1:
@@ -84,43 +132,44 @@ def silence_expires(localtime: bool, before: datetime | None, after: datetime |
     stats = [model.State.active]
     if pending:
         stats.append(model.State.pending)
-    silence_list = tools.get_silences(tuple(stats))
 
-    expiry_date = None
+    ends_before = None
     if within:
         within_secs = timeparse(within)
         if not within_secs:
             raise click.BadOptionUsage('--within','invalid time range format')
-        expiry_date = datetime.now(tz_info) + timedelta(seconds=within_secs)
+        ends_before = datetime.now(tz_info) + timedelta(seconds=within_secs)
     if before:
         if before.date() == date(1900, 1, 1):
             before = datetime.combine(datetime.now(tz_info).date(), time(
                 before.hour, before.minute, before.second), tz_info)
-        expiry_date = before.astimezone(tz_info)
-        if expiry_date < datetime.now(tz_info):
-            expiry_date += timedelta(days=1)
-    if expiry_date:
-        silence_list = [silence for silence in silence_list if silence.endsAt < expiry_date]
+        ends_before = before.astimezone(tz_info)
+        if ends_before < datetime.now(tz_info):
+            ends_before += timedelta(days=1)
 
+    ends_after = None
     if notwithin:
         notwithin_secs = timeparse(notwithin)
         if not notwithin_secs:
             raise click.BadOptionUsage('--notwithin','invalid time range format')
-        expiry_date = datetime.now(tz_info) + timedelta(seconds=notwithin_secs)
+        ends_after = datetime.now(tz_info) + timedelta(seconds=notwithin_secs)
     if after:
         if after.date() == date(1900, 1, 1):
             after = datetime.combine(datetime.now(tz_info).date(), time(
                 after.hour, after.minute, after.second), tz_info)
             if after < datetime.now(tz_info):
                 after += timedelta(days=1)
-        expiry_date = after.astimezone(tz_info)
-    if any((notwithin,after)) and expiry_date:
-        silence_list = [silence for silence in silence_list if silence.endsAt > expiry_date]
+        ends_after = after.astimezone(tz_info)
+    # range query on the silences ordered by endsAt
+    silence_list = tools.silence_store(stats).ends_between(ends_after, ends_before)
 
-    if silence_list:
+    if silence_list and output != 'detail':
+        render_silences(silence_list, tools.join_silences_alerts(None, silence_list), output, has_alerts, tz_info)
+    elif silence_list:
         silence_counter = 0
+        join = tools.join_silences_alerts(None, silence_list)
         for silence in silence_list:
-            alerts = tools.find_alerts(silence)
+            alerts = join.alerts_for(silence)
             if has_alerts and not alerts:
                 continue
             silence_counter += 1
@@ -145,8 +194,11 @@ def silence_expires(localtime: bool, before: datetime | None, after: datetime |
 @click.option('--local/--utc', 'localtime', default=True, show_default='--local', help='UTC / local timezone')
 @click.option('--after', '-a', type=click.DateTime(formats=DT_FORMATS), default=None, help='silence expired after given date/time (overrides "--within")')
 @click.option('--within', '-w', type=str, default=None, help='silence expires within given timerange (i.e.: "2h30m")')
-def silence_expired(localtime: bool, after: datetime | None, within: str | None) -> None:
+@output_option
+def silence_expired(localtime: bool, after: datetime | None, within: str | None, output: str = 'detail') -> None:
     """Search for expired silences"""
+    from pytimeparse.timeparse import timeparse
+    from amlib import tools, model
     tz_info = LOCAL_TZ if localtime else timezone.utc
     # expiry_date = None
     if after is None and within is None:
@@ -160,10 +212,10 @@ def silence_expired(localtime: bool, after: datetime | None, within: str | None)
                 after.hour, after.minute, after.second), tz_info)
         expiry_date = after.astimezone(tz_info)
 
-    silence_list = tools.get_silences(tuple([model.State.expired]))
-    if silence_list:
-        silence_list = [
-            silence for silence in silence_list if silence.endsAt > expiry_date]
+    silence_list = tools.silence_store([model.State.expired]).ends_after(expiry_date)
+    if output != 'detail':
+        render_silences(silence_list, None, output, False, tz_info)
+    elif silence_list:
         for silence in silence_list:
             echo_silence(silence, tz_info)
         if silence_list:
@@ -187,6 +239,8 @@ def silence_expired(localtime: bool, after: datetime | None, within: str | None)
 @click.argument('matcher', nargs=-1)
 def silence_modify(sid: str, start: datetime, duration: str, end: datetime, creator: str, comment: str, matcher: list[str], noop: bool, show_alerts:bool, localtime: bool) -> None:
     """modify existing silence"""
+    from pytimeparse.timeparse import timeparse
+    from amlib import tools, model
     tz_info = LOCAL_TZ if localtime else timezone.utc
     silence = tools.get_silence(sid)
     if silence:
@@ -221,7 +275,8 @@ def silence_modify(sid: str, start: datetime, duration: str, end: datetime, crea
             silence.matchers = model.Matchers.parse_obj(matchers)
         if noop:
             echo_silence(silence)
-            alerts = tools.find_alerts(silence)
+            # the edited matchers are evaluated locally, status.silencedBy reflects the saved ones
+            alerts = tools.join_silences_alerts(None, [silence], use_status=False).alerts_for(silence)
             if show_alerts:
                 for alert in alerts:
                     echo_alert(alert)
@@ -253,6 +308,8 @@ def silence_modify(sid: str, start: datetime, duration: str, end: datetime, crea
 @click.argument('matcher', nargs=-1)
 def silence_create(start: datetime, duration: str | None, end: datetime, creator: str, comment: str, matcher: list[str], noop: bool, show_alerts: bool,  localtime: bool, verbose:bool) -> None:
     """create a new silence"""
+    from pytimeparse.timeparse import timeparse
+    from amlib import tools, model
     tz_info = LOCAL_TZ if localtime else timezone.utc
     if start.date() == date(1900, 1, 1):  # no date is set (just time)
         start = datetime.combine(datetime.now(tz_info).date(), time(
@@ -284,7 +341,7 @@ def silence_create(start: datetime, duration: str | None, end: datetime, creator
     )
     if noop:
         echo_silence(silence, tz_info)
-        alerts = tools.find_alerts(silence)
+        alerts = tools.join_silences_alerts(None, [silence]).alerts_for(silence)
         if show_alerts:
             for alert in alerts:
                 echo_alert(alert, tz_info)
@@ -305,18 +362,87 @@ def silence_create(start: datetime, duration: str | None, end: datetime, creator
             raise click.UsageError(str(res))
 
 
+@click.command(name='apply')
+@click.option('--file', '-f', 'path', type=click.Path(exists=True, dir_okay=False), required=True, help='YAML or CSV file with one silence per entry')
+@click.option('--format', 'fmt', type=click.Choice(['yaml', 'csv']), default=None, show_default='(file extension)')
+@click.option('--duration', '-d', type=str, default=None, help='Duration of entries without endsAt/duration')
+@click.option('--creator', '-u', type=str, default=getpass.getuser(), show_default='(current user)', help='Creator of entries without createdBy')
+@click.option('--comment', '-t', type=str, default=None, help='Comment of entries without comment')
+@click.option('--parallel', '-p', type=click.IntRange(min=1), default=DEFAULT_PARALLEL, show_default=True, help='number of concurrent requests')
+@click.option('--local/--utc', 'localtime', default=True, show_default='--local', help='UTC / local timezone (of times without timezone)')
+@click.option('--noop', is_flag=True, help="Do nothing - just show the impact.")
+@click.option('--show-alerts', 'show_alerts', is_flag=True, default=False, help='Show the alerts matched by the new silences')
+def silence_apply(path: str, fmt: str | None, duration: str | None, creator: str, comment: str | None, parallel: int, localtime: bool, noop: bool, show_alerts: bool) -> None:
+    """create the silences of a file, skipping existing ones (same matchers and comment)"""
+    import tabulate
+    from amlib import tools, model, silencefile
+    from .output import matchers_str
+    tz_info = LOCAL_TZ if localtime else timezone.utc
+    try:
+        entries = silencefile.read_entries(path, fmt)
+    except (OSError, ValueError) as err:
+        raise click.UsageError(str(err))
+    defaults = {'duration': duration, 'createdBy': creator, 'comment': comment}
+    silences: list[model.Silence] = []
+    invalid = []
+    for num, entry in enumerate(entries, 1):
+        try:
+            silences.append(silencefile.build_silence(entry, defaults, tz_info))
+        except ValueError as err:
+            invalid.append(f'entry {num}: {err}')
+    if invalid:
+        raise click.UsageError('\n'.join(invalid))
+    existing = tools.get_silences((model.State.active, model.State.pending))
+    # one impact preview: all new silences against one alert snapshot
+    join = tools.join_silences_alerts(None, silences)
+    known = {tools.silence_identity(silence): silence.id for silence in existing}
+    rows = []
+    for num, silence in enumerate(silences, 1):
+        sid = known.get(tools.silence_identity(silence))
+        rows.append([num, matchers_str(silence.matchers), silence.comment, silence.endsAt.astimezone(tz_info).strftime('%Y-%m-%d %H:%M:%S'),
+                     len(join.alerts_for(silence)), f'exists {sid}' if sid else 'new'])
+    click.echo(tabulate.tabulate(rows, headers=['#', 'matchers', 'comment', 'endsAt', 'alerts', 'silence'], disable_numparse=True))
+    alerts = join.alerts_with_silences()
+    click.echo(f'{len(silences)} silences ({sum(1 for row in rows if row[-1] == "new")} new) match {len(alerts)} alerts, '
+               f'{sum(1 for alert in alerts if not alert.status.silencedBy)} of them not silenced yet')
+    if show_alerts:
+        for alert in alerts:
+            echo_alert(alert, tz_info)
+    if noop:
+        return
+    failed = 0
+    for num, result in enumerate(tools.apply_silences(silences, parallel, existing), 1):
+        if result.status == 'created':
+            click.echo(f'entry {num}: ' + click.style('*CREATED*', fg='green') + f' {result.detail}')
+        elif result.status == 'failed':
+            failed += 1
+            click.echo(f'entry {num}: ' + click.style('*ERROR*', fg='red') + f' {result.detail}')
+        else:
+            click.echo(f'entry {num}: ' + click.style('*SKIPPED*', fg='yellow') +
+                       (f' exists {result.detail}' if result.status == 'exists' else ' duplicate entry'))
+    if failed:
+        exit(1)
+
+
 @click.command(name="show")
 @click.option('--local/--utc', 'localtime', default=True, show_default='--local', help='UTC / local timezone')
 @click.option('--show-alerts', 'show_alerts', is_flag=True, default=False)
+@click.option('--parallel', '-p', type=click.IntRange(min=1), default=DEFAULT_PARALLEL, show_default=True, help='number of concurrent requests')
 @click.argument('silence_id', type=str, nargs=-1)
-def silence_show(localtime: bool, silence_id: str, show_alerts: bool) -> None:
-    """show all information of a given silence id"""
+def silence_show(localtime: bool, silence_id: tuple[str, ...], show_alerts: bool, parallel: int) -> None:
+    """show all information of a given silence id ("-" reads ids from stdin)"""
+    from amlib import tools
     tz_info = LOCAL_TZ if localtime else timezone.utc
-    for s_id in silence_id:
-        silence = tools.get_silence(s_id)
-        if silence:
+    silences = tools.get_silences_by_id(silence_ids_from_args(silence_id), parallel)
+    join = tools.join_silences_alerts(None, [silence for (_, silence) in silences if silence and not isinstance(silence, Exception)])
+    for s_id, silence in silences:
+        if isinstance(silence, Exception):
+            click.echo(f'SilenceID: {s_id} ' + click.style('*ERROR*', fg='red') + f' {silence}', err=True)
+        elif not silence:
+            click.echo(f'SilenceID: {s_id} ' + click.style('*NOT FOUND*', fg='red'), err=True)
+        else:
             echo_silence(silence, tz_info)
-            alerts = tools.find_alerts(silence)
+            alerts = join.alerts_for(silence)
             if show_alerts:
                 for alert in alerts:
                     echo_alert(alert, tz_info)
@@ -325,10 +451,51 @@ def silence_show(localtime: bool, silence_id: str, show_alerts: bool) -> None:
             else:
                 click.echo('No alerts found.')
 
+@click.command(name='watch')
+@click.option('--interval', type=str, default='2s', show_default=True, help='polling interval')
+@click.option('--max-interval', 'max_interval', type=str, default='30s', show_default=True, help='maximum polling interval while nothing changes')
+@click.option('--count', type=click.IntRange(min=1), default=None, help='stop after this number of polls')
+@click.option('--initial', is_flag=True, default=False, help='print the silences of the first poll, not only their number')
+@click.option('--local/--utc', 'localtime', default=True, show_default='--local', help='UTC / local timezone')
+@click.argument('match_filter', nargs=-1)
+def silence_watch(interval: str, max_interval: str, count: int | None, initial: bool, localtime: bool, match_filter: tuple[str, ...]) -> None:
+    """ Poll silences and print new (+), removed (-) and changed (~) silences """
+    from amlib import watch
+    tz_info = LOCAL_TZ if localtime else timezone.utc
+    diffs = watch.poll(watch.fetch_silences({'filter': list(match_filter)}), watch.silence_snapshot(),
+                       parse_duration(interval, '--interval'), parse_duration(max_interval, '--max-interval'), count=count)
+    echo_watch(diffs, echo_silence_change, 'silences', initial, tz_info)
+
+
+@click.command(name='summary')
+@click.option('--by', type=str, default='createdBy,state', show_default=True, help='comma separated fields to group by: createdBy, state, comment or a matcher label name')
+@click.option('--top', type=click.IntRange(min=1), default=None, help='show the N largest groups only')
+@click.option('--active/--noactive', default=True, show_default='--active')
+@click.option('--pending/--nopending', default=True, show_default='--pending')
+@click.option('--expired/--noexpired', default=False, show_default='--noexpired')
+@click.option('--local/--utc', 'localtime', default=True, show_default='--local', help='UTC / local timezone')
+@click.option('--output', '-o', 'output', type=click.Choice(SUMMARY_FORMATS), default='table', show_default=True)
+@click.argument('match_filter', nargs=-1)
+def silence_summary(by: str, top: int | None, active: bool, pending: bool, expired: bool, localtime: bool, output: str, match_filter: tuple[str, ...]) -> None:
+    """ Count silences by creator, state or matchers, with oldest startsAt and first endsAt """
+    from amlib import tools, model, summary
+    tz_info = LOCAL_TZ if localtime else timezone.utc
+    statelist = [state for (state, selected) in ((model.State.active, active), (model.State.pending, pending), (model.State.expired, expired)) if selected]
+    fields = [name.strip() for name in by.split(',') if name.strip()]
+    silences = tools.iter_silences(tuple(statelist), match_filter)
+    groups = summary.top(summary.summarize_silences(silences, fields), top)
+    echo_summary(fields, groups, False, output, tz_info)
+    if not groups and output == 'table':
+        click.echo("No silences found")
+
+
 silence_grp.add_command(silence_filter)
 silence_grp.add_command(silence_show)
 silence_grp.add_command(silence_create)
+silence_grp.add_command(silence_apply)
 silence_grp.add_command(silence_modify)
 silence_grp.add_command(silence_delete)
 silence_grp.add_command(silence_expires)
-silence_grp.add_command(silence_expired)
\ No newline at end of file
+silence_grp.add_command(silence_expired)
+silence_grp.add_command(silence_watch)
+silence_grp.add_command(silence_summary)
\ No newline at end of file
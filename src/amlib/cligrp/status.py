@@ -1,10 +1,14 @@
-import click, tabulate
+from __future__ import annotations
+import click
 from datetime import timezone,tzinfo
-from amlib import tools, model
+from typing import TYPE_CHECKING
 from . import LOCAL_TZ
+if TYPE_CHECKING:
+    from amlib import model
 
 def echo_status(status: model.AlertmanagerStatus, tzi: tzinfo | None = timezone.utc) -> None:
     """ Print representation of status """
+    import tabulate
     stat_tbl = []
     cluster_info = [['Name', status.cluster.name]]
     cluster_info.append(['Status',status.cluster.status.value])
@@ -32,15 +36,48 @@ def status_grp() -> None:
 @click.option('--local/--utc', 'localtime', default=True, show_default='--local', help='UTC / local timezone')
 def status_show(localtime:bool) -> None:
     """ Show status of alertmanager """
+    from amlib import tools
+    from amlib.config import instance_names
     tz_info = LOCAL_TZ if localtime else timezone.utc
-    status = tools.get_status()
-    echo_status(status,tz_info)
+    if len(instance_names()) == 1:
+        echo_status(tools.get_status(), tz_info)
+        return
+    statuses = tools.get_statuses()
+    for name in instance_names():
+        click.echo(f"Instance: {name}")
+        if name in statuses.results:
+            echo_status(statuses.results[name], tz_info)
+        else:
+            click.echo(f"UNREACHABLE: {statuses.errors[name]}")
 
 @click.command(name='config')
 def status_config() -> None:
     """ Show config of alertmanager """
+    from amlib import tools
     config = tools.get_status().config.original
     click.echo(config)
 
+@click.command(name='probe')
+@click.option('--slow', type=float, default=1.0, show_default=True, help='Flag instances answering slower (seconds)')
+@click.pass_context
+def status_probe(ctx: click.Context, slow: float) -> None:
+    """ Probe all instances concurrently, compare config, version and peers.
+    Exits with 1 if an instance is unreachable, slow or diverging. """
+    import tabulate
+    from amlib import tools
+    probes = tools.probe_instances()
+    issues = tools.probe_issues(probes, slow)
+    rows = []
+    for probe in probes:
+        if probe.status is None:
+            rows.append([probe.instance, f"{probe.latency:.3f}", '', '', '', '', '\n'.join(issues[probe.instance])])
+            continue
+        rows.append([probe.instance, f"{probe.latency:.3f}", probe.status.cluster.status.value, probe.peer_count,
+                     probe.status.versionInfo.version, probe.config_hash, '\n'.join(issues[probe.instance])])
+    click.echo(tabulate.tabulate(rows, headers=['Instance', 'Latency (s)', 'Cluster', 'Peers', 'Version', 'Config', 'Issues']))
+    if any(issues.values()):
+        ctx.exit(1)
+
 status_grp.add_command(status_show)
-status_grp.add_command(status_config)
\ No newline at end of file
+status_grp.add_command(status_config)
+status_grp.add_command(status_probe)
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""Columnar alert table for vectorized matcher evaluation (requires numpy: pip install pylerttool[columnar])
+
+Every label name becomes a dictionary-encoded integer column (-1 where the label is missing).
+Equality matchers compare whole columns against one code, regex matchers are evaluated
+once per distinct label value and broadcast through the codes. tools.is_matching_all
+stays the reference implementation."""
+
+from typing import TYPE_CHECKING, Any, Iterable
+
+from amlib import model
+from amlib.tools import CompiledMatcher, CompiledMatchers, compile_matchers, label_dict
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError as err:
+        raise ImportError("amlib.columnar requires numpy, install pylerttool[columnar]") from err
+    return numpy
+
+
+class AlertTable:
+    """Alerts stored column-wise, one dictionary-encoded column per label name."""
+
+    def __init__(self, alerts: Iterable[model.GettableAlert]) -> None:
+        np = _numpy()
+        self.alerts: list[model.GettableAlert] = list(alerts)
+        self.values: dict[str, list[str]] = {}
+        self._codes: dict[str, dict[str, int]] = {}
+        raw: dict[str, list[int]] = {}
+        size = len(self.alerts)
+        for pos, alert in enumerate(self.alerts):
+            for name, value in label_dict(alert.labels).items():
+                codes = self._codes.get(name)
+                if codes is None:
+                    codes = self._codes[name] = {}
+                    self.values[name] = []
+                    raw[name] = [-1] * size
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(codes)
+                    self.values[name].append(value)
+                raw[name][pos] = code
+        self.columns: dict[str, "np.ndarray"] = {name: np.array(col, dtype=np.int32) for (name, col) in raw.items()}
+
+    def __len__(self) -> int:
+        return len(self.alerts)
+
+    def _matcher_mask(self, matcher: CompiledMatcher) -> "np.ndarray":
+        np = _numpy()
+        column = self.columns.get(matcher.name)
+        if column is None:
+            return np.zeros(len(self.alerts), dtype=bool)
+        if matcher.regex is None:
+            code = self._codes[matcher.name].get(matcher.value, -2)
+            if matcher.isEqual:
+                return column == code
+            return (column != code) & (column >= 0)
+        # one regex evaluation per distinct value, the extra last entry is hit by missing labels (-1)
+        hits = np.fromiter((matcher.matches(value) for value in self.values[matcher.name]),
+                           dtype=bool, count=len(self.values[matcher.name]))
+        return np.append(hits, False)[column]
+
+    def mask(self, matchers: model.Matchers | CompiledMatchers) -> "np.ndarray":
+        """Returns a boolean array marking all alerts matched by all matchers."""
+        np = _numpy()
+        result = np.ones(len(self.alerts), dtype=bool)
+        for matcher in compile_matchers(matchers).matchers:
+            result &= self._matcher_mask(matcher)
+            if not result.any():
+                break
+        return result
+
+    def find(self, matchers: model.Matchers | CompiledMatchers) -> list[model.GettableAlert]:
+        """Returns all alerts matching the given matchers, in table order."""
+        return [self.alerts[pos] for pos in _numpy().flatnonzero(self.mask(matchers))]
+
+    def match_matrix(self, silences: Iterable[model.Silence]) -> "np.ndarray":
+        """Returns a boolean matrix [silence, alert] of which silence matches which alert."""
+        np = _numpy()
+        silence_list = list(silences)
+        matrix = np.zeros((len(silence_list), len(self.alerts)), dtype=bool)
+        for row, silence in enumerate(silence_list):
+            matrix[row] = self.mask(silence.matchers)
+        return matrix
@@ -1,10 +1,10 @@
 # read configuration from yaml file in (home) directory
 
 import os,sys
-import yaml
 import amlib
 
 STD_TIMEOUT = (10,20)
+DEFAULT_PARALLEL = 8
 
 # BASE_URL = None
 # BASE_API_URL = None
@@ -13,11 +13,47 @@ URLS = {}
 HEADERS = {
     "Content-Type": "application/json",
 }
+# alertmanager instances by name, URLS refers to the first (primary) one
+# each instance: BASE_URL, BASE_API_URL, BASE_SILENCE_URL, HEADERS (additional), TIMEOUT, REPLICA_API_URLS
+INSTANCES: dict[str, dict] = {}
+SELECTED_INSTANCES: list[str] = []
+# connection pooling and retries of the shared HTTP session (amlib.session)
+HTTP_OPTIONS = {
+    "POOL_CONNECTIONS": 4,
+    "POOL_MAXSIZE": 10,
+    "RETRIES": 3,
+    "BACKOFF_FACTOR": 0.3,
+}
+# in-process caching of get_alerts/get_silences (amlib.cache), TTL in seconds
+# MAX_AGE > 0 enables the on-disk response cache shared between processes
+CACHE_OPTIONS = {
+    "TTL": 30,
+    "MAXSIZE": 32,
+    "MAX_AGE": 0,
+    "DIRECTORY": None,
+}
+# TRUSTED decodes alerts and silences into lightweight records (amlib.records) without validation,
+# COMPACT validates them and converts them into records afterwards
+DECODE_OPTIONS = {
+    "TRUSTED": False,
+    "COMPACT": False,
+}
+
+# hedged GET requests to the replicas of an instance (amlib.hedge): a replica is asked if the
+# primary URL has not answered within the PERCENTILE of recent latencies (DELAY seconds until
+# MIN_SAMPLES latencies are known)
+HEDGE_OPTIONS = {
+    "ENABLED": False,
+    "DELAY": 0.2,
+    "PERCENTILE": 95,
+    "MIN_SAMPLES": 20,
+}
 
 def read_from_file(path:str|None = None) -> dict:
-    if not path:
-        path = os.path.expanduser("~")
-        config_file = os.path.join(path, ".pylerttool.yaml")
+    import yaml
+    config_file = path
+    if not config_file:
+        config_file = os.path.join(os.path.expanduser("~"), ".pylerttool.yaml")
     try:
         with open(config_file, "r") as f:
             config = yaml.safe_load(f)
@@ -26,16 +62,77 @@ def read_from_file(path:str|None = None) -> dict:
         raise FileNotFoundError(f"No configuration file found, please create {config_file}")
         return {}
 
+def _instance_config(url_config: dict) -> dict:
+    """Returns the URLs, headers and timeout of an instance from its configuration section."""
+    timeout = url_config.get("TIMEOUT", None)
+    if timeout is None:
+        timeout = STD_TIMEOUT
+    elif isinstance(timeout, (int, float)):
+        timeout = (timeout, timeout)
+    else:
+        timeout = tuple(timeout)
+    return {
+        "BASE_URL": url_config["BASE_URL"],
+        "BASE_API_URL": url_config["BASE_URL"] + url_config["API_PATH"],
+        "BASE_SILENCE_URL": url_config["BASE_URL"] + url_config["HTTP_SILENCE_PATH"],
+        "HEADERS": dict(url_config.get("Header", None) or {}),
+        "TIMEOUT": timeout,
+        "REPLICA_API_URLS": [replica + url_config["API_PATH"] for replica in url_config.get("REPLICAS", None) or []],
+    }
+
 def set_config(config:dict) -> None:
     try:
-        URLS["BASE_URL"] = config["URL"]["BASE_URL"]
-        URLS["BASE_API_URL"] = URLS["BASE_URL"] + config["URL"]["API_PATH"]
-        URLS["BASE_SILENCE_URL"] = URLS["BASE_URL"] + config["URL"]["HTTP_SILENCE_PATH"]
-    except KeyError as ke:
+        instances = {}
+        if config.get("Instances", None):
+            for name, inst_config in config["Instances"].items():
+                instances[str(name)] = _instance_config(inst_config)
+        else:
+            instances["default"] = _instance_config(config["URL"])
+    except (KeyError, TypeError, AttributeError) as ke:
         print(f"Invalid configuration File - KeyError: {ke}")
         exit(1)
+    INSTANCES.clear()
+    INSTANCES.update(instances)
+    SELECTED_INSTANCES.clear()
+    primary = next(iter(INSTANCES.values()))
+    URLS["BASE_URL"] = primary["BASE_URL"]
+    URLS["BASE_API_URL"] = primary["BASE_API_URL"]
+    URLS["BASE_SILENCE_URL"] = primary["BASE_SILENCE_URL"]
 
     Auth = config.get("Authentication", None)
     if Auth:
         if Auth.get("Header", None):
             HEADERS.update(Auth["Header"])
+
+    http = config.get("HTTP", None)
+    if http:
+        HTTP_OPTIONS.update({k: v for (k, v) in http.items() if k in HTTP_OPTIONS})
+    cache = config.get("Cache", None)
+    if cache:
+        CACHE_OPTIONS.update({k: v for (k, v) in cache.items() if k in CACHE_OPTIONS})
+    decode = config.get("Decode", None)
+    if decode:
+        DECODE_OPTIONS.update({k: v for (k, v) in decode.items() if k in DECODE_OPTIONS})
+    hedging = config.get("Hedging", None)
+    if hedging:
+        HEDGE_OPTIONS.update({k: v for (k, v) in hedging.items() if k in HEDGE_OPTIONS})
+    from amlib.session import reset_session
+    reset_session()
+
+def ensure_config() -> None:
+    """Reads the configuration file on first use, unless set_config was called already."""
+    if not URLS:
+        set_config(read_from_file())
+
+def select_instances(names: list[str]) -> None:
+    """Restricts requests to the given instances (all instances if empty)."""
+    ensure_config()
+    unknown = [name for name in names if name not in INSTANCES]
+    if unknown:
+        raise KeyError(f"Unknown instance(s): {', '.join(unknown)}")
+    SELECTED_INSTANCES[:] = names
+
+def instance_names() -> list[str]:
+    """Returns the names of all (selected) instances, the primary instance first."""
+    ensure_config()
+    return list(SELECTED_INSTANCES) or list(INSTANCES)
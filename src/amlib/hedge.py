@@ -0,0 +1,133 @@
+"""Hedged GET requests: the same request is sent to a replica if the first one is slow,
+the first successful response wins"""
+
+import collections
+import logging
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, TypeVar
+
+import requests
+
+log = logging.getLogger(__name__)
+T = TypeVar("T")
+
+# latencies kept per instance for the percentile delay
+LATENCY_HISTORY = 200
+
+
+class LatencyTracker:
+    """Recent response times of the requests to an instance."""
+
+    def __init__(self, size: int = LATENCY_HISTORY) -> None:
+        self._latencies: collections.deque[float] = collections.deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def add(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def percentile(self, percent: float) -> float | None:
+        """Returns the given percentile of the recent latencies (None without any)."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        pos = max(math.ceil(percent / 100 * len(latencies)) - 1, 0)
+        return latencies[min(pos, len(latencies) - 1)]
+
+    def delay(self, percent: float, default: float, min_samples: int) -> float:
+        """Returns the hedging delay: the percentile of the latencies once min_samples are known, else default."""
+        if len(self) < max(min_samples, 1):
+            return default
+        return self.percentile(percent)  # type: ignore[return-value]
+
+
+_TRACKERS: dict[str, LatencyTracker] = {}
+_TRACKERS_LOCK = threading.Lock()
+# number of requests answered per URL
+WINS: collections.Counter[str] = collections.Counter()
+
+
+def tracker(name: str) -> LatencyTracker:
+    """Returns the latency tracker of an instance."""
+    with _TRACKERS_LOCK:
+        if name not in _TRACKERS:
+            _TRACKERS[name] = LatencyTracker()
+        return _TRACKERS[name]
+
+
+def submit_daemon(func: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+    """Runs func in a daemon thread. Unlike ThreadPoolExecutor threads, an abandoned slow
+    request does not delay the exit of the interpreter."""
+    future: Future[T] = Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as err:  # pylint: disable=broad-except
+            future.set_exception(err)
+
+    threading.Thread(target=run, name="amlib-request", daemon=True).start()
+    return future
+
+
+def _close_response(future: "Future[requests.Response]") -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def hedged_get(session: requests.Session, urls: list[str], delay: float, **kwargs: Any) -> tuple[requests.Response, str]:
+    """GETs urls[0], and the next URL whenever no successful response arrived within delay seconds
+    (or a request failed). Returns the first successful response and its URL.
+    If all requests fail, the last error response is returned or the last exception raised."""
+    waiting = list(urls)
+    futures: dict[Future[requests.Response], str] = {}
+
+    def launch() -> Future[requests.Response]:
+        url = waiting.pop(0)
+        future = submit_daemon(session.get, url, **kwargs)
+        futures[future] = url
+        return future
+
+    failed: Future[requests.Response] | None = None
+    pending = {launch()}
+    while pending:
+        done, pending = wait(pending, timeout=delay if waiting else None, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None and future.result().status_code < 500:
+                for loser in pending:
+                    loser.add_done_callback(_close_response)
+                return future.result(), futures[future]
+            failed = future
+        # no answer within delay or a failed request: ask the next replica
+        if waiting:
+            pending.add(launch())
+    assert failed is not None
+    if failed.exception() is not None:
+        raise failed.exception()  # type: ignore[misc]
+    return failed.result(), futures[failed]
+
+
+def get(session: requests.Session, name: str, urls: list[str], options: dict, **kwargs: Any) -> requests.Response:
+    """Hedged GET of an instance (name) available at urls, options as config.HEDGE_OPTIONS.
+    Records the latency of the winning request and logs which URL answered."""
+    delay = tracker(name).delay(float(options["PERCENTILE"]), float(options["DELAY"]), int(options["MIN_SAMPLES"]))
+    start = time.monotonic()
+    resp, url = hedged_get(session, urls, delay, **kwargs)
+    latency = time.monotonic() - start
+    if resp.ok:
+        tracker(name).add(latency)
+    WINS[url] += 1
+    if url != urls[0]:
+        log.info("hedged request to %s answered by replica %s after %.3fs", name, url, latency)
+    else:
+        log.debug("request to %s answered by %s after %.3fs", name, url, latency)
+    return resp
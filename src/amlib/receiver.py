@@ -0,0 +1,240 @@
+"""Local Alertmanager webhook receiver keeping the current alerts in memory.
+
+Alertmanager pushes notifications to the receiver (webhook_config with send_resolved: true),
+the alerts are served in the shape of GET /api/v2/alerts, so dashboards and amcli can
+read them locally instead of polling Alertmanager."""
+
+import datetime
+import json
+import logging
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterable
+from urllib.parse import parse_qs, urlparse
+
+from amlib import Paths
+from amlib.records import AlertRecord
+from amlib.tools import AlertIndex, CompiledMatchers, compile_matcher, compile_regex, parse_matcher
+
+log = logging.getLogger(__name__)
+
+QUEUE_SIZE = 1024
+BATCH_SIZE = 64
+WEBHOOK_PATHS = ("/", "/webhook")
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def webhook_alert(alert: dict[str, Any], receiver: str, received: str) -> dict[str, Any]:
+    """Converts an alert of a webhook payload into the shape of a GettableAlert.
+    Notified alerts are neither silenced nor inhibited, so their state is active."""
+    return {
+        "labels": alert["labels"],
+        "annotations": alert.get("annotations", {}),
+        "receivers": [{"name": receiver}],
+        "fingerprint": alert["fingerprint"],
+        "generatorURL": alert.get("generatorURL"),
+        "startsAt": alert["startsAt"],
+        "updatedAt": received,
+        "endsAt": alert["endsAt"],
+        "status": {"state": "active", "silencedBy": [], "inhibitedBy": []},
+    }
+
+
+class WebhookStore:
+    """Current alerts by fingerprint, fed by webhook payloads.
+    Payloads are queued (bounded) and applied by one thread in batches, so a burst of
+    notifications takes the lock once per batch instead of once per payload."""
+
+    def __init__(self, queue_size: int = QUEUE_SIZE, batch_size: int = BATCH_SIZE) -> None:
+        self.queue: queue.Queue[dict[str, Any]] = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self._alerts: dict[str, AlertRecord] = {}
+        self._lock = threading.Lock()
+        self._index: AlertIndex | None = None
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def put(self, payload: dict[str, Any]) -> bool:
+        """Queues a webhook payload, returns False if the queue is full."""
+        try:
+            self.queue.put_nowait(payload)
+        except queue.Full:
+            return False
+        return True
+
+    def apply(self, payloads: Iterable[dict[str, Any]]) -> None:
+        """Applies webhook payloads: firing alerts are added or updated, resolved ones removed."""
+        received = _now()
+        with self._lock:
+            for payload in payloads:
+                receiver = payload.get("receiver", "")
+                for alert in payload.get("alerts", []):
+                    fingerprint = alert["fingerprint"]
+                    if alert.get("status") == "resolved":
+                        self._alerts.pop(fingerprint, None)
+                        continue
+                    data = webhook_alert(alert, receiver, received)
+                    known = self._alerts.get(fingerprint)
+                    if known is not None:
+                        # an alert routed to several receivers arrives once per receiver
+                        names = [rec.name for rec in known.receivers]
+                        data["receivers"] = [{"name": name} for name in names] + ([] if receiver in names else [{"name": receiver}])
+                    self._alerts[fingerprint] = AlertRecord(data)
+            self._index = None
+
+    def alerts(self) -> list[AlertRecord]:
+        """Returns the current alerts."""
+        with self._lock:
+            return list(self._alerts.values())
+
+    def index(self) -> AlertIndex:
+        """Returns an index over the current alerts, rebuilt after changes only."""
+        with self._lock:
+            if self._index is None:
+                self._index = AlertIndex(self._alerts.values())
+            return self._index
+
+    def find(self, matchers: CompiledMatchers, receiver: str | None = None) -> list[AlertRecord]:
+        """Returns the current alerts matching all matchers (and the receiver regex)."""
+        alerts = self.index().find(matchers)
+        if receiver:
+            regex = compile_regex(receiver)
+            alerts = [alert for alert in alerts if any(regex.fullmatch(rec.name) for rec in alert.receivers)]
+        return alerts  # type: ignore[return-value]
+
+    def _apply_batch(self, batch: list[dict[str, Any]]) -> None:
+        """Applies a batch, or its payloads one by one if it fails, logging the failing payloads.
+        Errors must not end the only worker, the queue would fill up otherwise."""
+        try:
+            self.apply(batch)
+        except Exception:  # pylint: disable=broad-except
+            if len(batch) == 1:
+                log.exception("failed to apply webhook payload")
+                return
+            # payloads are idempotent, apply the batch again one by one to skip the failing ones
+            for payload in batch:
+                self._apply_batch([payload])
+        else:
+            log.debug("applied %d payloads, %d alerts", len(batch), len(self))
+
+    def run(self) -> None:
+        """Applies queued payloads until None is queued."""
+        while True:
+            payload = self.queue.get()
+            batch = []
+            while payload is not None:
+                batch.append(payload)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    payload = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._apply_batch(batch)
+            if payload is None:
+                return
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, name="amlib-receiver", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.queue.put(None)  # type: ignore[arg-type]
+        if self._thread is not None:
+            self._thread.join()
+
+
+def payload_error(payload: Any) -> str | None:
+    """Returns why a webhook payload can't be applied, None for valid payloads."""
+    if not isinstance(payload, dict):
+        return "payload is not an object"
+    alerts = payload.get("alerts")
+    if not isinstance(alerts, list):
+        return "alerts missing"
+    for alert in alerts:
+        if not isinstance(alert, dict):
+            return "alert is not an object"
+        if not isinstance(alert.get("fingerprint"), str) or not isinstance(alert.get("labels"), dict):
+            return "alert without fingerprint or labels"
+        if alert.get("status") != "resolved" and not (isinstance(alert.get("startsAt"), str) and isinstance(alert.get("endsAt"), str)):
+            return "alert without startsAt or endsAt"
+    return None
+
+
+def filter_matchers(filters: Iterable[str]) -> CompiledMatchers:
+    """Compiles matchers of the filter parameter (name=value, name!=value, name=~regex, optionally quoted)."""
+    compiled = []
+    for expr in filters:
+        matcher = parse_matcher(expr)
+        if matcher is None:
+            raise ValueError(f"invalid matcher: {expr}")
+        if len(matcher.value) >= 2 and matcher.value[0] == matcher.value[-1] == '"':
+            matcher.value = matcher.value[1:-1]
+        compiled.append(compile_matcher(matcher))
+    return CompiledMatchers(tuple(compiled))
+
+
+def _flag(params: dict[str, list[str]], name: str) -> bool:
+    return params.get(name, ["true"])[-1].lower() != "false"
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """POST: webhook payloads, GET /api/v2/alerts: the current alerts."""
+    store: WebhookStore
+    api_path = "/api/v2/"
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        log.debug(format, *args)
+
+    def _send(self, code: int, body: Any) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        if urlparse(self.path).path not in WEBHOOK_PATHS:
+            return self._send(404, "not found")
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError:
+            return self._send(400, "invalid payload")
+        error = payload_error(payload)
+        if error:
+            return self._send(400, f"invalid payload: {error}")
+        if not self.store.put(payload):
+            # Alertmanager retries failed webhook notifications
+            return self._send(503, "queue full")
+        return self._send(200, "ok")
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        url = urlparse(self.path)
+        if url.path == "/-/healthy":
+            return self._send(200, "ok")
+        if url.path.rstrip("/") != self.api_path + Paths.ALERTS.value:
+            return self._send(404, "not found")
+        params = parse_qs(url.query)
+        try:
+            matchers = filter_matchers(params.get("filter", []))
+        except ValueError as err:
+            return self._send(400, str(err))
+        # notified alerts are always active: silenced, inhibited and unprocessed do not exclude any
+        alerts = self.store.find(matchers, params.get("receiver", [None])[-1]) if _flag(params, "active") else []
+        return self._send(200, [alert.to_dict() for alert in alerts])
+
+
+def make_server(store: WebhookStore, host: str = "127.0.0.1", port: int = 9097) -> ThreadingHTTPServer:
+    """Returns an HTTP server receiving webhooks into the store and serving its alerts."""
+    handler = type("BoundWebhookHandler", (WebhookHandler,), {"store": store})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,259 @@
+"""Lightweight, read-only alert and silence records decoded from trusted API responses.
+
+The records skip pydantic validation, parse timestamps on first access and provide
+the attributes of model.GettableAlert / model.GettableSilence used by amlib.
+to_model() converts a record into the full (validated) pydantic model.
+
+Label names and values, annotation names and receivers are interned, so the strings
+repeated across thousands of alerts (alertname, job, namespace, ...) are stored once."""
+
+import datetime
+import re
+import sys
+from functools import lru_cache
+from typing import Any, Iterable
+
+from amlib import model
+
+_FRACTION = re.compile(r"\.(\d+)")
+_ALERT_STATES = {state.value: state for state in model.State1}
+_SILENCE_STATES = {state.value: state for state in model.State}
+
+
+def parse_timestamp(dts: str) -> datetime.datetime:
+    """Parses RFC3339 timestamps of alertmanager (nanoseconds, "Z") into aware datetimes.
+    Fractions (trailing zeros trimmed) are padded or cut to the 6 digits fromisoformat accepts before Python 3.11."""
+    if dts.endswith("Z"):
+        dts = dts[:-1] + "+00:00"
+    return datetime.datetime.fromisoformat(_FRACTION.sub(lambda frac: "." + (frac.group(1) + "000000")[:6], dts, count=1))
+
+
+def _format_timestamp(value: str | datetime.datetime) -> str:
+    return value if isinstance(value, str) else value.isoformat()
+
+
+class Record:
+    """Base of read-only records with __slots__."""
+    __slots__: tuple[str, ...] = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name.lstrip('_')}={getattr(self, name.lstrip('_'))!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def _timestamp(self, slot: str) -> datetime.datetime:
+        value = object.__getattribute__(self, slot)
+        if isinstance(value, str):
+            value = parse_timestamp(value)
+            object.__setattr__(self, slot, value)
+        return value
+
+
+class ReceiverRecord(Record):
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        object.__setattr__(self, "name", name)
+
+
+class AlertStatusRecord(Record):
+    __slots__ = ("state", "silencedBy", "inhibitedBy")
+
+    def __init__(self, state: model.State1, silencedBy: tuple[str, ...], inhibitedBy: tuple[str, ...]) -> None:
+        object.__setattr__(self, "state", state)
+        object.__setattr__(self, "silencedBy", silencedBy)
+        object.__setattr__(self, "inhibitedBy", inhibitedBy)
+
+
+# records are read-only, so equal receivers and status records are shared between alerts
+@lru_cache(maxsize=1024)
+def _receiver(name: str) -> ReceiverRecord:
+    return ReceiverRecord(sys.intern(name))
+
+@lru_cache(maxsize=4096)
+def _alert_status(state: str, silenced_by: tuple[str, ...], inhibited_by: tuple[str, ...]) -> AlertStatusRecord:
+    return AlertStatusRecord(_ALERT_STATES[state], silenced_by, inhibited_by)
+
+def intern_labels(labels: dict[str, str]) -> dict[str, str]:
+    """Returns the labels with interned names and values."""
+    intern = sys.intern
+    return {intern(key): intern(val) for (key, val) in labels.items()}
+
+def intern_keys(annotations: dict[str, str]) -> dict[str, str]:
+    """Returns the annotations with interned names (values are mostly unique)."""
+    intern = sys.intern
+    return {intern(key): val for (key, val) in annotations.items()}
+
+
+class AlertRecord(Record):
+    """Read-only counterpart of model.GettableAlert. labels and annotations are dicts."""
+    __slots__ = ("labels", "annotations", "receivers", "fingerprint", "generatorURL",
+                 "_startsAt", "_updatedAt", "_endsAt", "status")
+
+    def __init__(self, data: dict[str, Any], intern: bool = True) -> None:
+        status = data["status"]
+        setattr_ = object.__setattr__
+        if intern:
+            setattr_(self, "labels", intern_labels(data["labels"]))
+            setattr_(self, "annotations", intern_keys(data["annotations"]))
+            setattr_(self, "receivers", [_receiver(rec["name"]) for rec in data["receivers"]])
+            setattr_(self, "status", _alert_status(status["state"], tuple(status["silencedBy"]), tuple(status["inhibitedBy"])))
+        else:
+            setattr_(self, "labels", data["labels"])
+            setattr_(self, "annotations", data["annotations"])
+            setattr_(self, "receivers", [ReceiverRecord(rec["name"]) for rec in data["receivers"]])
+            setattr_(self, "status", AlertStatusRecord(_ALERT_STATES[status["state"]], tuple(status["silencedBy"]), tuple(status["inhibitedBy"])))
+        setattr_(self, "fingerprint", data["fingerprint"])
+        setattr_(self, "generatorURL", data.get("generatorURL"))
+        setattr_(self, "_startsAt", data["startsAt"])
+        setattr_(self, "_updatedAt", data["updatedAt"])
+        setattr_(self, "_endsAt", data["endsAt"])
+
+    @classmethod
+    def from_model(cls, alert: model.GettableAlert) -> "AlertRecord":
+        """Returns the compact record of a pydantic alert."""
+        record = cls.__new__(cls)
+        setattr_ = object.__setattr__
+        setattr_(record, "labels", intern_labels(alert.labels.__dict__))
+        setattr_(record, "annotations", intern_keys(alert.annotations.__dict__))
+        setattr_(record, "receivers", [_receiver(rec.name) for rec in alert.receivers])
+        setattr_(record, "status", _alert_status(alert.status.state.value, tuple(alert.status.silencedBy), tuple(alert.status.inhibitedBy)))
+        setattr_(record, "fingerprint", alert.fingerprint)
+        setattr_(record, "generatorURL", None if alert.generatorURL is None else str(alert.generatorURL))
+        setattr_(record, "_startsAt", alert.startsAt)
+        setattr_(record, "_updatedAt", alert.updatedAt)
+        setattr_(record, "_endsAt", alert.endsAt)
+        return record
+
+    @property
+    def startsAt(self) -> datetime.datetime:
+        return self._timestamp("_startsAt")
+
+    @property
+    def updatedAt(self) -> datetime.datetime:
+        return self._timestamp("_updatedAt")
+
+    @property
+    def endsAt(self) -> datetime.datetime:
+        return self._timestamp("_endsAt")
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the record in the shape of the API response."""
+        return {
+            "labels": dict(self.labels),
+            "annotations": dict(self.annotations),
+            "receivers": [{"name": rec.name} for rec in self.receivers],
+            "fingerprint": self.fingerprint,
+            "generatorURL": self.generatorURL,
+            "startsAt": _format_timestamp(self._startsAt),
+            "updatedAt": _format_timestamp(self._updatedAt),
+            "endsAt": _format_timestamp(self._endsAt),
+            "status": {"state": self.status.state.value,
+                       "silencedBy": list(self.status.silencedBy),
+                       "inhibitedBy": list(self.status.inhibitedBy)},
+        }
+
+    def to_model(self) -> model.GettableAlert:
+        """Returns the validated pydantic model of the alert."""
+        return model.GettableAlert.parse_obj(self.to_dict())
+
+
+class SilenceStatusRecord(Record):
+    __slots__ = ("state",)
+
+    def __init__(self, state: model.State) -> None:
+        object.__setattr__(self, "state", state)
+
+
+_SILENCE_STATUS = {value: SilenceStatusRecord(state) for (value, state) in _SILENCE_STATES.items()}
+
+def _matchers(matchers: list[tuple[str, str, bool, bool | None]], intern: bool) -> model.Matchers:
+    if intern:
+        matchers = [(sys.intern(name), sys.intern(value), is_regex, is_equal) for (name, value, is_regex, is_equal) in matchers]
+    return model.Matchers.construct(__root__=[
+        model.Matcher.construct(name=name, value=value, isRegex=is_regex, isEqual=is_equal)
+        for (name, value, is_regex, is_equal) in matchers])
+
+
+class SilenceRecord(Record):
+    """Read-only counterpart of model.GettableSilence.
+    Matchers are unvalidated model.Matchers (pydantic construct())."""
+    __slots__ = ("id", "matchers", "_startsAt", "_endsAt", "_updatedAt", "createdBy", "comment", "status")
+
+    def __init__(self, data: dict[str, Any], intern: bool = True) -> None:
+        setattr_ = object.__setattr__
+        setattr_(self, "id", data["id"])
+        setattr_(self, "matchers", _matchers([(m["name"], m["value"], m["isRegex"], m.get("isEqual", True)) for m in data["matchers"]], intern))
+        setattr_(self, "_startsAt", data["startsAt"])
+        setattr_(self, "_endsAt", data["endsAt"])
+        setattr_(self, "_updatedAt", data["updatedAt"])
+        setattr_(self, "createdBy", sys.intern(data["createdBy"]) if intern else data["createdBy"])
+        setattr_(self, "comment", data["comment"])
+        setattr_(self, "status", _SILENCE_STATUS[data["status"]["state"]])
+
+    @classmethod
+    def from_model(cls, silence: model.GettableSilence) -> "SilenceRecord":
+        """Returns the compact record of a pydantic silence."""
+        record = cls.__new__(cls)
+        setattr_ = object.__setattr__
+        setattr_(record, "id", silence.id)
+        setattr_(record, "matchers", _matchers([(m.name, m.value, m.isRegex, m.isEqual) for m in silence.matchers.__root__], True))
+        setattr_(record, "_startsAt", silence.startsAt)
+        setattr_(record, "_endsAt", silence.endsAt)
+        setattr_(record, "_updatedAt", silence.updatedAt)
+        setattr_(record, "createdBy", sys.intern(silence.createdBy))
+        setattr_(record, "comment", silence.comment)
+        setattr_(record, "status", _SILENCE_STATUS[silence.status.state.value])
+        return record
+
+    @property
+    def startsAt(self) -> datetime.datetime:
+        return self._timestamp("_startsAt")
+
+    @property
+    def endsAt(self) -> datetime.datetime:
+        return self._timestamp("_endsAt")
+
+    @property
+    def updatedAt(self) -> datetime.datetime:
+        return self._timestamp("_updatedAt")
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the record in the shape of the API response."""
+        return {
+            "id": self.id,
+            "matchers": [{"name": m.name, "value": m.value, "isRegex": m.isRegex, "isEqual": m.isEqual}
+                         for m in self.matchers.__root__],
+            "startsAt": _format_timestamp(self._startsAt),
+            "endsAt": _format_timestamp(self._endsAt),
+            "updatedAt": _format_timestamp(self._updatedAt),
+            "createdBy": self.createdBy,
+            "comment": self.comment,
+            "status": {"state": self.status.state.value},
+        }
+
+    def to_model(self) -> model.GettableSilence:
+        """Returns the validated pydantic model of the silence."""
+        return model.GettableSilence.parse_obj(self.to_dict())
+
+
+def alerts_from_json(data: Iterable[dict[str, Any]], intern: bool = True) -> list[AlertRecord]:
+    """Decodes a /alerts response without validation."""
+    return [AlertRecord(alert, intern) for alert in data]
+
+
+def silences_from_json(data: Iterable[dict[str, Any]], intern: bool = True) -> list[SilenceRecord]:
+    """Decodes a /silences response without validation."""
+    return [SilenceRecord(silence, intern) for silence in data]
+
+
+def compact_alerts(alerts: Iterable[model.GettableAlert | AlertRecord]) -> list[AlertRecord]:
+    """Converts (validated) pydantic alerts into compact records."""
+    return [alert if isinstance(alert, AlertRecord) else AlertRecord.from_model(alert) for alert in alerts]
+
+
+def compact_silences(silences: Iterable[model.GettableSilence | SilenceRecord]) -> list[SilenceRecord]:
+    """Converts (validated) pydantic silences into compact records."""
+    return [silence if isinstance(silence, SilenceRecord) else SilenceRecord.from_model(silence) for silence in silences]
@@ -0,0 +1,53 @@
+"""Shared HTTP session (connection pool, keep-alive, retries) for accessing alertmanager"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from amlib.config import HEADERS, HTTP_OPTIONS, ensure_config
+
+_SESSION: list[requests.Session] = []
+_LOCK = threading.Lock()
+
+
+def create_session(options: dict | None = None) -> requests.Session:
+    """Creates a session with pooled connections. Only idempotent GETs are retried."""
+    opts = dict(HTTP_OPTIONS)
+    if options:
+        opts.update(options)
+    retry = Retry(
+        total=int(opts["RETRIES"]),
+        backoff_factor=float(opts["BACKOFF_FACTOR"]),
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=int(opts["POOL_CONNECTIONS"]),
+        pool_maxsize=int(opts["POOL_MAXSIZE"]),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Returns the shared session, creating it on first use."""
+    if not _SESSION:
+        ensure_config()
+        with _LOCK:
+            if not _SESSION:
+                _SESSION.append(create_session())
+    return _SESSION[0]
+
+
+def reset_session() -> None:
+    """Closes the shared session, the next call creates a new one (i.e. after configuration changes)."""
+    with _LOCK:
+        while _SESSION:
+            _SESSION.pop().close()
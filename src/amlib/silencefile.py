@@ -0,0 +1,92 @@
+"""Silence definitions read from YAML or CSV files (amcli silence apply).
+
+YAML: a list of entries (or a mapping with a "silences" list), CSV: one entry per row with a header.
+Entry fields: matchers (list, or one string of space separated matchers, quoted with shell rules),
+comment, createdBy, startsAt, endsAt or duration. Missing fields are taken from the defaults."""
+
+import csv
+import datetime
+import shlex
+from typing import Any, Iterable
+
+from amlib import model
+from amlib.records import parse_timestamp
+from amlib.tools import parse_matcher
+
+FIELDS = ("matchers", "comment", "createdBy", "startsAt", "endsAt", "duration")
+
+
+def read_entries(path: str, fmt: str | None = None) -> list[dict[str, Any]]:
+    """Reads silence entries from a YAML or CSV file, the format defaults to the file extension."""
+    if fmt is None:
+        fmt = "csv" if path.lower().endswith(".csv") else "yaml"
+    with open(path, newline="", encoding="utf-8") as file:
+        if fmt == "csv":
+            # empty cells are missing fields
+            return [{key: val for (key, val) in row.items() if val} for row in csv.DictReader(file)]
+        import yaml
+        data = yaml.safe_load(file)
+    if isinstance(data, dict):
+        data = data.get("silences")
+    if not isinstance(data, list) or not all(isinstance(entry, dict) for entry in data):
+        raise ValueError(f"{path}: expected a list of silences")
+    return data
+
+
+def parse_matchers(value: str | Iterable[str]) -> list[model.Matcher]:
+    """Parses matchers (name=value, name!=value, name=~regex, name!~regex), values may be quoted."""
+    exprs = shlex.split(value) if isinstance(value, str) else list(value)
+    matchers = []
+    for expr in exprs:
+        matcher = parse_matcher(str(expr))
+        if matcher is None:
+            raise ValueError(f"invalid matcher: {expr}")
+        if len(matcher.value) >= 2 and matcher.value[0] == matcher.value[-1] == '"':
+            matcher.value = matcher.value[1:-1]
+        matchers.append(matcher)
+    if not matchers:
+        raise ValueError("no matchers")
+    return matchers
+
+
+def _time(value: Any, tzi: datetime.tzinfo) -> datetime.datetime:
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    if not isinstance(value, datetime.datetime):
+        value = parse_timestamp(str(value))
+    return value if value.tzinfo else value.replace(tzinfo=tzi)
+
+
+def _seconds(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return value
+    from pytimeparse.timeparse import timeparse
+    seconds = timeparse(str(value))
+    if seconds is None:
+        raise ValueError(f"invalid duration: {value}")
+    return seconds
+
+
+def build_silence(entry: dict[str, Any], defaults: dict[str, Any], tzi: datetime.tzinfo = datetime.timezone.utc) -> model.Silence:
+    """Returns the (unsaved) silence of an entry. Raises ValueError for invalid or incomplete entries."""
+    unknown = set(entry) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+    fields = {key: val for (key, val) in defaults.items() if val is not None}
+    if "endsAt" in entry:
+        fields.pop("duration", None)
+    fields.update(entry)
+    for name in ("matchers", "comment", "createdBy"):
+        if not fields.get(name):
+            raise ValueError(f"{name} is missing")
+    start = _time(fields.get("startsAt") or datetime.datetime.now(tzi), tzi)
+    if fields.get("duration") is not None:
+        end = start + datetime.timedelta(seconds=_seconds(fields["duration"]))
+    elif fields.get("endsAt") is not None:
+        end = _time(fields["endsAt"], tzi)
+    else:
+        raise ValueError("endsAt or duration is missing")
+    if end <= start:
+        raise ValueError("endsAt is not after startsAt")
+    return model.Silence(matchers=model.Matchers.parse_obj(parse_matchers(fields["matchers"])),
+                         startsAt=start, endsAt=end, createdBy=str(fields["createdBy"]), comment=str(fields["comment"]))
@@ -0,0 +1,70 @@
+"""Incremental parsing of JSON arrays, yielding elements while the response is received"""
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+# consumed input is dropped from the buffer once it exceeds this size
+_TRIM_SIZE = 1 << 16
+
+
+def iter_json_array(chunks: Iterable[bytes | str]) -> Iterator[Any]:
+    """Yields the elements of a top-level JSON array from a sequence of (byte) chunks,
+    as soon as each element is complete. Raises json.JSONDecodeError on invalid input."""
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    started = False  # '[' consumed
+    expect_value = True  # after '[' or ','
+    finished = False  # ']' consumed
+    chunk_iter = iter(chunks)
+    eof = False
+
+    while True:
+        # skip whitespace and structural characters
+        while pos < len(buf) and not finished:
+            char = buf[pos]
+            if char in _WHITESPACE:
+                pos += 1
+            elif not started:
+                if char != "[":
+                    raise json.JSONDecodeError("Expecting '['", buf, pos)
+                started = True
+                pos += 1
+            elif char == "]":
+                finished = True
+                pos += 1
+            elif char == "," and not expect_value:
+                expect_value = True
+                pos += 1
+            elif expect_value:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    break  # incomplete element, read more
+                if end == len(buf) and not eof and not isinstance(value, (dict, list, str)):
+                    break  # a number or literal may continue in the next chunk
+                pos = end
+                expect_value = False
+                yield value
+            else:
+                raise json.JSONDecodeError("Expecting ',' or ']'", buf, pos)
+        if finished:
+            if buf[pos:].strip(_WHITESPACE):
+                raise json.JSONDecodeError("Extra data", buf, pos)
+            return
+        if eof:
+            raise json.JSONDecodeError("Unexpected end of array", buf, pos)
+        if pos > _TRIM_SIZE:
+            buf, pos = buf[pos:], 0
+        try:
+            chunk = next(chunk_iter)
+        except StopIteration:
+            eof = True
+            buf += utf8.decode(b"", final=True)
+            continue
+        buf += utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
@@ -0,0 +1,115 @@
+"""Group-by summaries of alerts and silences, computed in one pass without keeping the objects"""
+
+import datetime
+import heapq
+from typing import Any, Callable, Iterable
+
+from amlib import model
+from amlib.tools import label_dict
+
+# --by fields not taken from the labels / matchers
+ALERT_FIELDS = {
+    "@state": lambda alert: alert.status.state.value,
+    "@receiver": lambda alert: ",".join(rec.name for rec in alert.receivers),
+}
+SILENCE_FIELDS = {
+    "createdBy": lambda silence: silence.createdBy,
+    "state": lambda silence: silence.status.state.value,
+    "comment": lambda silence: silence.comment,
+}
+
+
+class GroupStats:
+    """Counts of one group: number of elements, silenced and inhibited alerts,
+    oldest startsAt and first endsAt."""
+    __slots__ = ("count", "silenced", "inhibited", "oldest", "first_end")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.silenced = 0
+        self.inhibited = 0
+        self.oldest: datetime.datetime | None = None
+        self.first_end: datetime.datetime | None = None
+
+    def add(self, starts: datetime.datetime, ends: datetime.datetime) -> None:
+        self.count += 1
+        if self.oldest is None or starts < self.oldest:
+            self.oldest = starts
+        if self.first_end is None or ends < self.first_end:
+            self.first_end = ends
+
+    @property
+    def silenced_ratio(self) -> float:
+        return self.silenced / self.count if self.count else 0.0
+
+    @property
+    def inhibited_ratio(self) -> float:
+        return self.inhibited / self.count if self.count else 0.0
+
+
+def alert_key(by: list[str]) -> Callable[[model.GettableAlert], tuple[str, ...]]:
+    """Returns a function computing the group of an alert: label values (empty if missing) or @state, @receiver."""
+    getters = [ALERT_FIELDS.get(name) for name in by]
+    if not any(getters):
+        return lambda alert: tuple(label_dict(alert.labels).get(name, "") for name in by)
+    def key(alert: model.GettableAlert) -> tuple[str, ...]:
+        labels = label_dict(alert.labels)
+        return tuple(getter(alert) if getter else labels.get(name, "") for (name, getter) in zip(by, getters))
+    return key
+
+
+def _matcher_value(silence: model.Silence, name: str) -> str:
+    """Value of the (first) matcher of a label, with its operator unless it is an equality matcher."""
+    for matcher in silence.matchers.__root__:
+        if matcher.name == name:
+            if matcher.isRegex:
+                return f"~{matcher.value}" if matcher.isEqual is not False else f"!~{matcher.value}"
+            return matcher.value if matcher.isEqual is not False else f"!{matcher.value}"
+    return ""
+
+
+def silence_key(by: list[str]) -> Callable[[model.GettableSilence], tuple[str, ...]]:
+    """Returns a function computing the group of a silence: createdBy, state, comment or a matcher label."""
+    getters = [SILENCE_FIELDS.get(name) for name in by]
+    return lambda silence: tuple(getter(silence) if getter else _matcher_value(silence, name)
+                                 for (name, getter) in zip(by, getters))
+
+
+def summarize_alerts(alerts: Iterable[model.GettableAlert], by: list[str]) -> dict[tuple[str, ...], GroupStats]:
+    """Groups alerts by the given fields in a single pass."""
+    key = alert_key(by)
+    groups: dict[tuple[str, ...], GroupStats] = {}
+    for alert in alerts:
+        group_key = key(alert)
+        stats = groups.get(group_key)
+        if stats is None:
+            stats = groups[group_key] = GroupStats()
+        stats.add(alert.startsAt, alert.endsAt)
+        if alert.status.silencedBy:
+            stats.silenced += 1
+        if alert.status.inhibitedBy:
+            stats.inhibited += 1
+    return groups
+
+
+def summarize_silences(silences: Iterable[model.GettableSilence], by: list[str]) -> dict[tuple[str, ...], GroupStats]:
+    """Groups silences by the given fields in a single pass."""
+    key = silence_key(by)
+    groups: dict[tuple[str, ...], GroupStats] = {}
+    for silence in silences:
+        group_key = key(silence)
+        stats = groups.get(group_key)
+        if stats is None:
+            stats = groups[group_key] = GroupStats()
+        stats.add(silence.startsAt, silence.endsAt)
+    return groups
+
+
+def top(groups: dict[tuple[str, ...], GroupStats], limit: int | None = None) -> list[tuple[tuple[str, ...], GroupStats]]:
+    """Returns the groups with the most elements, all groups if limit is None.
+    With a limit only the top entries are sorted (heap selection)."""
+    def order(item: tuple[tuple[str, ...], GroupStats]) -> Any:
+        return item[1].count
+    if limit is None or limit >= len(groups):
+        return sorted(groups.items(), key=order, reverse=True)
+    return heapq.nlargest(limit, groups.items(), key=order)
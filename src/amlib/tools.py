@@ -1,17 +1,29 @@
 """Funtions for accessing alertmanager objects from model"""
 
+import bisect
 import datetime
+import hashlib
+import json
+import logging
 import re
-from typing import Iterable
-from functools import cache
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, TypeVar
+from functools import lru_cache
 
 import requests
+from requests import RequestException
 
 # from amlib.config import BASE_SILENCE_URL, BASE_API_URL, HEADERS, STD_TIMEOUT
-from amlib.config import URLS, HEADERS, STD_TIMEOUT
-from amlib import Paths, model
-
+from amlib.config import HEADERS, INSTANCES, CACHE_OPTIONS, DEFAULT_PARALLEL, DECODE_OPTIONS, HEDGE_OPTIONS, ensure_config, instance_names
+from amlib.session import get_session
+from amlib.cache import ttl_cache, disk_cache
+from amlib import Paths, model, records
+from amlib import hedge as hedged
+from amlib.stream import iter_json_array
 
+log = logging.getLogger(__name__)
 
 
 def get_local_tzinfo() -> datetime.tzinfo|None:
@@ -30,7 +42,7 @@ def match(key: str, val: str, regex: bool = False, equal: bool = True) -> model.
 def parse_matcher(expr: str) -> model.Matcher | None:
     """translates matcher-string into matcher-object"""
     matcher = None
-    regex = r"(?P<key>\w+)(?P<op>!?=~?)(?P<val>.*)"
+    regex = r"(?P<key>\w+)(?P<op>!~|!?=~?)(?P<val>.*)"
     matching = re.match(regex, expr)
     if matching:
         key, oper, val = matching.groups()
@@ -52,55 +64,536 @@ def matcher_op_to_str(matcher: model.Matcher) -> str:
     return moper
 
 
-def silence_url(silence:model.GettableSilence) -> str:
+def instance_config(instance: str|None = None) -> dict:
+    """Returns the configuration of an instance (default: the primary instance), reading the configuration on first use."""
+    if instance is None:
+        instance = instance_names()[0]
+    ensure_config()
+    return INSTANCES[instance]
+
+def request_headers(instance: str|None = None) -> dict[str, str]:
+    """Returns the configured headers, extended by the headers of the instance."""
+    inst_headers = instance_config(instance)["HEADERS"]
+    if not inst_headers:
+        return HEADERS
+    return {**HEADERS, **inst_headers}
+
+def api_url(path: str, instance: str|None = None) -> str:
+    """Returns the URL of an API path (of the primary instance by default)."""
+    return instance_config(instance)["BASE_API_URL"] + path
+
+def request(method: str, path: str, instance: str|None = None, hedge: bool = True, **kwargs: Any) -> requests.Response:
+    """Sends a request to an API path of an instance, with its headers and timeout.
+    GET requests are hedged across the replicas of the instance if enabled."""
+    inst = instance_config(instance)
+    if method == "GET" and hedge and inst["REPLICA_API_URLS"] and HEDGE_OPTIONS["ENABLED"]:
+        urls = [base + path for base in [inst["BASE_API_URL"]] + inst["REPLICA_API_URLS"]]
+        return hedged.get(get_session(), instance or instance_names()[0], urls, HEDGE_OPTIONS,
+                          headers=request_headers(instance), timeout=inst["TIMEOUT"], **kwargs)
+    return get_session().request(method, inst["BASE_API_URL"] + path, headers=request_headers(instance), timeout=inst["TIMEOUT"], **kwargs)
+
+# silence id -> instance the silence was received from
+_SILENCE_INSTANCES: dict[str, str] = {}
+
+def silence_url(silence:model.GettableSilence, instance: str|None = None) -> str:
     """Returns HTML-Url for Silence."""
-    return F"{URLS['BASE_SILENCE_URL']}{silence.id}"
+    if instance is None:
+        instance = _SILENCE_INSTANCES.get(silence.id)
+    return F"{instance_config(instance)['BASE_SILENCE_URL']}{silence.id}"
+
+def get_json(path: str, params: dict|None = None, instance: str|None = None) -> Any:
+    """GET an API path and return the decoded body. Uses the on-disk cache if enabled."""
+    url = api_url(path, instance)
+    dcache = disk_cache()
+    if dcache:
+        body = dcache.get(url, params)
+        if body is not None:
+            return json.loads(body)
+    resp = request("GET", path, instance, params=params)
+    if dcache and resp.ok:
+        dcache.set(url, params, resp.text)
+    return resp.json()
+
+class FanOutResult(NamedTuple):
+    """Results and errors of a call to several instances, by instance name (in configuration order)."""
+    results: dict[str, Any]
+    errors: dict[str, Exception]
+
+def fan_out(func: Callable[[str], Any], instances: Iterable[str]|None = None) -> FanOutResult:
+    """Calls func(instance) for all (selected) instances concurrently.
+    Instances failing or not answering within their timeout are reported in errors, the others are not held up."""
+    names = list(instances) if instances is not None else instance_names()
+    results: dict[str, Any] = {}
+    errors: dict[str, Exception] = {}
+    if len(names) == 1:
+        try:
+            results[names[0]] = func(names[0])
+        except Exception as err:  # pylint: disable=broad-except
+            errors[names[0]] = err
+        return FanOutResult(results, errors)
+    start = time.monotonic()
+    # daemon threads: an instance exceeding its timeout must not delay the exit either
+    futures = {name: hedged.submit_daemon(func, name) for name in names}
+    for name, future in futures.items():
+        # connect + read timeout of the instance, counted from the start of the fan out
+        deadline = sum(instance_config(name)["TIMEOUT"])
+        wait([future], timeout=max(start + deadline - time.monotonic(), 0))
+        if not future.done():
+            errors[name] = TimeoutError(f"no response within {deadline}s")
+        elif future.exception() is not None:
+            errors[name] = future.exception()  # type: ignore[assignment]
+        else:
+            results[name] = future.result()
+    return FanOutResult(results, errors)
+
+def check_fan_out(result: FanOutResult) -> FanOutResult:
+    """Raises the first error if no instance answered, otherwise logs the failing instances."""
+    if result.errors and not result.results:
+        raise next(iter(result.errors.values()))
+    for name, err in result.errors.items():
+        log.warning("alertmanager instance %s failed: %s", name, err)
+    return result
+
+def get_json_uncached(path: str, params: dict|None = None, key: str|None = None) -> list[Any]:
+    """GETs a JSON array from all (selected) instances, bypassing all caches.
+    With key, elements are deduplicated by this field (first instance wins)."""
+    def fetch(inst: str) -> list[Any]:
+        resp = request("GET", path, inst, params=params)
+        resp.raise_for_status()
+        return resp.json()
+    fan = check_fan_out(fan_out(fetch))
+    if len(fan.results) == 1 or key is None:
+        return [data for result in fan.results.values() for data in result]
+    merged: dict[str, Any] = {}
+    for result in fan.results.values():
+        for data in result:
+            merged.setdefault(data[key], data)
+    return list(merged.values())
+
+class MultiResult(NamedTuple):
+    """Merged items of several instances with the instances each item was received from."""
+    items: list[Any]
+    sources: dict[str, list[str]]
+    errors: dict[str, Exception]
+
+STREAM_CHUNK_SIZE = 1 << 16
+
+def stream_json(path: str, params: dict|None = None, instance: str|None = None) -> Iterator[Any]:
+    """GET an API path returning a JSON array and yield its elements while the body is received.
+    Bodies found in the on-disk cache are used, streamed bodies are not written to it."""
+    url = api_url(path, instance)
+    dcache = disk_cache()
+    if dcache:
+        body = dcache.get(url, params)
+        if body is not None:
+            yield from json.loads(body)
+            return
+    with request("GET", path, instance, params=params, stream=True) as resp:
+        resp.raise_for_status()
+        yield from iter_json_array(resp.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+
+def decode_alert(data: dict[str, Any], trusted: bool|None = None, compact: bool|None = None) -> model.GettableAlert:
+    """Decodes a single alert, see decode_alerts."""
+    if trusted is None:
+        trusted = DECODE_OPTIONS["TRUSTED"]
+    if compact is None:
+        compact = DECODE_OPTIONS["COMPACT"]
+    if trusted:
+        return records.AlertRecord(data)  # type: ignore[return-value]
+    alert = model.GettableAlert.parse_obj(data)
+    if compact:
+        return records.AlertRecord.from_model(alert)  # type: ignore[return-value]
+    return alert
+
+def decode_silence(data: dict[str, Any], trusted: bool|None = None, compact: bool|None = None) -> model.GettableSilence:
+    """Decodes a single silence, see decode_alerts."""
+    if trusted is None:
+        trusted = DECODE_OPTIONS["TRUSTED"]
+    if compact is None:
+        compact = DECODE_OPTIONS["COMPACT"]
+    if trusted:
+        return records.SilenceRecord(data)  # type: ignore[return-value]
+    silence = model.GettableSilence.parse_obj(data)
+    if compact:
+        return records.SilenceRecord.from_model(silence)  # type: ignore[return-value]
+    return silence
+
+def decode_alerts(data: list[dict[str, Any]], trusted: bool|None = None, compact: bool|None = None) -> list[model.GettableAlert]:
+    """Decodes a /alerts response. Trusted responses are decoded into read-only
+    records.AlertRecord objects without validation (default: Decode.TRUSTED),
+    compact validates the alerts before converting them (default: Decode.COMPACT)."""
+    if trusted is None:
+        trusted = DECODE_OPTIONS["TRUSTED"]
+    if compact is None:
+        compact = DECODE_OPTIONS["COMPACT"]
+    if trusted:
+        return records.alerts_from_json(data)  # type: ignore[return-value]
+    alert_list = model.GettableAlerts.parse_obj(data).__root__
+    if compact:
+        return records.compact_alerts(alert_list)  # type: ignore[return-value]
+    return alert_list
+
+def decode_silences(data: list[dict[str, Any]], trusted: bool|None = None, compact: bool|None = None) -> list[model.GettableSilence]:
+    """Decodes a /silences response, see decode_alerts."""
+    if trusted is None:
+        trusted = DECODE_OPTIONS["TRUSTED"]
+    if compact is None:
+        compact = DECODE_OPTIONS["COMPACT"]
+    if trusted:
+        return records.silences_from_json(data)  # type: ignore[return-value]
+    silence_list = model.GettableSilences.parse_obj(data).__root__
+    if compact:
+        return records.compact_silences(silence_list)  # type: ignore[return-value]
+    return silence_list
 
-def get_status() -> model.AlertmanagerStatus:
-    """Returns status of Alertmanager"""
-    resp = requests.get(URLS["BASE_API_URL"] + Paths.STATUS.value ,headers=HEADERS,timeout=STD_TIMEOUT)
-    am_status = model.AlertmanagerStatus(**resp.json())
+def decode_alert_groups(data: list[dict[str, Any]], trusted: bool|None = None, compact: bool|None = None) -> list[model.AlertGroup]:
+    """Decodes an /alerts/groups response, see decode_alerts. Trusted and compact groups are
+    unvalidated model.AlertGroups (pydantic construct()) holding records."""
+    if trusted is None:
+        trusted = DECODE_OPTIONS["TRUSTED"]
+    if compact is None:
+        compact = DECODE_OPTIONS["COMPACT"]
+    if trusted:
+        return [model.AlertGroup.construct(labels=records.intern_labels(group["labels"]),
+                                           receiver=records.ReceiverRecord(group["receiver"]["name"]),
+                                           alerts=records.alerts_from_json(group["alerts"]))
+                for group in data]
+    group_list = model.AlertGroups.parse_obj(data).__root__
+    if compact:
+        return [model.AlertGroup.construct(labels=records.intern_labels(group.labels.__dict__), receiver=group.receiver,
+                                           alerts=records.compact_alerts(group.alerts))
+                for group in group_list]
+    return group_list
+
+def get_status(instance: str|None = None) -> model.AlertmanagerStatus:
+    """Returns status of Alertmanager (of the primary instance by default)"""
+    am_status = model.AlertmanagerStatus(**get_json(Paths.STATUS.value, instance=instance))
     return am_status
 
-@cache
-def get_silences(statelist: Iterable[model.State]|None = None,sfilter:Iterable[str]|None = None) -> list[model.GettableSilence]:
-    """Returns a list of silences. Filtering can be done by a given state"""
-    if not sfilter:
-        sfilter = []
-    resp = requests.get(URLS["BASE_API_URL"] + Paths.SILENCES.value ,params={'filter':sfilter},headers=HEADERS,timeout=STD_TIMEOUT)
-    slist = model.GettableSilences.parse_obj(resp.json()).__root__
-    if statelist:
-        slist = [s for s in slist if s.status.state in statelist]
-    return slist
-
-def get_silence(silence_id: str) -> model.GettableSilence|None:
-    """Returns a silence by its id."""
-    resp = requests.get(f'{URLS["BASE_API_URL"]}{Paths.SILENCE.value}/{silence_id}',headers=HEADERS,timeout=STD_TIMEOUT)
+def get_statuses(instances: Iterable[str]|None = None) -> FanOutResult:
+    """Returns the status of all (selected) instances, queried concurrently."""
+    return fan_out(get_status, instances)
+
+class ProbeResult(NamedTuple):
+    """Status and response time of one instance, status is None if the request failed."""
+    instance: str
+    latency: float
+    status: model.AlertmanagerStatus|None
+    error: Exception|None
+
+    @property
+    def config_hash(self) -> str|None:
+        """Short hash of the original configuration, to compare instances."""
+        if self.status is None:
+            return None
+        return hashlib.sha256(self.status.config.original.encode()).hexdigest()[:12]
+
+    @property
+    def peer_count(self) -> int|None:
+        if self.status is None:
+            return None
+        return len(self.status.cluster.peers or [])
+
+def _probe(instance: str) -> ProbeResult:
+    start = time.monotonic()
+    try:
+        # not using get_json, a probe must not be answered from the disk cache
+        resp = request("GET", Paths.STATUS.value, instance, hedge=False)
+        resp.raise_for_status()
+        status = model.AlertmanagerStatus(**resp.json())
+    except Exception as err:  # pylint: disable=broad-except
+        return ProbeResult(instance, time.monotonic() - start, None, err)
+    return ProbeResult(instance, time.monotonic() - start, status, None)
+
+def probe_instances(instances: Iterable[str]|None = None) -> list[ProbeResult]:
+    """Requests the status of all (selected) instances concurrently and times each request.
+    All requests run within one timeout window, however many instances are configured."""
+    fan = fan_out(_probe, instances)
+    probes = []
+    for name in (list(instances) if instances is not None else instance_names()):
+        if name in fan.results:
+            probes.append(fan.results[name])
+        else:
+            err = fan.errors[name]
+            probes.append(ProbeResult(name, sum(instance_config(name)["TIMEOUT"]) if isinstance(err, TimeoutError) else 0.0, None, err))
+    return probes
+
+def _majority(values: Iterable[Any]) -> Any:
+    counts = Counter(value for value in values if value is not None)
+    return counts.most_common(1)[0][0] if counts else None
+
+def probe_issues(probes: list[ProbeResult], slow: float = 1.0) -> dict[str, list[str]]:
+    """Returns the problems found per instance: unreachable, slow (latency above slow seconds),
+    cluster not ready and config, version or peer count differing from the majority of the instances."""
+    config_hash = _majority(probe.config_hash for probe in probes)
+    version = _majority(probe.status.versionInfo.version for probe in probes if probe.status)
+    peer_count = _majority(probe.peer_count for probe in probes)
+    issues: dict[str, list[str]] = {}
+    for probe in probes:
+        found = issues[probe.instance] = []
+        if probe.status is None:
+            found.append(f"unreachable: {probe.error}")
+            continue
+        if probe.latency > slow:
+            found.append(f"slow: {probe.latency:.2f}s")
+        if probe.status.cluster.status == model.Status.settling:
+            found.append(f"cluster {probe.status.cluster.status.value}")
+        if probe.config_hash != config_hash:
+            found.append("config differs")
+        if probe.status.versionInfo.version != version:
+            found.append(f"version {probe.status.versionInfo.version} differs from {version}")
+        if probe.peer_count != peer_count:
+            found.append(f"{probe.peer_count} peers instead of {peer_count}")
+    return issues
+
+class QueryPlan(NamedTuple):
+    """A query split into the parameters sent to the API (pushed down) and
+    the predicates evaluated locally on the raw response elements, before decoding."""
+    path: str
+    params: dict[str, Any]
+    pushed: tuple[str, ...]
+    local: tuple[tuple[str, Callable[[dict[str, Any]], bool]], ...]
+
+    def accepts(self, data: dict[str, Any]) -> bool:
+        """Evaluates the local part of the query on a raw element."""
+        return all(predicate(data) for (_, predicate) in self.local)
+
+    def describe(self) -> str:
+        pushed = ", ".join(self.pushed) or "-"
+        local = ", ".join(desc for (desc, _) in self.local) or "-"
+        return f"{self.path}: pushed down: {pushed}; evaluated locally: {local}"
+
+def plan_alerts(active: bool = True, silenced: bool = True, inhibited: bool = True, unprocessed: bool = True, afilter: Iterable[str]|None =None, receiver: str|None =None, fingerprint: str|None = None) -> QueryPlan:
+    """Plans a query of /alerts: states, label matchers and receiver are supported by the API,
+    only the fingerprint is compared locally."""
+    params = alert_params(active, silenced, inhibited, unprocessed, list(afilter) if afilter else None, receiver)
+    pushed = tuple(f"{key}={value}" for (key, value) in params.items() if key != 'filter')
+    pushed += tuple(f"filter={expr}" for expr in params.get('filter', []))
+    local: tuple[tuple[str, Callable[[dict[str, Any]], bool]], ...] = ()
+    if fingerprint:
+        local = ((f"fingerprint={fingerprint}", lambda data: data["fingerprint"] == fingerprint),)
+    return QueryPlan(Paths.ALERTS.value, params, pushed, local)
+
+def plan_silences(statelist: Iterable[model.State]|None = None, sfilter: Iterable[str]|None = None, ends_before: datetime.datetime|None = None, ends_after: datetime.datetime|None = None) -> QueryPlan:
+    """Plans a query of /silences: the API filters by matchers only,
+    states and end times are compared locally on the raw silences (before validation)."""
+    params = {'filter': list(sfilter) if sfilter else []}
+    pushed = tuple(f"filter={expr}" for expr in params['filter'])
+    local: list[tuple[str, Callable[[dict[str, Any]], bool]]] = []
+    states = {state.value for state in statelist} if statelist else set()
+    if states and states != {state.value for state in model.State}:
+        local.append((f"state in {','.join(sorted(states))}", lambda data: data["status"]["state"] in states))
+    if ends_before is not None:
+        local.append((f"endsAt<{ends_before.isoformat()}", lambda data: records.parse_timestamp(data["endsAt"]) < ends_before))
+    if ends_after is not None:
+        local.append((f"endsAt>{ends_after.isoformat()}", lambda data: records.parse_timestamp(data["endsAt"]) > ends_after))
+    return QueryPlan(Paths.SILENCES.value, params, pushed, tuple(local))
+
+def fetch_plan(plan: QueryPlan, instance: str|None = None) -> list[dict[str, Any]]:
+    """Runs a planned query on an instance, returns the raw elements accepted locally."""
+    log.debug("%s (%s)", plan.describe(), instance or instance_names()[0])
+    data = get_json(plan.path, plan.params, instance)
+    if not plan.local:
+        return data
+    accepted = [element for element in data if plan.accepts(element)]
+    log.debug("%s: %d of %d elements accepted locally", plan.path, len(accepted), len(data))
+    return accepted
+
+@ttl_cache
+def get_silences_multi(statelist: Iterable[model.State]|None = None,sfilter:Iterable[str]|None = None, ends_before: datetime.datetime|None = None, ends_after: datetime.datetime|None = None) -> MultiResult:
+    """Returns the silences of all (selected) instances, see get_silences."""
+    plan = plan_silences(statelist, sfilter, ends_before, ends_after)
+    fan = check_fan_out(fan_out(lambda inst: decode_silences(fetch_plan(plan, inst))))
+    items = []
+    sources: dict[str, list[str]] = {}
+    for inst, slist in fan.results.items():
+        for silence in slist:
+            if silence.id in sources:
+                sources[silence.id].append(inst)
+                continue
+            sources[silence.id] = [inst]
+            _SILENCE_INSTANCES[silence.id] = inst
+            items.append(silence)
+    return MultiResult(items, sources, fan.errors)
+
+def get_silences(statelist: Iterable[model.State]|None = None,sfilter:Iterable[str]|None = None, ends_before: datetime.datetime|None = None, ends_after: datetime.datetime|None = None) -> list[model.GettableSilence]:
+    """Returns a list of silences. Filtering can be done by a given state, matchers and end time"""
+    return get_silences_multi(statelist, sfilter, ends_before, ends_after).items
+
+def _get_silence(silence_id: str, instance: str) -> model.GettableSilence|None:
+    resp = request("GET", f'{Paths.SILENCE.value}/{silence_id}', instance)
     if resp.ok:
         silence = model.GettableSilence(**resp.json())
+        _SILENCE_INSTANCES[silence.id] = instance
     else:
         silence = None
     return silence
 
-def set_silence(silence: model.Silence) -> tuple[bool, str|dict[str, str]]:
-    """Set or modify silence. Returns if request was successful and description ( True and silenceID if successful )"""
-    resp = requests.post(f'{URLS["BASE_API_URL"]}{Paths.SILENCES.value}',data=silence.json(),headers=HEADERS,timeout=STD_TIMEOUT)
+def get_silence(silence_id: str, instance: str|None = None) -> model.GettableSilence|None:
+    """Returns a silence by its id. Without instance, the instance it was seen on or all instances are asked."""
+    names = instance_names()
+    if instance is None:
+        instance = _SILENCE_INSTANCES.get(silence_id, names[0] if len(names) == 1 else None)
+    if instance is not None:
+        return _get_silence(silence_id, instance)
+    fan = check_fan_out(fan_out(lambda inst: _get_silence(silence_id, inst), names))
+    return next((silence for silence in fan.results.values() if silence), None)
+
+def silence_instance(silence_id: str) -> str|None:
+    """Returns the name of the instance a silence belongs to."""
+    names = instance_names()
+    if len(names) == 1:
+        return names[0]
+    if silence_id not in _SILENCE_INSTANCES:
+        get_silence(silence_id)
+    return _SILENCE_INSTANCES.get(silence_id)
+
+def set_silence(silence: model.Silence, instance: str|None = None) -> tuple[bool, str|dict[str, str]]:
+    """Set or modify silence. Returns if request was successful and description ( True and silenceID if successful )
+    New silences are created on the primary instance, modified ones on their own."""
+    if instance is None and getattr(silence, "id", None):
+        instance = _SILENCE_INSTANCES.get(silence.id)  # type: ignore[attr-defined]
+    resp = request("POST", Paths.SILENCES.value, instance, data=silence.json())
     retval = None
     if resp.ok:
-        print(resp.text)
+        invalidate_cache()
+        log.debug("%s: %s", instance or instance_names()[0], resp.text)
         retval = resp.json()['silenceID']
+        _SILENCE_INSTANCES[retval] = instance or instance_names()[0]
     else:
         retval = resp.json()
     return (resp.ok, retval)
 
-def expire_silence(silence_id: str) -> bool:
-    """Expire a silence by its id."""
-    resp = requests.delete(f'{URLS["BASE_API_URL"]}{Paths.SILENCE.value}/{silence_id}',headers=HEADERS,timeout=STD_TIMEOUT)
-    return resp.ok
+def expire_silence(silence_id: str, instance: str|None = None) -> bool:
+    """Expire a silence by its id. Returns False for unknown silences, raises requests.HTTPError if alertmanager refused."""
+    if instance is None:
+        instance = silence_instance(silence_id)
+        if instance is None:
+            return False
+    resp = request("DELETE", f'{Paths.SILENCE.value}/{silence_id}', instance)
+    if resp.status_code == 404:
+        return False
+    resp.raise_for_status()
+    invalidate_cache()
+    return True
+
+T = TypeVar("T")
+K = TypeVar("K")
+
+def run_bulk(func: Callable[[K], T], ids: Iterable[K], parallel: int = DEFAULT_PARALLEL) -> list[tuple[K, T | Exception]]:
+    """Calls func for every id with at most `parallel` concurrent calls.
+    Results are returned in the order of the given ids, failed calls yield their exception."""
+    def call(item_id: K) -> T | Exception:
+        try:
+            return func(item_id)
+        except Exception as err:  # pylint: disable=broad-except
+            return err
+    id_list = list(ids)
+    if parallel <= 1 or len(id_list) <= 1:
+        return [(item_id, call(item_id)) for item_id in id_list]
+    with ThreadPoolExecutor(max_workers=min(parallel, len(id_list))) as executor:
+        return list(zip(id_list, executor.map(call, id_list)))
+
+def get_silences_by_id(silence_ids: Iterable[str], parallel: int = DEFAULT_PARALLEL) -> list[tuple[str, model.GettableSilence|None|Exception]]:
+    """Returns (id, silence) for all given ids, fetched concurrently.
+    Unknown ids yield None, failed requests their exception."""
+    return run_bulk(get_silence, silence_ids, parallel)
 
-@cache
-def get_alerts(active: bool = True, silenced: bool = True, inhibited: bool = True, unprocessed: bool = True, afilter: Iterable[str]|None =None, receiver: str|None =None ) -> list[model.GettableAlert]:
+def expire_silences(silence_ids: Iterable[str], parallel: int = DEFAULT_PARALLEL) -> list[tuple[str, bool|Exception]]:
+    """Expires all given silences concurrently. Returns (id, success or the exception of the failed request)
+    in the order of the given ids."""
+    return run_bulk(expire_silence, silence_ids, parallel)
+
+def silence_identity(silence: model.Silence) -> tuple[frozenset[tuple[str, str, bool, bool]], str]:
+    """Matchers (in any order) and comment of a silence, the same for a silence created twice."""
+    return (frozenset((m.name, m.value, m.isRegex, m.isEqual is not False) for m in silence.matchers.__root__), silence.comment)
+
+class ApplyResult(NamedTuple):
+    silence: model.Silence
+    status: str  # created, failed, exists (detail: its id) or duplicate (of an earlier silence)
+    detail: str  # silence id or error
+
+def apply_silences(silences: Iterable[model.Silence], parallel: int = DEFAULT_PARALLEL, existing: Iterable[model.Silence]|None = None) -> list[ApplyResult]:
+    """Creates silences with at most `parallel` concurrent requests, skipping silences with the
+    matchers and comment of an active or pending silence (or of an earlier one in the list).
+    Results are returned in the order of the given silences."""
+    if existing is None:
+        existing = get_silences((model.State.active, model.State.pending))
+    known = {silence_identity(silence): str(getattr(silence, "id", "")) for silence in existing}
+    results: list[ApplyResult|None] = []
+    pending: list[tuple[int, model.Silence]] = []
+    seen = set()
+    for silence in silences:
+        key = silence_identity(silence)
+        if key in known:
+            results.append(ApplyResult(silence, "exists", known[key]))
+        elif key in seen:
+            results.append(ApplyResult(silence, "duplicate", ""))
+        else:
+            seen.add(key)
+            pending.append((len(results), silence))
+            results.append(None)
+    for (pos, silence), res in run_bulk(lambda item: set_silence(item[1]), pending, parallel):
+        if isinstance(res, Exception):
+            results[pos] = ApplyResult(silence, "failed", str(res) or type(res).__name__)
+        else:
+            results[pos] = ApplyResult(silence, "created" if res[0] else "failed", str(res[1]))
+    return results  # type: ignore[return-value]
+
+@ttl_cache
+def get_alerts_multi(active: bool = True, silenced: bool = True, inhibited: bool = True, unprocessed: bool = True, afilter: Iterable[str]|None =None, receiver: str|None =None, fingerprint: str|None = None) -> MultiResult:
+    """Returns the alerts of all (selected) instances, deduplicated by fingerprint, see get_alerts."""
+    plan = plan_alerts(active, silenced, inhibited, unprocessed, afilter, receiver, fingerprint)
+    fan = check_fan_out(fan_out(lambda inst: decode_alerts(fetch_plan(plan, inst))))
+    items = []
+    sources: dict[str, list[str]] = {}
+    for inst, alist in fan.results.items():
+        for alert in alist:
+            if alert.fingerprint in sources:
+                sources[alert.fingerprint].append(inst)
+                continue
+            sources[alert.fingerprint] = [inst]
+            items.append(alert)
+    return MultiResult(items, sources, fan.errors)
+
+def get_alerts(active: bool = True, silenced: bool = True, inhibited: bool = True, unprocessed: bool = True, afilter: Iterable[str]|None =None, receiver: str|None =None, fingerprint: str|None = None) -> list[model.GettableAlert]:
     """Returns a list of matching alerts."""
+    return get_alerts_multi(active, silenced, inhibited, unprocessed, afilter, receiver, fingerprint).items
+
+def alert_group_key(group: model.AlertGroup) -> str:
+    """Identifies an alert group by its receiver and group labels."""
+    labels = ",".join(f"{key}={val}" for (key, val) in sorted(label_dict(group.labels).items()))
+    return f"{group.receiver.name}:{{{labels}}}"
+
+@ttl_cache
+def get_alert_groups_multi(active: bool = True, silenced: bool = True, inhibited: bool = True, afilter: Iterable[str]|None =None, receiver: str|None =None) -> MultiResult:
+    """Returns the alert groups of all (selected) instances, see get_alert_groups.
+    Equal groups of several instances are merged, their alerts deduplicated by fingerprint."""
+    params = alert_params(active, silenced, inhibited, None, list(afilter) if afilter else None, receiver)
+    log.debug("%s: pushed down: %s", Paths.ALERT_GROUPS.value, params)
+    fan = check_fan_out(fan_out(lambda inst: decode_alert_groups(get_json(Paths.ALERT_GROUPS.value, params, inst))))
+    groups: dict[str, model.AlertGroup] = {}
+    sources: dict[str, list[str]] = {}
+    for inst, glist in fan.results.items():
+        for group in glist:
+            key = alert_group_key(group)
+            if key not in groups:
+                groups[key] = group
+                sources[key] = [inst]
+                continue
+            sources[key].append(inst)
+            known = {alert.fingerprint for alert in groups[key].alerts}
+            merged = list(groups[key].alerts) + [alert for alert in group.alerts if alert.fingerprint not in known]
+            groups[key] = model.AlertGroup.construct(labels=groups[key].labels, receiver=groups[key].receiver, alerts=merged)
+    return MultiResult(list(groups.values()), sources, fan.errors)
+
+def get_alert_groups(active: bool = True, silenced: bool = True, inhibited: bool = True, afilter: Iterable[str]|None =None, receiver: str|None =None) -> list[model.AlertGroup]:
+    """Returns the alerts grouped by alertmanager (group_by of the routes), one group per receiver and group labels.
+    The API has no unprocessed parameter for groups."""
+    return get_alert_groups_multi(active, silenced, inhibited, afilter, receiver).items
+
+def alert_params(active: bool = True, silenced: bool = True, inhibited: bool = True, unprocessed: bool = True, afilter: Iterable[str]|None =None, receiver: str|None =None) -> dict[str, Any]:
+    """Returns the query parameters of /alerts."""
     params = {
         'active': active,
         'silenced': silenced,
@@ -109,80 +602,436 @@ def get_alerts(active: bool = True, silenced: bool = True, inhibited: bool = Tru
         'filter': afilter,
         'receiver': receiver
     }
-    params = { k: v for (k,v) in params.items() if v != None}
-    resp = requests.get(URLS["BASE_API_URL"] + Paths.ALERTS.value, headers=HEADERS, params=params,timeout=STD_TIMEOUT)
-    alert_list = model.GettableAlerts.parse_obj(resp.json()).__root__
-    return alert_list
+    return { k: v for (k,v) in params.items() if v != None}
+
+def _iter_instances(plan: QueryPlan) -> Iterator[tuple[str, Any]]:
+    """Streams a planned query from all (selected) instances one after another.
+    Failing instances are skipped (and logged) if there are several."""
+    names = instance_names()
+    for inst in names:
+        log.debug("%s (%s)", plan.describe(), inst)
+        try:
+            for data in stream_json(plan.path, plan.params, inst):
+                if plan.accepts(data):
+                    yield inst, data
+        except RequestException as err:
+            if len(names) == 1:
+                raise
+            log.warning("alertmanager instance %s failed: %s", inst, err)
+
+def iter_alerts(active: bool = True, silenced: bool = True, inhibited: bool = True, unprocessed: bool = True, afilter: Iterable[str]|None =None, receiver: str|None =None, fingerprint: str|None = None) -> Iterator[model.GettableAlert]:
+    """Yields matching alerts one by one while the response is received (not cached)."""
+    seen: set[str] = set()
+    for _, data in _iter_instances(plan_alerts(active, silenced, inhibited, unprocessed, afilter, receiver, fingerprint)):
+        if data["fingerprint"] not in seen:
+            seen.add(data["fingerprint"])
+            yield decode_alert(data)
+
+def iter_silences(statelist: Iterable[model.State]|None = None,sfilter:Iterable[str]|None = None, ends_before: datetime.datetime|None = None, ends_after: datetime.datetime|None = None) -> Iterator[model.GettableSilence]:
+    """Yields silences one by one while the response is received (not cached)."""
+    for inst, data in _iter_instances(plan_silences(statelist, sfilter, ends_before, ends_after)):
+        if data["id"] in _SILENCE_INSTANCES and _SILENCE_INSTANCES[data["id"]] != inst:
+            continue
+        _SILENCE_INSTANCES[data["id"]] = inst
+        yield decode_silence(data)
+
+def invalidate_cache() -> None:
+    """Drops cached alerts and silences, i.e. after silences were changed."""
+    get_silences_multi.cache_clear()  # type: ignore[attr-defined]
+    get_alerts_multi.cache_clear()  # type: ignore[attr-defined]
+    get_alert_groups_multi.cache_clear()  # type: ignore[attr-defined]
+    for store in _SILENCE_STORES.values():
+        store.refreshed = None
+    dcache = disk_cache()
+    if dcache:
+        dcache.clear()
 
 def get_alert_by_fingerprint(fingerprint: str, alert_list: list[model.GettableAlert]|None) -> model.GettableAlert|None:
     """Returns an alert according to its (hopefully unique) fingerprint."""
     alist = alert_list
     if not alist:
         alist = get_alerts()
-    for alert in alist:
-        if alert.fingerprint == fingerprint:
-            return alert
-    return None
+    return alert_store(alist).get(fingerprint)
 
-def is_matching(value:str, matcher:model.Matcher) -> bool:
-    """Helper to evaluate if a matcher suits a given value."""
-    match (matcher.isEqual, matcher.isRegex):
-        case (True, False):
-            return value == matcher.value
-        case (False, False):
-            return value != matcher.value
-        case (True, True):
-            op_match = re.search(matcher.value,value)
-            if op_match:
-                return True
-            else:
-                return False
-        case (False, True):
-            op_match = re.search(matcher.value,value)
-            if op_match:
+REGEX_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def compile_regex(pattern: str) -> re.Pattern[str]:
+    """Compiles a matcher regex, to be used with fullmatch: anchored on both ends like alertmanager does."""
+    return re.compile(pattern)
+
+
+class CompiledMatcher(NamedTuple):
+    """Matcher with its regex compiled once, for repeated evaluation."""
+    name: str
+    value: str
+    isRegex: bool
+    isEqual: bool
+    regex: re.Pattern[str] | None
+
+    def matches(self, value: str) -> bool:
+        """Evaluates the matcher against a single label value."""
+        if self.regex is not None:
+            return (self.regex.fullmatch(value) is not None) == self.isEqual
+        return (value == self.value) == self.isEqual
+
+
+class CompiledMatchers(NamedTuple):
+    """All matchers of a silence, compiled. Matches if every matcher does."""
+    matchers: tuple[CompiledMatcher, ...]
+
+    def matches(self, labels: dict[str, str]) -> bool:
+        """Returns True if all matchers match the given label dict."""
+        for matcher in self.matchers:
+            value = labels.get(matcher.name)
+            if value is None or not matcher.matches(value):
                 return False
-            else:
-                return True
-        case _:
-            return False
+        return True
 
-def is_matching_all(labels:model.LabelSet, matchers:model.Matchers) -> bool:
+
+def compile_matcher(matcher: model.Matcher | CompiledMatcher) -> CompiledMatcher:
+    """Returns a CompiledMatcher for a Matcher, regexes are taken from the shared cache."""
+    if isinstance(matcher, CompiledMatcher):
+        return matcher
+    return _compile_matcher(matcher.name, matcher.value, matcher.isRegex, matcher.isEqual is not False)
+
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def _compile_matcher(name: str, value: str, is_regex: bool, is_equal: bool) -> CompiledMatcher:
+    regex = compile_regex(value) if is_regex else None
+    return CompiledMatcher(name, value, is_regex, is_equal, regex)
+
+def compile_matchers(matchers: model.Matchers | CompiledMatchers) -> CompiledMatchers:
+    """Returns CompiledMatchers for the Matchers of a silence."""
+    if isinstance(matchers, CompiledMatchers):
+        return matchers
+    return CompiledMatchers(tuple(compile_matcher(m) for m in matchers.__root__))
+
+def label_dict(labels: model.LabelSet | dict[str, str]) -> dict[str, str]:
+    """Returns the labels of a LabelSet as dict (without copying)."""
+    if isinstance(labels, dict):
+        return labels
+    return labels.__dict__
+
+def is_matching(value:str, matcher:model.Matcher | CompiledMatcher) -> bool:
+    """Helper to evaluate if a matcher suits a given value."""
+    return compile_matcher(matcher).matches(value)
+
+def is_matching_all(labels:model.LabelSet | dict[str, str], matchers:model.Matchers | CompiledMatchers) -> bool:
     """Returns True if all Matchers match the given LabelSet."""
-    label_dict = {label[0]: label[1] for label in labels}
-    for matcher in matchers.__root__:
-        if matcher.name not in label_dict.keys():
-            return False
-        if not is_matching(label_dict[matcher.name],matcher):
-            return False
-    return True
+    return compile_matchers(matchers).matches(label_dict(labels))
 
 def find_silences(alert: model.Alert) -> list[model.GettableSilence|None]:
     """Finds and returns silences for a given alert, 
     according to the labels of the alert and the matchers of the silence."""
-    result_list: list[model.GettableSilence|None] = []
-    silences = get_silences()
-    for silence in silences:
-        labels = dict(alert.labels)
-        labels_keys = labels.keys()
-        matching = True
-        for matcher in silence.matchers.__root__:
-            if matcher.name in labels_keys:
-                if not is_matching(labels[matcher.name], matcher):
-                    matching = False
-                    break
-            else:
-                matching = False
-                break
-        if matching:
-            result_list.append(silence)
-    return result_list
+    labels = label_dict(alert.labels)
+    return [silence for silence in get_silences()
+            if compile_matchers(silence.matchers).matches(labels)]
+
+class AlertIndex:
+    """Inverted index over a list of alerts: label name -> label value -> alert positions.
+    Equality matchers select candidates by set intersection, regex and negative
+    matchers are evaluated once per distinct label value or on the remaining candidates."""
+
+    def __init__(self, alerts: Iterable[model.GettableAlert]) -> None:
+        self.alerts: list[model.GettableAlert] = list(alerts)
+        self._by_label: dict[str, dict[str, set[int]]] = {}
+        self._has_label: dict[str, set[int]] = {}
+        self._labels: list[dict[str, str]] = []
+        for pos, alert in enumerate(self.alerts):
+            labels = label_dict(alert.labels)
+            self._labels.append(labels)
+            for name, value in labels.items():
+                self._by_label.setdefault(name, {}).setdefault(value, set()).add(pos)
+                self._has_label.setdefault(name, set()).add(pos)
+
+    def __len__(self) -> int:
+        return len(self.alerts)
+
+    def _select(self, matcher: CompiledMatcher, candidates: set[int] | None) -> set[int]:
+        """Narrows candidates down to the alerts matching a single matcher."""
+        values = self._by_label.get(matcher.name)
+        if not values:
+            return set()
+        if not matcher.isRegex and matcher.isEqual:
+            selected = values.get(matcher.value, set())
+            return selected if candidates is None else candidates & selected
+        if candidates is None or len(candidates) > len(values):
+            selected = set()
+            for value, positions in values.items():
+                if matcher.matches(value):
+                    selected |= positions
+            return selected if candidates is None else candidates & selected
+        return {pos for pos in candidates
+                if matcher.name in self._labels[pos] and matcher.matches(self._labels[pos][matcher.name])}
+
+    def positions(self, matchers: model.Matchers | CompiledMatchers) -> list[int]:
+        """Returns the (sorted) positions of all alerts matching the given matchers."""
+        compiled = compile_matchers(matchers)
+        if not compiled.matchers:
+            return list(range(len(self.alerts)))
+        # most selective matchers first: equality matchers by size of their posting set
+        def selectivity(matcher: CompiledMatcher) -> tuple[int, int]:
+            if not matcher.isRegex and matcher.isEqual:
+                return (0, len(self._by_label.get(matcher.name, {}).get(matcher.value, ())))
+            return (1, len(self._has_label.get(matcher.name, ())))
+        candidates: set[int] | None = None
+        for matcher in sorted(compiled.matchers, key=selectivity):
+            candidates = self._select(matcher, candidates)
+            if not candidates:
+                return []
+        return sorted(candidates or ())
+
+    def find(self, matchers: model.Matchers | CompiledMatchers) -> list[model.GettableAlert]:
+        """Returns all alerts matching the given matchers, in the order of the indexed list."""
+        return [self.alerts[pos] for pos in self.positions(matchers)]
+
+class AlertStore(AlertIndex):
+    """AlertIndex with O(1) access by fingerprint and a reverse index from silence id
+    to the alerts alertmanager reported as silenced by it (status.silencedBy)."""
+
+    def __init__(self, alerts: Iterable[model.GettableAlert]) -> None:
+        super().__init__(alerts)
+        self._by_fingerprint: dict[str, int] = {}
+        self._by_silence: dict[str, list[int]] = {}
+        for pos, alert in enumerate(self.alerts):
+            self._by_fingerprint[alert.fingerprint] = pos
+            for silence_id in alert.status.silencedBy:
+                self._by_silence.setdefault(silence_id, []).append(pos)
+
+    def __contains__(self, fingerprint: object) -> bool:
+        return fingerprint in self._by_fingerprint
+
+    def get(self, fingerprint: str) -> model.GettableAlert | None:
+        """Returns the alert with the given fingerprint."""
+        pos = self._by_fingerprint.get(fingerprint)
+        return None if pos is None else self.alerts[pos]
+
+    def silenced_positions(self, silence_id: str) -> list[int]:
+        """Returns the positions of all alerts silenced by the given silence id."""
+        return self._by_silence.get(silence_id, [])
+
+    def silenced_by(self, silence_id: str) -> list[model.GettableAlert]:
+        """Returns all alerts alertmanager reported as silenced by the given silence id."""
+        return [self.alerts[pos] for pos in self.silenced_positions(silence_id)]
 
-def find_alerts(silence: model.Silence) -> list[model.GettableAlert]:
+_ALERT_STORES: dict[tuple[tuple[int, str, Any, tuple[str, ...]], ...], AlertStore] = {}
+ALERT_STORE_CACHE_SIZE = 4
+
+def alert_store(alerts: list[model.GettableAlert]) -> AlertStore:
+    """Returns an AlertStore for a list of alerts.
+    Stores of the last few lists are kept by their content (alert objects, fingerprint, updatedAt, silencedBy),
+    so repeated lookups don't rebuild them and changed lists don't get a stale store.
+    The cached stores reference their alerts, so the object ids in the key are not reused."""
+    key = tuple((id(alert), alert.fingerprint, alert.updatedAt, tuple(alert.status.silencedBy)) for alert in alerts)
+    store = _ALERT_STORES.get(key)
+    if store is None:
+        if len(_ALERT_STORES) >= ALERT_STORE_CACHE_SIZE:
+            del _ALERT_STORES[next(iter(_ALERT_STORES))]
+        store = _ALERT_STORES[key] = AlertStore(alerts)
+    return store
+
+def silence_alert_index() -> AlertStore:
+    """Returns an AlertStore over the alerts silences are matched against.
+    The index is rebuilt only if the underlying alert list changed."""
+    return alert_store(get_alerts(active=True, silenced=True, inhibited=False, unprocessed=False))
+
+def is_active_silence(silence: model.Silence) -> bool:
+    """Returns True for silences alertmanager reports as active."""
+    status = getattr(silence, "status", None)
+    return status is not None and status.state == model.State.active
+
+def find_alerts(silence: model.Silence, index: AlertIndex | None = None) -> list[model.GettableAlert]:
     """Finds and returns alerts for a given silence, 
     according to the labels of the alert and the matchers of the silence."""
-    result_list: list[model.GettableAlert] = []
-    alerts = get_alerts(active=True, silenced=True, inhibited=False, unprocessed=False)
-    for alert in alerts:
-        if is_matching_all(alert.labels, silence.matchers):
-            result_list.append(alert)
-    return result_list
\ No newline at end of file
+    if index is None:
+        index = silence_alert_index()
+    if isinstance(index, AlertStore) and is_active_silence(silence):
+        return index.silenced_by(silence.id)  # type: ignore[attr-defined]
+    return index.find(silence.matchers)
+
+class SilenceAlertJoin:
+    """Bipartite mapping between silences and the alerts matched by their matchers,
+    computed once for both directions."""
+
+    def __init__(self, alerts: AlertIndex | Iterable[model.GettableAlert], silences: Iterable[model.Silence], use_status: bool = True) -> None:
+        index = alerts if isinstance(alerts, AlertIndex) else AlertStore(alerts)
+        self.alerts: list[model.GettableAlert] = index.alerts
+        self.silences: list[model.Silence] = list(silences)
+        self._silence_pos: dict[str | int, int] = {}
+        self._alerts_by_silence: list[list[int]] = []
+        self._silences_by_alert: list[list[int]] = [[] for _ in self.alerts]
+        for spos, silence in enumerate(self.silences):
+            self._silence_pos[self._silence_key(silence)] = spos
+            if use_status and isinstance(index, AlertStore) and is_active_silence(silence):
+                # alertmanager already resolved active silences (status.silencedBy)
+                apositions = index.silenced_positions(silence.id)  # type: ignore[attr-defined]
+            else:
+                apositions = index.positions(silence.matchers)
+            self._alerts_by_silence.append(apositions)
+            for apos in apositions:
+                self._silences_by_alert[apos].append(spos)
+        self._alert_pos: dict[str, int] = {alert.fingerprint: apos for apos, alert in enumerate(self.alerts)}
+
+    @staticmethod
+    def _silence_key(silence: model.Silence) -> str | int:
+        """Silences are identified by id, unsaved silences (without id) by identity."""
+        return getattr(silence, "id", None) or id(silence)
+
+    def alerts_for(self, silence: model.Silence) -> list[model.GettableAlert]:
+        """Returns the alerts matched by a (joined) silence."""
+        spos = self._silence_pos.get(self._silence_key(silence))
+        if spos is None:
+            return []
+        return [self.alerts[apos] for apos in self._alerts_by_silence[spos]]
+
+    def silences_for(self, alert: model.GettableAlert) -> list[model.Silence]:
+        """Returns the silences matching a (joined) alert."""
+        apos = self._alert_pos.get(alert.fingerprint)
+        if apos is None:
+            return []
+        return [self.silences[spos] for spos in self._silences_by_alert[apos]]
+
+    def silences_with_alerts(self) -> list[model.Silence]:
+        """Returns all silences matching at least one alert."""
+        return [silence for silence, apositions in zip(self.silences, self._alerts_by_silence) if apositions]
+
+    def alerts_with_silences(self) -> list[model.GettableAlert]:
+        """Returns all alerts matched by at least one silence."""
+        return [alert for alert, spositions in zip(self.alerts, self._silences_by_alert) if spositions]
+
+def join_silences_alerts(alerts: AlertIndex | Iterable[model.GettableAlert] | None, silences: Iterable[model.Silence], use_status: bool = True) -> SilenceAlertJoin:
+    """Matches all silences against all alerts in one pass.
+    Without alerts, the alerts silences are usually matched against are used.
+    Active silences are resolved by status.silencedBy of the alerts (use_status),
+    matchers are only evaluated for pending and unsaved silences."""
+    if alerts is None:
+        alerts = silence_alert_index()
+    return SilenceAlertJoin(alerts, silences, use_status)
+
+class SilenceStore:
+    """Silences by id, ordered by endsAt and startsAt for bisect range queries.
+    refresh() applies a /silences response incrementally: only silences with a new
+    updatedAt or state are decoded and re-sorted, missing ones are removed."""
+
+    def __init__(self, silences: Iterable[model.GettableSilence] = ()) -> None:
+        self._by_id: dict[str, model.GettableSilence] = {}
+        # id -> (updatedAt, state) of the raw silence, to detect changes without decoding
+        self._versions: dict[str, tuple[str, str]] = {}
+        self._ends: list[tuple[datetime.datetime, str]] = []
+        self._starts: list[tuple[datetime.datetime, str]] = []
+        self.refreshed: float|None = None
+        for silence in silences:
+            self._add(silence)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, silence_id: str) -> bool:
+        return silence_id in self._by_id
+
+    def get(self, silence_id: str) -> model.GettableSilence|None:
+        return self._by_id.get(silence_id)
+
+    def _add(self, silence: model.GettableSilence) -> None:
+        self._by_id[silence.id] = silence
+        bisect.insort(self._ends, (silence.endsAt, silence.id))
+        bisect.insort(self._starts, (silence.startsAt, silence.id))
+
+    def _remove(self, silence_id: str) -> None:
+        silence = self._by_id.pop(silence_id)
+        self._versions.pop(silence_id, None)
+        for entries, key in ((self._ends, silence.endsAt), (self._starts, silence.startsAt)):
+            pos = bisect.bisect_left(entries, (key, silence_id))
+            if pos < len(entries) and entries[pos] == (key, silence_id):
+                del entries[pos]
+
+    def refresh(self, data: Iterable[dict[str, Any]], complete: bool = True) -> tuple[int, int, int]:
+        """Applies raw silences (API shape), returns the number of added, changed and removed silences.
+        With complete, silences not contained in data are removed."""
+        added = changed = 0
+        seen: set[str] = set()
+        for raw in data:
+            silence_id = raw["id"]
+            seen.add(silence_id)
+            version = (raw["updatedAt"], raw["status"]["state"])
+            if self._versions.get(silence_id) == version:
+                continue
+            if silence_id in self._by_id:
+                self._remove(silence_id)
+                changed += 1
+            else:
+                added += 1
+            self._add(decode_silence(raw))
+            self._versions[silence_id] = version
+        removed = 0
+        if complete:
+            for silence_id in [sid for sid in self._by_id if sid not in seen]:
+                self._remove(silence_id)
+                removed += 1
+        self.refreshed = time.monotonic()
+        return (added, changed, removed)
+
+    @staticmethod
+    def _range(entries: list[tuple[datetime.datetime, str]], start: datetime.datetime|None, end: datetime.datetime|None) -> slice:
+        """Positions of the entries strictly between start and end (open if None)."""
+        low = 0 if start is None else bisect.bisect_right(entries, start, key=lambda entry: entry[0])
+        high = len(entries) if end is None else bisect.bisect_left(entries, end, key=lambda entry: entry[0])
+        return slice(low, max(low, high))
+
+    def _select(self, entries: list[tuple[datetime.datetime, str]], start: datetime.datetime|None, end: datetime.datetime|None, states: Iterable[model.State]|None) -> list[model.GettableSilence]:
+        silences = [self._by_id[silence_id] for (_, silence_id) in entries[self._range(entries, start, end)]]
+        if states:
+            state_set = set(states)
+            silences = [silence for silence in silences if silence.status.state in state_set]
+        return silences
+
+    def ends_between(self, start: datetime.datetime|None = None, end: datetime.datetime|None = None, states: Iterable[model.State]|None = None) -> list[model.GettableSilence]:
+        """Returns the silences ending after start and before end, ordered by endsAt."""
+        return self._select(self._ends, start, end, states)
+
+    def ends_before(self, end: datetime.datetime, states: Iterable[model.State]|None = None) -> list[model.GettableSilence]:
+        return self.ends_between(None, end, states)
+
+    def ends_after(self, start: datetime.datetime, states: Iterable[model.State]|None = None) -> list[model.GettableSilence]:
+        return self.ends_between(start, None, states)
+
+    def starts_between(self, start: datetime.datetime|None = None, end: datetime.datetime|None = None, states: Iterable[model.State]|None = None) -> list[model.GettableSilence]:
+        """Returns the silences starting after start and before end, ordered by startsAt."""
+        return self._select(self._starts, start, end, states)
+
+    def next_expiries(self, after: datetime.datetime|None = None) -> Iterator[model.GettableSilence]:
+        """Yields the silences ending after the given time (default: now) in the order they expire,
+        i.e. to sleep until the endsAt of the next one. Reflects the store at the time of the call."""
+        if after is None:
+            after = datetime.datetime.now(datetime.timezone.utc)
+        entries = self._ends[self._range(self._ends, after, None)]
+        for (_, silence_id) in entries:
+            silence = self._by_id.get(silence_id)
+            if silence is not None:
+                yield silence
+
+_SILENCE_STORES: dict[tuple[frozenset[model.State], tuple[str, ...]], SilenceStore] = {}
+
+def silence_store(statelist: Iterable[model.State]|None = None, max_age: float|None = None) -> SilenceStore:
+    """Returns the shared SilenceStore of the silences of the (selected) instances in the given states (default: all),
+    one per state and instance selection.
+    It is refreshed if older than max_age seconds (default: the Cache TTL) or after invalidate_cache(),
+    through the planned query of get_silences (on-disk cache, states compared before decoding)."""
+    states = frozenset(statelist) if statelist else frozenset(model.State)
+    key = (states, tuple(instance_names()))
+    store = _SILENCE_STORES.get(key)
+    if store is None:
+        store = _SILENCE_STORES[key] = SilenceStore()
+    if max_age is None:
+        max_age = float(CACHE_OPTIONS["TTL"])
+    if store.refreshed is None or time.monotonic() - store.refreshed >= max_age:
+        plan = plan_silences(states)
+        fan = check_fan_out(fan_out(lambda inst: fetch_plan(plan, inst)))
+        merged: dict[str, dict[str, Any]] = {}
+        for inst, raw_list in fan.results.items():
+            for raw in raw_list:
+                if raw["id"] not in merged:
+                    merged[raw["id"]] = raw
+                    _SILENCE_INSTANCES[raw["id"]] = inst
+        store.refresh(merged.values())
+    return store
@@ -0,0 +1,120 @@
+"""Polling alerts and silences and reporting the differences between consecutive snapshots"""
+
+import logging
+import time
+from typing import Any, Callable, Iterator, NamedTuple
+
+from requests import RequestException
+
+from amlib import Paths
+
+log = logging.getLogger(__name__)
+
+
+class Change(NamedTuple):
+    """A changed alert or silence. old is None for additions, new is None for removals."""
+    key: str
+    old: Any
+    new: Any
+
+
+class Diff(NamedTuple):
+    added: list[Change]
+    removed: list[Change]
+    changed: list[Change]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def alert_state(data: dict[str, Any]) -> tuple:
+    """Compared part of an alert: its state, silences and inhibitors.
+    updatedAt is left out, it changes whenever Prometheus resends the alert."""
+    status = data["status"]
+    return (status["state"], tuple(status["silencedBy"]), tuple(status["inhibitedBy"]))
+
+def silence_state(data: dict[str, Any]) -> tuple:
+    """Compared part of a silence: its state and update time."""
+    return (data["status"]["state"], data["updatedAt"])
+
+
+class Snapshot:
+    """Last known state of each alert (by fingerprint) or silence (by id).
+    Only added or changed elements are decoded, so besides one dict lookup and
+    state comparison per element the work is O(changes)."""
+
+    def __init__(self, key: str, state: Callable[[dict[str, Any]], tuple], decode: Callable[[dict[str, Any]], Any]) -> None:
+        self.key = key
+        self.state = state
+        self.decode = decode
+        # key -> (state, decoded element)
+        self.items: dict[str, tuple[tuple, Any]] = {}
+
+    def update(self, data: list[dict[str, Any]]) -> Diff:
+        """Replaces the snapshot by the new API response and returns the differences."""
+        diff = Diff([], [], [])
+        items: dict[str, tuple[tuple, Any]] = {}
+        previous = self.items
+        for element in data:
+            key = element[self.key]
+            old = previous.pop(key, None)
+            state = self.state(element)
+            if old is not None and old[0] == state:
+                items[key] = old
+                continue
+            decoded = self.decode(element)
+            items[key] = (state, decoded)
+            if old is None:
+                diff.added.append(Change(key, None, decoded))
+            else:
+                diff.changed.append(Change(key, old[1], decoded))
+        # elements left over are gone (resolved alerts, garbage collected silences)
+        diff.removed.extend(Change(key, old[1], None) for (key, old) in previous.items())
+        self.items = items
+        return diff
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+def alert_snapshot() -> Snapshot:
+    from amlib.tools import decode_alert
+    return Snapshot("fingerprint", alert_state, decode_alert)
+
+def silence_snapshot() -> Snapshot:
+    from amlib.tools import decode_silence
+    return Snapshot("id", silence_state, decode_silence)
+
+
+def poll(fetch: Callable[[], list[dict[str, Any]]], snapshot: Snapshot, interval: float, max_interval: float,
+         backoff: float = 2.0, count: int | None = None, sleep: Callable[[float], None] = time.sleep) -> Iterator[Diff]:
+    """Fetches and diffs every interval seconds and yields the differences, starting with the initial
+    snapshot as additions. While nothing changes the interval grows by backoff up to max_interval.
+    Failed requests are logged and retried with the same backoff, keeping the last snapshot."""
+    delay = interval
+    polls = 0
+    while True:
+        polls += 1
+        try:
+            diff: Diff | None = snapshot.update(fetch())
+        except (RequestException, TimeoutError) as err:  # TimeoutError: no instance answered in time
+            log.warning("poll failed: %s", err)
+            diff = None
+        if diff is not None:
+            yield diff
+        if count is not None and polls >= count:
+            return
+        delay = interval if diff else min(delay * backoff, max(max_interval, interval))
+        sleep(delay)
+
+
+def fetch_alerts(params: dict[str, Any]) -> Callable[[], list[dict[str, Any]]]:
+    """Returns a function fetching the raw alerts of all (selected) instances, not cached."""
+    from amlib.tools import get_json_uncached
+    return lambda: get_json_uncached(Paths.ALERTS.value, params, "fingerprint")
+
+def fetch_silences(params: dict[str, Any]) -> Callable[[], list[dict[str, Any]]]:
+    """Returns a function fetching the raw silences of all (selected) instances, not cached."""
+    from amlib.tools import get_json_uncached
+    return lambda: get_json_uncached(Paths.SILENCES.value, params, "id")
+
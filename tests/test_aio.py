@@ -0,0 +1,30 @@
+import asyncio
+import threading
+
+import pytest
+
+from amlib import aio, tools
+
+def test_async_client_concurrent(monkeypatch: pytest.MonkeyPatch) -> None:
+    # every call waits for the other three, so this only passes if all four run at once
+    barrier = threading.Barrier(4, timeout=5)
+    def get_silence(silence_id: str, instance: str | None = None) -> str:
+        barrier.wait()
+        return f"silence-{silence_id}"
+    monkeypatch.setattr(tools, "get_silence", get_silence)
+
+    async def run() -> list:
+        async with aio.AsyncClient(concurrency=4) as client:
+            return await client.get_silences_by_id(["a", "b", "c", "d"])
+
+    result = asyncio.run(run())
+    assert result == [("a", "silence-a"), ("b", "silence-b"), ("c", "silence-c"), ("d", "silence-d")]
+
+def test_async_iter_alerts(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tools, "iter_alerts", lambda *args: iter(range(600)))
+
+    async def run() -> list:
+        async with aio.AsyncClient() as client:
+            return [alert async for alert in client.iter_alerts()]
+
+    assert asyncio.run(run()) == list(range(600))
@@ -0,0 +1,39 @@
+import pytest
+
+from amlib import config, tools
+
+
+def raw_alert(fingerprint: str) -> dict:
+    return {"labels": {"alertname": "A"}, "annotations": {}, "receivers": [{"name": "team"}], "fingerprint": fingerprint,
+            "startsAt": "2022-09-21T14:00:00Z", "updatedAt": "2022-09-21T14:00:00Z", "endsAt": "2022-09-21T15:00:00Z",
+            "status": {"state": "active", "silencedBy": [], "inhibitedBy": []}}
+
+def raw_group(*fingerprints: str) -> dict:
+    return {"labels": {"alertname": "A"}, "receiver": {"name": "team"}, "alerts": [raw_alert(fp) for fp in fingerprints]}
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_decode_alert_groups(trusted: bool) -> None:
+    groups = tools.decode_alert_groups([raw_group("a", "b")], trusted=trusted, compact=False)
+    assert groups[0].receiver.name == "team"
+    assert tools.label_dict(groups[0].labels) == {"alertname": "A"}
+    assert [alert.fingerprint for alert in groups[0].alerts] == ["a", "b"]
+    assert tools.alert_group_key(groups[0]) == "team:{alertname=A}"
+
+def test_get_alert_groups_merges_instances(monkeypatch: pytest.MonkeyPatch) -> None:
+    url = {"API_PATH": "api/v2/", "HTTP_SILENCE_PATH": "#/silences/"}
+    config.set_config({"Instances": {"eu": {"BASE_URL": "http://127.0.0.1:1/", **url}, "us": {"BASE_URL": "http://127.0.0.1:2/", **url}}})
+    tools.invalidate_cache()
+    responses = {"eu": [raw_group("a", "b")], "us": [raw_group("b", "c")]}
+    paths = []
+    def get_json(path: str, params: dict | None = None, instance: str | None = None) -> list:
+        paths.append(path)
+        return responses[instance]  # type: ignore[index]
+    monkeypatch.setattr(tools, "get_json", get_json)
+    try:
+        groups = tools.get_alert_groups(afilter=("alertname=A",))
+        assert set(paths) == {"alerts/groups"}
+        assert len(groups) == 1
+        assert [alert.fingerprint for alert in groups[0].alerts] == ["a", "b", "c"]
+    finally:
+        config.set_config({"URL": {"BASE_URL": "http://127.0.0.1:1/", **url}})
+        tools.invalidate_cache()
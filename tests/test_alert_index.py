@@ -0,0 +1,57 @@
+import random
+
+from amlib import model
+from amlib import tools
+
+def make_alert(fingerprint: str, **labels: str) -> model.GettableAlert:
+    return model.GettableAlert.parse_obj({
+        "labels": labels,
+        "annotations": {},
+        "receivers": [{"name": "default"}],
+        "fingerprint": fingerprint,
+        "startsAt": "2022-09-21T14:37:18Z",
+        "updatedAt": "2022-09-21T14:37:18Z",
+        "endsAt": "2022-09-21T15:37:18Z",
+        "status": {"state": "active", "silencedBy": [], "inhibitedBy": []},
+    })
+
+def make_matchers(*exprs: str) -> model.Matchers:
+    return model.Matchers.parse_obj([tools.parse_matcher(expr) for expr in exprs])
+
+def test_alert_index_find() -> None:
+    alerts = [
+        make_alert("a", alertname="DiskFull", env="prod", instance="db1"),
+        make_alert("b", alertname="DiskFull", env="dev", instance="db2"),
+        make_alert("c", alertname="CPUHigh", env="prod", instance="web1"),
+        make_alert("d", alertname="CPUHigh", instance="web2"),
+    ]
+    index = tools.AlertIndex(alerts)
+    assert [a.fingerprint for a in index.find(make_matchers("alertname=DiskFull"))] == ["a", "b"]
+    assert [a.fingerprint for a in index.find(make_matchers("alertname=DiskFull", "env=prod"))] == ["a"]
+    assert [a.fingerprint for a in index.find(make_matchers("env!=prod"))] == ["b"]
+    assert [a.fingerprint for a in index.find(make_matchers("instance=~web.*"))] == ["c", "d"]
+    assert [a.fingerprint for a in index.find(make_matchers("instance!=~db.*", "alertname=CPUHigh"))] == ["c", "d"]
+    assert index.find(make_matchers("alertname=Missing")) == []
+    assert index.find(make_matchers("nolabel=~.*")) == []
+
+def test_alert_index_equals_is_matching_all() -> None:
+    rnd = random.Random(42)
+    alerts = [make_alert(str(i), alertname=rnd.choice(["A", "B", "C"]), env=rnd.choice(["prod", "dev", "test"]),
+                         instance=f"host{rnd.randint(0, 9)}") for i in range(200)]
+    index = tools.AlertIndex(alerts)
+    for exprs in [("alertname=A",), ("env!=prod", "alertname=~A|B"), ("instance=~host[1-3]",),
+                  ("instance!=~host1", "env=dev"), ("alertname=B", "env=test", "instance=host5")]:
+        matchers = make_matchers(*exprs)
+        expected = [a for a in alerts if tools.is_matching_all(a.labels, matchers)]
+        assert index.find(matchers) == expected
+
+def test_alert_store_cache_follows_content() -> None:
+    alerts = [make_alert("a", alertname="DiskFull"), make_alert("b", alertname="CPUHigh")]
+    store = tools.alert_store(alerts)
+    assert tools.alert_store(alerts) is store
+    assert tools.alert_store(list(alerts)) is store
+    assert tools.alert_store([make_alert("a", alertname="DiskFull"), alerts[1]]) is not store
+    alerts[1].status.silencedBy = ["s1"]
+    assert [a.fingerprint for a in tools.alert_store(alerts).silenced_by("s1")] == ["b"]
+    alerts.append(make_alert("c", alertname="Load"))
+    assert "c" in tools.alert_store(alerts)
@@ -0,0 +1,28 @@
+import random
+
+import pytest
+
+from amlib import tools
+from tests.test_alert_index import make_alert, make_matchers
+from tests.test_join_silences_alerts import make_silence
+
+columnar = pytest.importorskip("amlib.columnar", exc_type=ImportError)
+
+def test_alert_table_equals_is_matching_all() -> None:
+    rnd = random.Random(7)
+    alerts = [make_alert(str(i), alertname=rnd.choice(["A", "B", "C"]), env=rnd.choice(["prod", "dev"]),
+                         **({"instance": f"host{rnd.randint(0, 9)}"} if i % 3 else {})) for i in range(300)]
+    table = columnar.AlertTable(alerts)
+    exprs_list = [("alertname=A",), ("env!=prod", "alertname=~A|B"), ("instance=~host[1-3]",),
+                  ("instance!=~host1", "env=dev"), ("instance!=host5",), ("alertname=Missing",),
+                  ("nolabel!=x",), ("alertname=B", "env=dev", "instance=host5")]
+    for exprs in exprs_list:
+        matchers = make_matchers(*exprs)
+        assert table.find(matchers) == [a for a in alerts if tools.is_matching_all(a.labels, matchers)]
+
+    silences = [make_silence(f"s{i}", *exprs) for (i, exprs) in enumerate(exprs_list)]
+    matrix = table.match_matrix(silences)
+    assert matrix.shape == (len(silences), len(alerts))
+    for row, silence in enumerate(silences):
+        for col, alert in enumerate(alerts):
+            assert matrix[row, col] == tools.is_matching_all(alert.labels, silence.matchers)
@@ -0,0 +1,27 @@
+from amlib import model
+from amlib import tools
+
+def test_compiled_matcher_anchored() -> None:
+    matcher_re = tools.compile_matcher(model.Matcher(name="job", value="node|api", isEqual=True, isRegex=True))
+    assert matcher_re.matches("node") == True
+    assert matcher_re.matches("api") == True
+    assert matcher_re.matches("node-exporter") == False
+    assert matcher_re.matches("my-api") == False
+    assert matcher_re.matches("node\n") == False
+
+    matcher_neq_re = tools.compile_matcher(model.Matcher(name="job", value="no.e", isEqual=False, isRegex=True))
+    assert matcher_neq_re.matches("node") == False
+    assert matcher_neq_re.matches("nodes") == True
+
+def test_compiled_matchers_shared_cache() -> None:
+    matchers = model.Matchers.parse_obj([
+        {"name": "alertname", "value": "Disk.*", "isRegex": True},
+        {"name": "env", "value": "prod", "isRegex": False, "isEqual": True},
+    ])
+    compiled = tools.compile_matchers(matchers)
+    assert compiled.matchers[0].regex is tools.compile_regex("Disk.*")
+    assert tools.compile_matchers(compiled) is compiled
+    assert compiled.matches({"alertname": "DiskFull", "env": "prod"}) == True
+    assert compiled.matches({"alertname": "DiskFull", "env": "dev"}) == False
+    assert compiled.matches({"alertname": "DiskFull"}) == False
+    assert tools.is_matching_all(model.LabelSet(alertname="DiskFull", env="prod"), matchers) == True
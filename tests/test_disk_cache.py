@@ -0,0 +1,21 @@
+import os
+import time
+
+from amlib import cache
+
+def test_disk_cache(tmp_path) -> None:
+    dcache = cache.DiskCache(str(tmp_path / "cache"), max_age=60)
+    url = "https://alertmanager.example/api/v2/alerts"
+    assert dcache.get(url, {"active": True}) is None
+    dcache.set(url, {"active": True, "filter": ["a=b"]}, '[{"x": 1}]')
+    assert dcache.get(url, {"filter": ("a=b",), "active": True}) == '[{"x": 1}]'
+    assert dcache.get(url, {"active": False}) is None
+    assert [name for name in os.listdir(tmp_path / "cache") if not name.endswith(".json")] == []
+
+    dcache.max_age = 1
+    path = os.path.join(dcache.directory, dcache.key(url, {"active": True, "filter": ["a=b"]}) + ".json")
+    os.utime(path, (time.time() - 5, time.time() - 5))
+    assert dcache.get(url, {"active": True, "filter": ["a=b"]}) is None
+
+    dcache.clear()
+    assert os.listdir(tmp_path / "cache") == []
@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from amlib import hedge
+
+
+class FakeSession:
+    """Answers GETs after a delay per URL, raises for URLs without delay."""
+    def __init__(self, delays: dict[str, float], status: int = 200) -> None:
+        self.delays = delays
+        self.status = status
+        self.requested: list[str] = []
+        self.lock = threading.Lock()
+
+    def get(self, url: str, **kwargs: object) -> requests.Response:
+        with self.lock:
+            self.requested.append(url)
+        if url not in self.delays:
+            raise requests.ConnectionError(f"{url} refused")
+        time.sleep(self.delays[url])
+        resp = requests.Response()
+        resp.status_code = self.status
+        resp.url = url
+        return resp
+
+def test_primary_fast() -> None:
+    session = FakeSession({"a": 0.0, "b": 0.0})
+    resp, url = hedge.hedged_get(session, ["a", "b"], delay=0.5)  # type: ignore[arg-type]
+    assert url == "a" and resp.ok
+    assert session.requested == ["a"]
+
+def test_hedge_slow_primary() -> None:
+    session = FakeSession({"a": 1.0, "b": 0.0})
+    start = time.monotonic()
+    _, url = hedge.hedged_get(session, ["a", "b"], delay=0.05)  # type: ignore[arg-type]
+    assert url == "b"
+    assert time.monotonic() - start < 0.5
+
+def test_failed_primary() -> None:
+    session = FakeSession({"b": 0.0})
+    _, url = hedge.hedged_get(session, ["a", "b"], delay=5)  # type: ignore[arg-type]
+    assert url == "b"
+
+def test_all_failed() -> None:
+    with pytest.raises(requests.ConnectionError):
+        hedge.hedged_get(FakeSession({}), ["a", "b"], delay=0.05)  # type: ignore[arg-type]
+    resp, _ = hedge.hedged_get(FakeSession({"a": 0.0, "b": 0.0}, status=503), ["a", "b"], delay=0.05)  # type: ignore[arg-type]
+    assert resp.status_code == 503
+
+def test_latency_tracker() -> None:
+    tracker = hedge.LatencyTracker()
+    assert tracker.delay(95, 0.2, 10) == 0.2
+    for latency in range(1, 101):
+        tracker.add(latency / 100)
+    assert tracker.percentile(95) == 0.95
+    assert tracker.delay(50, 0.2, 10) == 0.5
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+from requests import ConnectionError as RequestsConnectionError
+
+from amlib import config, model, tools
+
+
+def url_section(port: int) -> dict:
+    return {"BASE_URL": f"http://127.0.0.1:{port}/", "API_PATH": "api/v2/", "HTTP_SILENCE_PATH": "#/silences/"}
+
+@pytest.fixture
+def instances() -> None:
+    config.set_config({"Instances": {"eu": url_section(1), "us": {**url_section(2), "TIMEOUT": 1, "Header": {"X-Region": "us"}}}})
+    tools.invalidate_cache()
+    yield
+    config.set_config({"URL": url_section(1)})
+    tools.invalidate_cache()
+
+def test_instances_config(instances: None) -> None:
+    assert config.instance_names() == ["eu", "us"]
+    assert config.URLS["BASE_API_URL"] == "http://127.0.0.1:1/api/v2/"
+    assert config.INSTANCES["us"]["TIMEOUT"] == (1, 1)
+    assert tools.request_headers("us")["X-Region"] == "us"
+    config.select_instances(["us"])
+    assert config.instance_names() == ["us"]
+    with pytest.raises(KeyError):
+        config.select_instances(["ap"])
+
+def test_fan_out_degrades(instances: None) -> None:
+    def call(name: str) -> str:
+        if name == "us":
+            raise RequestsConnectionError("refused")
+        return name
+    result = tools.fan_out(call)
+    assert result.results == {"eu": "eu"}
+    assert list(result.errors) == ["us"]
+
+def test_fan_out_timeout(instances: None) -> None:
+    release = threading.Event()
+    def call(name: str) -> str:
+        if name == "us":
+            release.wait(5)
+        return name
+    start = time.monotonic()
+    result = tools.fan_out(call)
+    assert time.monotonic() - start < 2.8
+    assert result.results == {"eu": "eu"}
+    assert isinstance(result.errors["us"], TimeoutError)
+    release.set()
+
+def test_get_alerts_dedup(instances: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    def alert(fingerprint: str) -> dict:
+        return {"labels": {"alertname": "A"}, "annotations": {}, "receivers": [{"name": "r"}], "fingerprint": fingerprint,
+                "startsAt": "2022-09-21T14:00:00Z", "updatedAt": "2022-09-21T14:00:00Z", "endsAt": "2022-09-21T15:00:00Z",
+                "status": {"state": "active", "silencedBy": [], "inhibitedBy": []}}
+    responses = {"eu": [alert("a"), alert("b")], "us": [alert("b"), alert("c")]}
+    monkeypatch.setattr(tools, "get_json", lambda path, params=None, instance=None: responses[instance])
+    result = tools.get_alerts_multi()
+    assert [a.fingerprint for a in result.items] == ["a", "b", "c"]
+    assert result.sources["b"] == ["eu", "us"]
+    assert tools.get_alerts() is result.items
+    # a new selection does not return the cached results of all instances
+    config.select_instances(["us"])
+    assert [a.fingerprint for a in tools.get_alerts()] == ["b", "c"]
+    config.select_instances([])
+    assert tools.get_alerts() is result.items
+
+def make_status(config_text: str = "route: {}", version: str = "0.25", peers: int = 3) -> model.AlertmanagerStatus:
+    return model.AlertmanagerStatus(**{
+        "cluster": {"status": "ready", "peers": [{"name": f"p{i}", "address": f"10.0.0.{i}:9094"} for i in range(peers)]},
+        "versionInfo": {"version": version, "revision": "r", "branch": "b", "buildUser": "u", "buildDate": "d", "goVersion": "go"},
+        "config": {"original": config_text}, "uptime": "2022-09-21T14:00:00Z"})
+
+def test_probe_issues() -> None:
+    probes = [tools.ProbeResult("a", 0.1, make_status(), None),
+              tools.ProbeResult("b", 0.1, make_status(), None),
+              tools.ProbeResult("c", 2.5, make_status("route: {receiver: x}", "0.24", 2), None),
+              tools.ProbeResult("d", 0.0, None, RequestsConnectionError("refused"))]
+    issues = tools.probe_issues(probes, slow=1.0)
+    assert issues["a"] == issues["b"] == []
+    assert issues["c"] == ["slow: 2.50s", "config differs", "version 0.24 differs from 0.25", "2 peers instead of 3"]
+    assert issues["d"][0].startswith("unreachable")
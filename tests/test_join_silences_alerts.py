@@ -0,0 +1,75 @@
+from amlib import model
+from amlib import tools
+from tests.test_alert_index import make_alert
+
+def make_silence(silence_id: str, *exprs: str, state: str = "pending") -> model.GettableSilence:
+    return model.GettableSilence.parse_obj({
+        "id": silence_id,
+        "matchers": [tools.parse_matcher(expr) for expr in exprs],
+        "startsAt": "2022-09-21T14:00:00Z",
+        "endsAt": "2022-09-21T16:00:00Z",
+        "updatedAt": "2022-09-21T14:00:00Z",
+        "createdBy": "test",
+        "comment": "test",
+        "status": {"state": state},
+    })
+
+def test_join_silences_alerts() -> None:
+    alerts = [
+        make_alert("a", alertname="DiskFull", env="prod"),
+        make_alert("b", alertname="DiskFull", env="dev"),
+        make_alert("c", alertname="CPUHigh", env="prod"),
+    ]
+    silences = [
+        make_silence("s1", "alertname=DiskFull"),
+        make_silence("s2", "env=prod"),
+        make_silence("s3", "alertname=Missing"),
+    ]
+    join = tools.join_silences_alerts(alerts, silences)
+    assert [a.fingerprint for a in join.alerts_for(silences[0])] == ["a", "b"]
+    assert [a.fingerprint for a in join.alerts_for(silences[1])] == ["a", "c"]
+    assert join.alerts_for(silences[2]) == []
+    assert [s.id for s in join.silences_for(alerts[0])] == ["s1", "s2"]
+    assert [s.id for s in join.silences_for(alerts[1])] == ["s1"]
+    assert [s.id for s in join.silences_with_alerts()] == ["s1", "s2"]
+    assert len(join.alerts_with_silences()) == 3
+
+def test_join_unsaved_silence() -> None:
+    alerts = [make_alert("a", alertname="DiskFull")]
+    silence = model.Silence(matchers=model.Matchers.parse_obj([tools.parse_matcher("alertname=~Disk.*")]),
+                            startsAt="2022-09-21T14:00:00Z", endsAt="2022-09-21T16:00:00Z",
+                            createdBy="test", comment="test")
+    join = tools.join_silences_alerts(alerts, [silence])
+    assert join.alerts_for(silence) == alerts
+    assert join.silences_for(alerts[0]) == [silence]
+
+def test_join_active_silences_by_status() -> None:
+    alerts = [
+        make_alert("a", alertname="DiskFull", env="prod"),
+        make_alert("b", alertname="DiskFull", env="dev"),
+    ]
+    alerts[1].status.silencedBy = ["s1"]
+    silences = [make_silence("s1", "alertname=DiskFull", state="active")]
+    join = tools.join_silences_alerts(alerts, silences)
+    assert join.alerts_for(silences[0]) == [alerts[1]]
+    assert join.silences_for(alerts[0]) == []
+    join = tools.join_silences_alerts(alerts, silences, use_status=False)
+    assert join.alerts_for(silences[0]) == alerts
+    store = tools.AlertStore(alerts)
+    assert store.get("b") is alerts[1]
+    assert store.get("x") is None
+    assert store.silenced_by("s1") == [alerts[1]]
+    assert tools.get_alert_by_fingerprint("a", alerts) is alerts[0]
+
+def test_modify_noop_previews_edited_matchers(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    from click.testing import CliRunner
+    from amlib.cligrp.silence import silence_modify
+    disk = make_alert("a", alertname="DiskFull")
+    disk.status.silencedBy = ["s1"]
+    alerts = [disk, make_alert("c", alertname="CPUHigh")]
+    monkeypatch.setattr(tools, "get_silence", lambda sid: make_silence(sid, "alertname=DiskFull", state="active"))
+    monkeypatch.setattr(tools, "silence_alert_index", lambda: tools.AlertStore(alerts))
+    result = CliRunner().invoke(silence_modify, ["--sid", "s1", "--noop", "--show-alerts", "alertname=CPUHigh"])
+    assert result.exit_code == 0, result.output
+    assert "CPUHigh" in result.output and "DiskFull" not in result.output
+    assert "Found 1 matching alerts" in result.output
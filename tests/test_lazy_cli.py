@@ -0,0 +1,18 @@
+import subprocess
+import sys
+
+from click.testing import CliRunner
+
+from amlib.am_cli import main_cli
+
+def test_help_does_not_import_commands() -> None:
+    code = ("import sys; from amlib.am_cli import main_cli; "
+            "main_cli(['--help'], standalone_mode=False); "
+            "print(sorted(m for m in ('amlib.tools', 'amlib.model', 'requests', 'tabulate', 'yaml', 'amlib.cligrp.silence') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+def test_lazy_subcommands() -> None:
+    result = CliRunner().invoke(main_cli, ["silence", "--help"])
+    assert result.exit_code == 0
+    assert "expires" in result.output
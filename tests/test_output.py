@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+
+import pytest
+
+from amlib.cligrp import output
+from amlib.records import AlertRecord
+
+
+def make_alert(fingerprint: str, **labels: str) -> AlertRecord:
+    return AlertRecord({"labels": labels, "annotations": {"summary": "x"}, "receivers": [{"name": "r"}], "fingerprint": fingerprint,
+                        "startsAt": "2022-09-21T14:00:00Z", "updatedAt": "2022-09-21T14:00:00Z", "endsAt": "2022-09-21T15:00:00Z",
+                        "status": {"state": "suppressed", "silencedBy": ["s1"], "inhibitedBy": []}})
+
+def test_jsonl(capsys: pytest.CaptureFixture[str]) -> None:
+    renderer = output.alert_renderer("jsonl", extra=["silences"])
+    renderer.add(make_alert("a", alertname="A"), silences=["s1"])
+    renderer.add(make_alert("b", alertname="B"))
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["fingerprint"] for line in lines] == ["a", "b"]
+    assert json.loads(lines[0])["silences"] == ["s1"]
+    assert json.loads(lines[0])["status"]["state"] == "suppressed"
+
+def test_csv(capsys: pytest.CaptureFixture[str]) -> None:
+    renderer = output.alert_renderer("csv")
+    renderer.add(make_alert("a", job="j", alertname="A"))
+    renderer.close()
+    rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+    assert rows[0]["fingerprint"] == "a"
+    assert rows[0]["labels"] == "alertname=A,job=j"
+    assert rows[0]["silencedBy"] == "s1"
+
+def test_table(capsys: pytest.CaptureFixture[str]) -> None:
+    renderer = output.alert_renderer("table")
+    renderer.add(make_alert("a", alertname="A"))
+    renderer.add(make_alert("b", alertname="B"))
+    assert capsys.readouterr().out == ""
+    renderer.close()
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == ["fingerprint", "state", "startsAt", "labels"]
+    assert len(lines) == 4 and not renderer.machine
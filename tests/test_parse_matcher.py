@@ -31,3 +31,10 @@ def test_parse_matcher() -> None:
     assert matcher4.value == "bar"
     assert matcher4.isEqual == False
     assert matcher4.isRegex == True
+
+def test_parse_negative_regex_matcher() -> None:
+    # "!~" as printed by matcher_op_to_str, alertmanager's syntax for "!=~"
+    matcher = tools.parse_matcher("foo!~ba.*")
+    assert matcher is not None
+    assert (matcher.name, matcher.value, matcher.isEqual, matcher.isRegex) == ("foo", "ba.*", False, True)
+    assert tools.matcher_op_to_str(matcher) == "!~"
@@ -0,0 +1,27 @@
+import datetime
+
+from amlib import model, tools
+
+
+def raw_silence(state: str, ends: str) -> dict:
+    return {"id": state + ends, "status": {"state": state}, "endsAt": ends}
+
+def test_plan_alerts() -> None:
+    plan = tools.plan_alerts(True, False, False, False, ("alertname=A", 'job=~"api.*"'), "team", "f1")
+    assert plan.params == {"active": True, "silenced": False, "inhibited": False, "unprocessed": False,
+                           "filter": ["alertname=A", 'job=~"api.*"'], "receiver": "team"}
+    assert "filter=alertname=A" in plan.pushed and "receiver=team" in plan.pushed
+    assert plan.accepts({"fingerprint": "f1"})
+    assert not plan.accepts({"fingerprint": "f2"})
+    assert not tools.plan_alerts().local
+
+def test_plan_silences() -> None:
+    now = datetime.datetime(2022, 9, 21, 14, 0, tzinfo=datetime.timezone.utc)
+    plan = tools.plan_silences((model.State.active, model.State.pending), ("alertname=A",), ends_before=now)
+    assert plan.params == {"filter": ["alertname=A"]}
+    assert plan.accepts(raw_silence("active", "2022-09-21T13:00:00Z"))
+    assert not plan.accepts(raw_silence("expired", "2022-09-21T13:00:00Z"))
+    assert not plan.accepts(raw_silence("pending", "2022-09-21T15:00:00.123456789Z"))
+    assert "endsAt<" in plan.describe()
+    # all states need no local evaluation
+    assert not tools.plan_silences(tuple(model.State)).local
@@ -0,0 +1,83 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from typing import Any
+
+import pytest
+
+from amlib import receiver
+
+
+def payload(name: str, *alerts: tuple[str, str, str]) -> dict[str, Any]:
+    return {"receiver": name, "alerts": [
+        {"status": status, "fingerprint": fingerprint, "labels": {"alertname": alertname}, "annotations": {},
+         "startsAt": "2022-09-21T14:00:00Z", "endsAt": "0001-01-01T00:00:00Z"}
+        for (fingerprint, alertname, status) in alerts]}
+
+def test_store_apply() -> None:
+    store = receiver.WebhookStore()
+    store.apply([payload("team", ("a", "Disk", "firing"), ("b", "CPU", "firing")),
+                 payload("ops", ("a", "Disk", "firing"))])
+    assert len(store) == 2
+    assert [rec.name for rec in store.find(receiver.filter_matchers(['alertname="Disk"']))[0].receivers] == ["team", "ops"]
+    assert [a.fingerprint for a in store.find(receiver.filter_matchers([]), receiver="te.*")] == ["a", "b"]
+    assert store.find(receiver.filter_matchers([]), receiver="tea") == []
+    store.apply([payload("team", ("a", "Disk", "resolved"))])
+    assert [a.fingerprint for a in store.alerts()] == ["b"]
+    assert store.find(receiver.filter_matchers(["alertname=Disk"])) == []
+
+def test_bounded_queue_batches() -> None:
+    store = receiver.WebhookStore(queue_size=3, batch_size=2)
+    assert all(store.put(payload("team", (str(i), "A", "firing"))) for i in range(3))
+    assert not store.put(payload("team", ("x", "A", "firing")))
+    store.start()
+    store.stop()
+    assert len(store) == 3
+
+def test_server() -> None:
+    store = receiver.WebhookStore()
+    store.start()
+    server = receiver.make_server(store, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        request = urllib.request.Request(f"{base}/webhook", data=json.dumps(payload("team", ("a", "Disk", "firing"))).encode(), method="POST")
+        assert urllib.request.urlopen(request).status == 200
+        store.stop()
+        alerts = json.load(urllib.request.urlopen(f"{base}/api/v2/alerts?filter=alertname%3DDisk"))
+        assert [alert["fingerprint"] for alert in alerts] == ["a"]
+        assert alerts[0]["receivers"] == [{"name": "team"}]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_malformed_payloads() -> None:
+    store = receiver.WebhookStore()
+    store.start()
+    server = receiver.make_server(store, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        for body in ([1], 5, {"receiver": "team"}, {"alerts": [{"labels": {}}]}, {"alerts": [{"fingerprint": "a"}]}):
+            request = urllib.request.Request(f"{base}/webhook", data=json.dumps(body).encode(), method="POST")
+            with pytest.raises(urllib.error.HTTPError) as err:
+                urllib.request.urlopen(request)
+            assert err.value.code == 400
+        # a payload failing in apply does not stop the worker
+        store.put({"alerts": [{"fingerprint": "x"}]})
+        request = urllib.request.Request(f"{base}/webhook", data=json.dumps(payload("team", ("a", "Disk", "firing"))).encode(), method="POST")
+        assert urllib.request.urlopen(request).status == 200
+        store.stop()
+        assert [alert.fingerprint for alert in store.alerts()] == ["a"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_failing_payload_in_batch() -> None:
+    store = receiver.WebhookStore()
+    store.put({"alerts": [{"fingerprint": "x"}]})
+    store.put(payload("team", ("a", "Disk", "firing")))
+    store.put(None)  # type: ignore[arg-type]
+    store.run()
+    assert [alert.fingerprint for alert in store.alerts()] == ["a"]
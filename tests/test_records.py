@@ -0,0 +1,68 @@
+import datetime
+import json
+
+import pytest
+
+from amlib import model, records, tools
+from tests.test_join_silences_alerts import make_silence
+
+ALERT = {
+    "labels": {"alertname": "DiskFull", "env": "prod"},
+    "annotations": {"summary": "disk full"},
+    "receivers": [{"name": "default"}],
+    "fingerprint": "0123456789abcdef",
+    "startsAt": "2022-09-21T14:37:18.123456789Z",
+    "updatedAt": "2022-09-21T14:38:18Z",
+    "endsAt": "2022-09-21T15:37:18.5+02:00",
+    "generatorURL": "http://prometheus.example/graph",
+    "status": {"state": "suppressed", "silencedBy": ["s1"], "inhibitedBy": []},
+}
+
+def test_parse_timestamp() -> None:
+    assert records.parse_timestamp("2022-09-21T14:37:18.123456789Z") == datetime.datetime(
+        2022, 9, 21, 14, 37, 18, 123456, tzinfo=datetime.timezone.utc)
+    assert records.parse_timestamp("2022-09-21T14:37:18+02:00").utcoffset() == datetime.timedelta(hours=2)
+
+def test_parse_timestamp_fractions() -> None:
+    # RFC3339Nano with trailing zeros trimmed: fromisoformat of Python 3.10 accepts 3 or 6 digits only
+    for fraction, micro in (("1", 100000), ("12", 120000), ("123", 123000), ("12345", 123450), ("123456789", 123456)):
+        assert records.parse_timestamp(f"2022-09-21T14:00:18.{fraction}Z") == datetime.datetime(
+            2022, 9, 21, 14, 0, 18, micro, tzinfo=datetime.timezone.utc)
+    assert records.parse_timestamp("2022-09-21T14:00:18.5+02:00").microsecond == 500000
+
+def test_alert_record_matches_model() -> None:
+    record = tools.decode_alerts([ALERT], trusted=True)[0]
+    validated = tools.decode_alerts([ALERT], trusted=False)[0]
+    assert isinstance(record, records.AlertRecord)
+    assert record.to_model() == validated
+    assert record.startsAt == validated.startsAt
+    assert record.endsAt == validated.endsAt
+    assert record.status.state == model.State1.suppressed
+    assert tools.label_dict(record.labels) == tools.label_dict(validated.labels)
+    with pytest.raises(AttributeError):
+        record.fingerprint = "x"
+
+def test_silence_record_matches_model() -> None:
+    silence = make_silence("s1", "alertname=~Disk.*", state="active")
+    record = tools.decode_silences([json.loads(silence.json())], trusted=True)[0]
+    assert record.to_model() == silence
+    assert record.endsAt == silence.endsAt
+    assert tools.is_active_silence(record)
+    assert tools.is_matching_all(ALERT["labels"], record.matchers)
+
+def test_records_share_label_strings() -> None:
+    first, second = tools.decode_alerts(json.loads(json.dumps([ALERT, ALERT])), trusted=True)
+    (key1, val1), = [(k, v) for (k, v) in first.labels.items() if k == "env"]
+    (key2, val2), = [(k, v) for (k, v) in second.labels.items() if k == "env"]
+    assert key1 is key2 and val1 is val2
+    assert first.receivers[0] is second.receivers[0]
+    assert first.status is second.status
+
+def test_compact_alerts() -> None:
+    validated = tools.decode_alerts([ALERT], trusted=False)
+    compact = tools.decode_alerts([ALERT], trusted=False, compact=True)
+    assert isinstance(compact[0], records.AlertRecord)
+    assert compact[0].to_model() == validated[0]
+    assert records.compact_alerts(compact) == compact
+    silence = make_silence("s1", "alertname=~Disk.*")
+    assert records.compact_silences([silence])[0].to_model() == silence
@@ -0,0 +1,39 @@
+import time
+
+from requests import ConnectionError
+
+from amlib import tools
+
+def test_run_bulk_order_and_errors() -> None:
+    def fetch(item_id: str) -> str:
+        time.sleep(0.01 * (5 - int(item_id)))
+        if item_id == "3":
+            raise ConnectionError("unreachable")
+        return f"silence-{item_id}"
+    ids = ["1", "2", "3", "4"]
+    result = tools.run_bulk(fetch, ids, parallel=4)
+    assert [item_id for (item_id, _) in result] == ids
+    assert [res for (_, res) in result if not isinstance(res, Exception)] == ["silence-1", "silence-2", "silence-4"]
+    assert isinstance(result[2][1], ConnectionError)
+    assert [(i, r if isinstance(r, str) else type(r)) for (i, r) in tools.run_bulk(fetch, ids, parallel=1)] == \
+           [(i, r if isinstance(r, str) else type(r)) for (i, r) in result]
+    assert tools.run_bulk(fetch, [], parallel=4) == []
+
+def test_bulk_commands_report_errors(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    from click.testing import CliRunner
+    from amlib.cligrp.silence import silence_delete, silence_show
+    def expire(silence_id: str) -> bool:
+        if silence_id == "down":
+            raise ConnectionError("unreachable")
+        if silence_id == "slow":
+            raise TimeoutError("no response within 2s")
+        return silence_id == "s1"
+    monkeypatch.setattr(tools, "expire_silence", expire)
+    result = CliRunner().invoke(silence_delete, ["s1", "down", "gone", "slow"])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == ["SilenceID: s1 *DELETED*", "SilenceID: down *ERROR* unreachable",
+                                          "SilenceID: gone *NOT FOUND*", "SilenceID: slow *ERROR* no response within 2s"]
+    monkeypatch.setattr(tools, "get_silence", lambda silence_id: expire(silence_id) or None)
+    monkeypatch.setattr(tools, "silence_alert_index", lambda: tools.AlertStore([]))
+    result = CliRunner().invoke(silence_show, ["down", "gone"])
+    assert result.stderr.splitlines() == ["SilenceID: down *ERROR* unreachable", "SilenceID: gone *NOT FOUND*"]
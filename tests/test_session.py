@@ -0,0 +1,16 @@
+from amlib import config, session
+
+def test_create_session() -> None:
+    sess = session.create_session({"POOL_MAXSIZE": 3, "RETRIES": 5})
+    adapter = sess.get_adapter("https://alertmanager.example/")
+    assert adapter._pool_maxsize == 3
+    assert adapter.max_retries.total == 5
+    assert "GET" in adapter.max_retries.allowed_methods
+    assert "POST" not in adapter.max_retries.allowed_methods
+
+def test_shared_session() -> None:
+    config.set_config({"URL": {"BASE_URL": "https://alertmanager.example/", "API_PATH": "api/v2/", "HTTP_SILENCE_PATH": "#/silences/"}})
+    first = session.get_session()
+    assert session.get_session() is first
+    session.reset_session()
+    assert session.get_session() is not first
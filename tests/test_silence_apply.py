@@ -0,0 +1,54 @@
+import datetime
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from amlib import model, silencefile, tools
+
+UTC = datetime.timezone.utc
+
+
+def test_build_silence() -> None:
+    defaults = {"duration": "2h", "createdBy": "bob", "comment": None}
+    silence = silencefile.build_silence({"matchers": 'alertname=Disk instance=~"db .*"', "comment": "maint",
+                                         "startsAt": "2022-09-21T10:00:00"}, defaults, UTC)
+    assert [(m.name, m.value, m.isRegex) for m in silence.matchers.__root__] == [("alertname", "Disk", False), ("instance", "db .*", True)]
+    assert silence.endsAt == datetime.datetime(2022, 9, 21, 12, tzinfo=UTC)
+    silence = silencefile.build_silence({"matchers": ["alertname=Disk"], "comment": "maint", "startsAt": "2022-09-21T10:00:00Z",
+                                         "endsAt": "2022-09-21T11:00:00Z"}, defaults)
+    assert silence.endsAt == datetime.datetime(2022, 9, 21, 11, tzinfo=UTC)
+    for entry in ({"matchers": ["alertname=Disk"]}, {"matchers": ["Disk"], "comment": "x"}, {"matchers": [], "comment": "x"},
+                  {"matchers": ["a=b"], "comment": "x", "label": "y"}):
+        with pytest.raises(ValueError):
+            silencefile.build_silence(entry, defaults)
+
+def test_read_entries(tmp_path) -> None:  # type: ignore[no-untyped-def]
+    (tmp_path / "s.yaml").write_text("silences:\n  - matchers: [a=b]\n    comment: x\n")
+    (tmp_path / "s.csv").write_text('matchers,comment,duration\n"a=b c=~""d.*""",x,\n')
+    assert silencefile.read_entries(str(tmp_path / "s.yaml")) == [{"matchers": ["a=b"], "comment": "x"}]
+    assert silencefile.read_entries(str(tmp_path / "s.csv")) == [{"matchers": 'a=b c=~"d.*"', "comment": "x"}]
+
+def new_silence(comment: str, *matchers: str) -> model.Silence:
+    return silencefile.build_silence({"matchers": list(matchers), "comment": comment, "duration": 60}, {"createdBy": "bob"})
+
+def test_apply_silences_skips_existing(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    existing = SimpleNamespace(id="old", matchers=new_silence("maint", "b=2", "a=1").matchers, comment="maint")
+    submitted = []
+    lock = threading.Lock()
+    def set_silence(silence: model.Silence) -> tuple[bool, str]:
+        with lock:
+            submitted.append(silence.comment)
+        if silence.comment == "bad":
+            return (False, "invalid")
+        return (True, f"id-{silence.comment}")
+    monkeypatch.setattr(tools, "set_silence", set_silence)
+    silences = [new_silence("maint", "a=1", "b=2"), new_silence("new", "a=1"), new_silence("new", "a=1"), new_silence("bad", "a=1")]
+    results = tools.apply_silences(silences, parallel=4, existing=[existing])  # type: ignore[list-item]
+    assert [(r.status, r.detail) for r in results] == [("exists", "old"), ("created", "id-new"), ("duplicate", ""), ("failed", "invalid")]
+    assert sorted(submitted) == ["bad", "new"]
+
+def test_parse_matchers_operators() -> None:
+    matchers = silencefile.parse_matchers('a=1 b!=2 c=~"3.*" d!~4')
+    assert [(m.name, m.value, m.isEqual, m.isRegex) for m in matchers] == [
+        ("a", "1", True, False), ("b", "2", False, False), ("c", "3.*", True, True), ("d", "4", False, True)]
@@ -0,0 +1,16 @@
+from click.testing import CliRunner
+
+from amlib import tools
+from amlib.cligrp.silence import silence_delete
+
+
+def test_delete_reads_stdin_only_with_dash(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    expired = []
+    monkeypatch.setattr(tools, "expire_silences", lambda ids, parallel: [(sid, expired.append(sid) is None) for sid in ids])
+    result = CliRunner().invoke(silence_delete, [], input="s1 s2\n")
+    assert result.exit_code == 2
+    assert "no silence id given" in result.output
+    assert expired == []
+    result = CliRunner().invoke(silence_delete, ["s0", "-"], input="s1\ns2\n")
+    assert result.exit_code == 0
+    assert expired == ["s0", "s1", "s2"]
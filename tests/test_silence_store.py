@@ -0,0 +1,81 @@
+import datetime
+import json
+from typing import Iterator
+
+import pytest
+
+from amlib import config, model, tools
+from amlib.session import reset_session
+
+
+def raw_silence(sid: str, starts: str, ends: str, state: str = "active", updated: str = "2022-09-21T00:00:00Z") -> dict:
+    return {"id": sid, "matchers": [{"name": "alertname", "value": sid, "isRegex": False, "isEqual": True}],
+            "startsAt": starts, "endsAt": ends, "updatedAt": updated, "createdBy": "bob", "comment": "c", "status": {"state": state}}
+
+def at(hour: int) -> datetime.datetime:
+    return datetime.datetime(2022, 9, 21, hour, tzinfo=datetime.timezone.utc)
+
+DATA = [raw_silence("a", "2022-09-21T01:00:00Z", "2022-09-21T05:00:00Z"),
+        raw_silence("b", "2022-09-21T02:00:00Z", "2022-09-21T03:00:00Z", "expired"),
+        raw_silence("c", "2022-09-21T08:00:00Z", "2022-09-21T10:00:00Z", "pending")]
+
+def test_range_queries() -> None:
+    store = tools.SilenceStore()
+    assert store.refresh(DATA) == (3, 0, 0)
+    assert [s.id for s in store.ends_before(at(6))] == ["b", "a"]
+    assert [s.id for s in store.ends_after(at(3))] == ["a", "c"]
+    assert [s.id for s in store.ends_between(at(4), at(11), [model.State.pending])] == ["c"]
+    assert [s.id for s in store.starts_between(at(1), at(9))] == ["b", "c"]
+    assert [s.id for s in store.next_expiries(at(4))] == ["a", "c"]
+
+def test_incremental_refresh(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    store = tools.SilenceStore()
+    store.refresh(DATA)
+    decoded = []
+    decode = tools.decode_silence
+    monkeypatch.setattr(tools, "decode_silence", lambda data: decoded.append(data["id"]) or decode(data))
+    changed = raw_silence("a", "2022-09-21T01:00:00Z", "2022-09-21T11:00:00Z", updated="2022-09-21T01:30:00Z")
+    assert store.refresh([changed, DATA[2]]) == (0, 1, 1)
+    assert decoded == ["a"]
+    assert "b" not in store
+    assert [s.id for s in store.ends_after(at(6))] == ["c", "a"]
+    # state changes (pending -> active) do not change updatedAt
+    assert store.refresh([changed, raw_silence("c", "2022-09-21T08:00:00Z", "2022-09-21T10:00:00Z")]) == (0, 1, 0)
+    assert store.get("c").status.state == model.State.active
+
+@pytest.fixture
+def single_instance() -> Iterator[None]:
+    """Configures one instance, restores the previous configuration afterwards."""
+    saved = [(mapping, mapping.copy()) for mapping in (config.URLS, config.HEADERS, config.INSTANCES)]
+    selected = list(config.SELECTED_INSTANCES)
+    config.set_config({"URL": {"BASE_URL": "http://127.0.0.1:1/", "API_PATH": "api/v2/", "HTTP_SILENCE_PATH": "#/silences/"}})
+    try:
+        yield
+    finally:
+        for mapping, copy in saved:
+            mapping.clear()
+            mapping.update(copy)
+        config.SELECTED_INSTANCES[:] = selected
+        reset_session()
+        tools.invalidate_cache()
+
+def test_silence_store_uses_plan_and_disk_cache(single_instance: None, monkeypatch, tmp_path) -> None:  # type: ignore[no-untyped-def]
+    monkeypatch.setitem(config.CACHE_OPTIONS, "MAX_AGE", 60)
+    monkeypatch.setitem(config.CACHE_OPTIONS, "DIRECTORY", str(tmp_path))
+    requests = []
+    class Response:
+        ok = True
+        text = json.dumps(DATA)
+        def json(self) -> list:
+            return json.loads(self.text)
+    monkeypatch.setattr(tools, "request", lambda method, path, instance=None, **kw: requests.append(path) or Response())
+    monkeypatch.setattr(tools, "_SILENCE_STORES", {})
+    states = [model.State.active, model.State.pending]
+    assert [s.id for s in tools.silence_store(states).ends_after(at(0))] == ["a", "c"]
+    # a later amcli call (new process, empty store) within MAX_AGE is served from disk
+    monkeypatch.setattr(tools, "_SILENCE_STORES", {})
+    assert len(tools.silence_store(states)) == 2
+    assert requests == ["silences"]
+    tools.invalidate_cache()
+    assert [s.id for s in tools.silence_store([model.State.expired]).ends_before(at(6))] == ["b"]
+    assert requests == ["silences", "silences"]
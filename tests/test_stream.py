@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from amlib import stream
+
+def chunked(text: str, size: int) -> list[bytes]:
+    data = text.encode()
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def test_iter_json_array_chunks() -> None:
+    items = [{"labels": {"alertname": f"Ä{i}", "x": [1, 2, {"y": None}]}, "n": i} for i in range(50)] + [12345, "str]ing", True]
+    text = json.dumps(items, indent=1)
+    for size in (1, 3, 7, 64, len(text)):
+        assert list(stream.iter_json_array(chunked(text, size))) == items
+    assert list(stream.iter_json_array([" [ ] "])) == []
+    assert list(stream.iter_json_array(["[1", "2,3", "4]"])) == [12, 34]
+
+def test_iter_json_array_yields_early() -> None:
+    def chunks():
+        yield b'[{"a": 1}, {"b"'
+        raise AssertionError("read too far")
+    assert next(stream.iter_json_array(chunks())) == {"a": 1}
+
+def test_iter_json_array_invalid() -> None:
+    with pytest.raises(json.JSONDecodeError):
+        list(stream.iter_json_array(['{"a": 1}']))
+    with pytest.raises(json.JSONDecodeError):
+        list(stream.iter_json_array(['[{"a": 1}']))
+    with pytest.raises(json.JSONDecodeError):
+        list(stream.iter_json_array(['[{"a": 1} {"b": 2}]']))
@@ -0,0 +1,31 @@
+from amlib import summary
+from amlib.records import AlertRecord, SilenceRecord
+
+
+def make_alert(fingerprint: str, starts: str, silenced: bool = False, **labels: str) -> AlertRecord:
+    return AlertRecord({"labels": labels, "annotations": {}, "receivers": [{"name": "r"}], "fingerprint": fingerprint,
+                        "startsAt": starts, "updatedAt": starts, "endsAt": "2030-01-01T00:00:00Z",
+                        "status": {"state": "suppressed" if silenced else "active", "silencedBy": ["s"] if silenced else [], "inhibitedBy": []}})
+
+def make_silence(sid: str, created_by: str, state: str, alertname: str) -> SilenceRecord:
+    return SilenceRecord({"id": sid, "matchers": [{"name": "alertname", "value": alertname, "isRegex": False, "isEqual": True}],
+                          "startsAt": "2022-09-21T14:00:00Z", "endsAt": "2022-09-22T14:00:00Z", "updatedAt": "2022-09-21T14:00:00Z",
+                          "createdBy": created_by, "comment": "c", "status": {"state": state}})
+
+def test_summarize_alerts() -> None:
+    alerts = [make_alert("1", "2022-09-21T14:00:00Z", alertname="A", namespace="x"),
+              make_alert("2", "2022-09-20T14:00:00.5Z", True, alertname="A", namespace="x"),
+              make_alert("3", "2022-09-21T14:00:00Z", alertname="B")]
+    groups = summary.summarize_alerts(alerts, ["alertname", "namespace"])
+    stats = groups[("A", "x")]
+    assert stats.count == 2 and stats.silenced == 1 and stats.silenced_ratio == 0.5
+    assert stats.oldest.isoformat() == "2022-09-20T14:00:00.500000+00:00"
+    assert groups[("B", "")].count == 1
+    assert [key for (key, _) in summary.top(groups, 1)] == [("A", "x")]
+    assert summary.summarize_alerts(alerts, ["@state"])[("suppressed",)].count == 1
+
+def test_summarize_silences() -> None:
+    silences = [make_silence("1", "bob", "active", "A"), make_silence("2", "bob", "active", "B"), make_silence("3", "alice", "expired", "A")]
+    groups = summary.summarize_silences(silences, ["createdBy", "state"])
+    assert {key: stats.count for (key, stats) in groups.items()} == {("bob", "active"): 2, ("alice", "expired"): 1}
+    assert summary.summarize_silences(silences, ["alertname"])[("A",)].count == 2
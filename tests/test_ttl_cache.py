@@ -0,0 +1,46 @@
+import time
+
+from amlib import cache
+from amlib.config import CACHE_OPTIONS
+
+def test_ttl_cache_expiry_and_eviction() -> None:
+    ttl = cache.TTLCache(ttl=0.05, maxsize=2)
+    ttl.set("a", 1)
+    ttl.set("b", 2)
+    assert ttl.get("a") == (True, 1)
+    ttl.set("c", 3)
+    assert ttl.get("b") == (False, None)
+    assert ttl.get("c") == (True, 3)
+    time.sleep(0.06)
+    assert ttl.get("a") == (False, None)
+    info = ttl.info()
+    assert (info.hits, info.misses, info.currsize) == (2, 2, 1)
+
+def test_ttl_cache_decorator() -> None:
+    calls = []
+    @cache.ttl_cache
+    def fetch(states: list[str] | None = None, flag: bool = True) -> list[str]:
+        calls.append((states, flag))
+        return list(states or [])
+    assert fetch(["a", "b"]) == ["a", "b"]
+    assert fetch(("a", "b"), flag=True) == ["a", "b"]
+    assert fetch(states=["a", "b"]) == ["a", "b"]
+    assert calls == [(("a", "b"), True)]
+    assert fetch.cache_info().hits == 2
+    fetch.cache_clear()
+    fetch(["a", "b"])
+    assert len(calls) == 2
+
+def test_ttl_cache_disabled() -> None:
+    calls = []
+    @cache.ttl_cache
+    def fetch() -> int:
+        calls.append(1)
+        return len(calls)
+    ttl = CACHE_OPTIONS["TTL"]
+    CACHE_OPTIONS["TTL"] = 0
+    try:
+        assert fetch() == 1
+        assert fetch() == 2
+    finally:
+        CACHE_OPTIONS["TTL"] = ttl
@@ -0,0 +1,44 @@
+from typing import Any
+
+from requests import ConnectionError
+
+from amlib import watch
+
+
+def raw_alert(fingerprint: str, state: str = "active", silenced_by: list[str] | None = None, updated: str = "2022-09-21T14:00:00Z") -> dict[str, Any]:
+    return {"labels": {"alertname": "A"}, "annotations": {}, "receivers": [{"name": "r"}], "fingerprint": fingerprint,
+            "startsAt": "2022-09-21T14:00:00Z", "updatedAt": updated, "endsAt": "2022-09-21T15:00:00Z",
+            "status": {"state": state, "silencedBy": silenced_by or [], "inhibitedBy": []}}
+
+def test_alert_snapshot_diff() -> None:
+    decoded = []
+    snapshot = watch.Snapshot("fingerprint", watch.alert_state, lambda data: decoded.append(data["fingerprint"]) or data)
+    diff = snapshot.update([raw_alert("a"), raw_alert("b")])
+    assert [c.key for c in diff.added] == ["a", "b"]
+    diff = snapshot.update([raw_alert("a", updated="2022-09-21T14:01:00Z"), raw_alert("b", "suppressed", ["s1"]), raw_alert("c")])
+    assert [c.key for c in diff.added] == ["c"]
+    assert [(c.key, c.old["status"]["state"], c.new["status"]["state"]) for c in diff.changed] == [("b", "active", "suppressed")]
+    assert not diff.removed
+    # unchanged alerts are not decoded again
+    assert decoded == ["a", "b", "b", "c"]
+    diff = snapshot.update([raw_alert("b", "suppressed", ["s1"])])
+    assert sorted(c.key for c in diff.removed) == ["a", "c"]
+    assert not snapshot.update([raw_alert("b", "suppressed", ["s1"])])
+
+def test_poll_backoff() -> None:
+    sleeps: list[float] = []
+    responses = iter([[raw_alert("a")], [raw_alert("a")], [raw_alert("a")], [raw_alert("b")], [raw_alert("b")]])
+    snapshot = watch.Snapshot("fingerprint", watch.alert_state, lambda data: data)
+    diffs = list(watch.poll(lambda: next(responses), snapshot, 1, 3, count=5, sleep=sleeps.append))
+    assert [bool(diff) for diff in diffs] == [True, False, False, True, False]
+    assert sleeps == [1, 2, 3, 1]
+
+def test_poll_survives_request_errors() -> None:
+    sleeps: list[float] = []
+    def fetch_error() -> list[dict[str, Any]]:
+        raise ConnectionError("unreachable")
+    fetches = iter([lambda: [raw_alert("a")], fetch_error, fetch_error, lambda: [raw_alert("a"), raw_alert("b")]])
+    snapshot = watch.Snapshot("fingerprint", watch.alert_state, lambda data: data)
+    diffs = list(watch.poll(lambda: next(fetches)(), snapshot, 1, 3, count=4, sleep=sleeps.append))
+    assert [[c.key for c in diff.added] for diff in diffs] == [["a"], ["b"]]
+    assert sleeps == [1, 2, 3]